@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提交作业两两查重
+每篇文档只预处理一次，构建 L2 归一化的稀疏向量，分块做稀疏矩阵乘法得到相似度矩阵，
+超过阈值的文档对以流的方式写入 CSV 或 JSONL 文件，内存占用与文档数的平方无关
+"""
+import argparse
+import csv
+import json
+import sys
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from corpus import Vocabulary, build_tf_matrix, row_norms
+from ingest import IngestError, ingest_files
+
+SimilarPair = Tuple[int, int, float]
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    将每一行缩放为单位长度，模长为 0 的行保持全零
+    """
+    norms = row_norms(matrix)
+    scale = np.zeros_like(norms)
+    nonzero = norms > 0
+    scale[nonzero] = 1.0 / norms[nonzero]
+    return sparse.csr_matrix(sparse.diags(scale) @ matrix)
+
+
+def iter_similar_pairs(
+    documents: Sequence[List[str]], threshold: float = 0.0, block_size: int = 512
+) -> Iterator[SimilarPair]:
+    """
+    计算所有文档对的余弦相似度，按 (i, j) 顺序输出 i < j 且相似度不低于阈值的文档对
+
+    每次只计算 block_size 行与下标不小于块起点的文档的乘积，内存占用由块大小决定。
+    相似度为 0 的文档对（没有共同词语）以及空文档不会被输出。
+
+    Args:
+        documents: 每篇文档的词列表
+        threshold: 相似度阈值 (0-1)
+        block_size: 每块的行数
+
+    Yields:
+        (文档下标 i, 文档下标 j, 相似度)
+    """
+    matrix = normalize_rows(build_tf_matrix(documents, Vocabulary()))
+    transposed = matrix.T.tocsc()
+    for start in range(0, matrix.shape[0], block_size):
+        # 只乘下标不小于块起点的列，j < start 的文档对已在前面的块中输出
+        block = (matrix[start: start + block_size] @ transposed[:, start:]).tocoo()
+        rows, cols = block.row + start, block.col + start
+        keep = (cols > rows) & (block.data >= threshold)
+        rows, cols, scores = rows[keep], cols[keep], block.data[keep]
+        order = np.lexsort((cols, rows))
+        for i, j, score in zip(rows[order], cols[order], scores[order]):
+            yield int(i), int(j), min(float(score), 1.0)
+
+
+def write_pairs(
+    pairs: Iterator[SimilarPair],
+    doc_ids: Sequence[str],
+    output: TextIO,
+    output_format: str = "csv",
+) -> int:
+    """
+    将文档对逐行写入输出流，相似度以百分比表示并保留两位小数
+
+    Args:
+        pairs: iter_similar_pairs 的输出
+        doc_ids: 文档编号，按下标对应
+        output: 输出流
+        output_format: "csv" 或 "jsonl"
+
+    Returns:
+        写入的文档对数量
+    """
+    if output_format not in ("csv", "jsonl"):
+        raise ValueError(f"不支持的输出格式：{output_format}")
+
+    writer = csv.writer(output) if output_format == "csv" else None
+    if writer is not None:
+        writer.writerow(["doc1", "doc2", "similarity"])
+
+    count = 0
+    for i, j, score in pairs:
+        similarity = round(score * 100, 2)
+        if writer is not None:
+            writer.writerow([doc_ids[i], doc_ids[j], f"{similarity:.2f}"])
+        else:
+            record = {"doc1": doc_ids[i], "doc2": doc_ids[j], "similarity": similarity}
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：计算一批提交作业两两之间的重复率
+    """
+    parser = argparse.ArgumentParser(description="论文查重：两两比较一批文档")
+    parser.add_argument(
+        "output_file", help="结果文件，扩展名为 .jsonl 时输出 JSON Lines，否则输出 CSV"
+    )
+    parser.add_argument("files", nargs="+", help="待比较的文档")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.0,
+        help="只输出重复率不低于该百分比的文档对",
+    )
+    parser.add_argument(
+        "-b", "--block-size", type=int, default=512, help="分块矩阵乘法的行数"
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, help="并行预处理的进程数，默认为 CPU 核数"
+    )
+    args = parser.parse_args(argv)
+
+    output_format = "jsonl" if args.output_file.endswith(".jsonl") else "csv"
+
+    try:
+        print("正在预处理文档...")
+        # 无法读取的文档只报告并跳过，不参与比较
+        errors: List[IngestError] = []
+        doc_ids: List[str] = []
+        documents: List[List[str]] = []
+        for path, words in ingest_files(args.files, errors, workers=args.workers):
+            doc_ids.append(path)
+            documents.append(words)
+        for error in errors:
+            print(error.message, file=sys.stderr)
+
+        print("正在计算相似度矩阵...")
+        pairs = iter_similar_pairs(documents, args.threshold / 100, args.block_size)
+        with open(args.output_file, "w", encoding="utf-8", newline="") as f:
+            count = write_pairs(pairs, doc_ids, f, output_format)
+
+        print(f"查重完成！共输出 {count} 对文档")
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+    except OSError as e:
+        print(f"写入文件 '{args.output_file}' 时出错：{e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
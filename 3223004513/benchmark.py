@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查重流程基准测试
+在不同规模的合成中文语料上分阶段计时（读文件、去标点、分词、过滤、同义词标准化、
+向量化、打分），统计峰值内存与吞吐量，结果保存为 JSON 基线，
+与基线比较时任何阶段变慢超过容差即视为性能回退
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from corpus import CorpusIndex
+from main import (
+    SYNONYMS,
+    clear_caches,
+    counter_cosine_similarity,
+    filter_words,
+    init_jieba,
+    normalize_words,
+    preprocess,
+    read_file,
+    segment,
+    strip_punctuation,
+)
+from scoring import BACKENDS, DEFAULT_BACKEND
+from segmenters import SEGMENTERS, close_segmenters
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# 语料规模：(文档数, 每篇文档的字符数)
+CORPUS_SIZES: Dict[str, Tuple[int, int]] = {
+    "small": (200, 500),
+    "medium": (100, 5000),
+    "large": (10, 50000),
+}
+# 耗时差异小于该值（秒）时不视为回退，避免极短阶段的计时噪声
+MIN_REGRESSION_SECONDS = 0.005
+
+# 合成语料使用的词汇，包含同义词表和停用词表中的词，使各阶段都有真实的工作量
+_WORDS = (
+    "今天 明天 明日 星期天 周天 礼拜天 周末 天气 晴朗 阳光明媚 晚上 夜晚 今夜 电影 影片 电影院 "
+    "我们 他们 学生 老师 学校 论文 研究 方法 实验 结果 数据 分析 系统 算法 模型 文本 相似度 "
+    "计算 检测 重复率 中文 分词 过程 问题 提出 设计 实现 测试 性能 优化 提高 准确 效率 理论 "
+    "发展 社会 经济 文化 历史 科学 技术 信息 网络 计算机 软件 工程 管理 应用 领域 重要 影响 "
+    "的 了 在 是 和 也 都 就 很 非常 因为 所以 但是 如果 通过 根据 对于 以及 其他 一些 许多"
+).split()
+_PUNCTUATION = "，，，。。！？；"
+_SENTENCE_PATTERN = re.compile(r"[^，。！？；]+[，。！？；]?")
+
+
+def generate_document(rng: random.Random, length: int) -> str:
+    """
+    生成一篇指定字符数的合成中文文档
+
+    Args:
+        rng: 随机数生成器
+        length: 文档字符数
+
+    Returns:
+        合成文本
+    """
+    parts: List[str] = []
+    size = 0
+    while size < length:
+        sentence = "".join(rng.choice(_WORDS) for _ in range(rng.randint(4, 12)))
+        sentence += rng.choice(_PUNCTUATION)
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)[:length]
+
+
+def generate_corpus(n_docs: int, doc_chars: int, seed: int = 0) -> List[str]:
+    """
+    生成可复现的合成语料
+    """
+    rng = random.Random(seed)
+    return [generate_document(rng, doc_chars) for _ in range(n_docs)]
+
+
+def paraphrase_document(rng: random.Random, text: str) -> str:
+    """
+    生成一篇合成的改写稿：删去约五分之一的分句，交换部分相邻分句，并把部分词语换成同义词
+
+    Args:
+        rng: 随机数生成器
+        text: 原文
+
+    Returns:
+        改写后的文本
+    """
+    sentences = [s for s in _SENTENCE_PATTERN.findall(text) if rng.random() > 0.2]
+    for i in range(len(sentences) - 1):
+        if rng.random() < 0.2:
+            sentences[i], sentences[i + 1] = sentences[i + 1], sentences[i]
+    result = "".join(sentences)
+    for variant, canonical in SYNONYMS.items():
+        if len(canonical) > 1 and rng.random() < 0.5:
+            result = result.replace(canonical, variant)
+    return result
+
+
+def evaluate_segmenters(
+    names: List[str],
+    n_docs: int = 40,
+    doc_chars: int = 2000,
+    threshold: float = 0.6,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+    """
+    在合成语料上比较各分词后端的吞吐量和精度
+
+    语料由原文、改写稿组成，文档对包括 (原文, 改写稿) 和 (原文, 下一篇原文)。
+    以 jieba 精确模式的相似度为参照，精度用相似度的平均/最大绝对误差和
+    按 threshold 判定是否抄袭的一致率衡量
+
+    Args:
+        names: 分词后端名称
+        n_docs: 原文篇数
+        doc_chars: 每篇原文的字符数
+        threshold: 判定抄袭的相似度阈值 (0-1)
+        seed: 随机种子
+
+    Returns:
+        后端名称到 {"mb_per_s", "docs_per_s", "mean_abs_error", "max_abs_error",
+        "agreement"} 的映射
+    """
+    rng = random.Random(seed)
+    # 按句号分行，jieba-parallel 才有可以分发的多行文本
+    originals = [
+        doc.replace("。", "。\n") for doc in generate_corpus(n_docs, doc_chars, seed)
+    ]
+    texts = originals + [paraphrase_document(rng, doc) for doc in originals]
+    pairs = [(i, n_docs + i) for i in range(n_docs)] + [
+        (i, i + 1) for i in range(n_docs - 1)
+    ]
+    total_bytes = sum(len(text.encode("utf-8")) for text in texts)
+
+    init_jieba()
+    scores: Dict[str, List[float]] = {}
+    report: Dict[str, Dict[str, float]] = {}
+    for name in ["jieba"] + [name for name in names if name != "jieba"]:
+        clear_caches()
+        seconds, words = _timed(lambda: [preprocess(text, name) for text in texts])
+        seconds = max(seconds, 1e-9)
+        counters = [Counter(w) for w in words]
+        scores[name] = [
+            counter_cosine_similarity(counters[a], counters[b]) for a, b in pairs
+        ]
+        errors = [abs(x - y) for x, y in zip(scores[name], scores["jieba"])]
+        agree = [
+            (x >= threshold) == (y >= threshold)
+            for x, y in zip(scores[name], scores["jieba"])
+        ]
+        report[name] = {
+            "mb_per_s": round(total_bytes / seconds / 1e6, 3),
+            "docs_per_s": round(len(texts) / seconds, 2),
+            "mean_abs_error": round(sum(errors) / len(errors), 4),
+            "max_abs_error": round(max(errors), 4),
+            "agreement": round(sum(agree) / len(agree), 4),
+        }
+    close_segmenters()
+    clear_caches()
+    return {name: report[name] for name in names}
+
+
+def print_segmenter_results(report: Dict[str, Dict[str, float]]) -> None:
+    """
+    以表格形式打印各分词后端的吞吐量与精度
+    """
+    print(
+        f"{'后端':<16}{'MB/秒':>10}{'篇/秒':>10}{'平均误差':>10}{'最大误差':>10}{'一致率':>10}"
+    )
+    for name, result in report.items():
+        print(
+            f"{name:<16}{result['mb_per_s']:>10.3f}{result['docs_per_s']:>10.1f}"
+            f"{result['mean_abs_error']:>10.4f}{result['max_abs_error']:>10.4f}"
+            f"{result['agreement']:>10.2%}"
+        )
+
+
+def baseline_cosine_similarity(words1: List[str], words2: List[str]) -> float:
+    """
+    最初版本 calculate_cosine_similarity 的打分方式：在两篇文本的并集词表上构建稠密词频列表，
+    作为比较计算后端时的基线
+    """
+    vocab = set(words1) | set(words2)
+    vec1 = Counter(words1)
+    vec2 = Counter(words2)
+    vector1 = [vec1.get(word, 0) for word in vocab]
+    vector2 = [vec2.get(word, 0) for word in vocab]
+    dot_product = sum(v1 * v2 for v1, v2 in zip(vector1, vector2))
+    magnitude1 = math.sqrt(sum(v * v for v in vector1))
+    magnitude2 = math.sqrt(sum(v * v for v in vector2))
+    if magnitude1 == 0 or magnitude2 == 0:
+        return 0.0
+    return dot_product / (magnitude1 * magnitude2)
+
+
+def evaluate_scoring(
+    n_pairs: int = 10, doc_tokens: int = 20000, repeat: int = 5, seed: int = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    在合成词列表上比较各计算后端与基线的单对打分耗时（向量化 + 余弦相似度）
+
+    每个后端使用新建的实例，各取 repeat 次运行中的最短耗时
+
+    Args:
+        n_pairs: 文档对数
+        doc_tokens: 每篇文档的词数
+        repeat: 重复运行的次数
+        seed: 随机种子
+
+    Returns:
+        "baseline" 和各后端名称到 {"seconds", "speedup", "max_abs_error"} 的映射，
+        speedup 为基线耗时与该项耗时之比
+    """
+    rng = random.Random(seed)
+    # 在词汇后附加编号，使词表规模接近真实论文
+    words = [f"{word}{i}" for word in _WORDS for i in range(20)]
+    pairs = [
+        (
+            [rng.choice(words) for _ in range(doc_tokens)],
+            [rng.choice(words) for _ in range(doc_tokens)],
+        )
+        for _ in range(n_pairs)
+    ]
+
+    def best(func: Callable[[], List[float]]) -> Tuple[float, List[float]]:
+        runs = [_timed(func) for _ in range(repeat)]
+        return min(seconds for seconds, _ in runs), runs[0][1]
+
+    base_seconds, expected = best(
+        lambda: [baseline_cosine_similarity(a, b) for a, b in pairs]
+    )
+    base_seconds = max(base_seconds, 1e-9)
+    report = {
+        "baseline": {
+            "seconds": round(base_seconds, 6),
+            "speedup": 1.0,
+            "max_abs_error": 0.0,
+        }
+    }
+    for name, backend_type in BACKENDS.items():
+        backend = backend_type()
+        seconds, scores = best(
+            lambda: [
+                backend.cosine(backend.vectorize(a), backend.vectorize(b))
+                for a, b in pairs
+            ]
+        )
+        seconds = max(seconds, 1e-9)
+        report[name] = {
+            "seconds": round(seconds, 6),
+            "speedup": round(base_seconds / seconds, 3),
+            "max_abs_error": round(
+                max(abs(x - y) for x, y in zip(scores, expected)), 9
+            ),
+        }
+    return report
+
+
+def print_scoring_results(report: Dict[str, Dict[str, float]]) -> None:
+    """
+    以表格形式打印各计算后端与基线的单对打分耗时
+    """
+    print(f"{'后端':<16}{'秒':>10}{'相对基线':>10}{'最大误差':>12}")
+    for name, result in report.items():
+        label = f"{name}（默认）" if name == DEFAULT_BACKEND else name
+        print(
+            f"{label:<16}{result['seconds']:>10.4f}{result['speedup']:>10.2f}"
+            f"{result['max_abs_error']:>12.2e}"
+        )
+
+
+def _timed(func: Callable[[], Any]) -> Tuple[float, Any]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run_pipeline(paths: List[str]) -> Dict[str, float]:
+    """
+    对一批文件执行完整查重流程并记录各阶段耗时
+
+    每次运行前清空进程内的分词缓存，各阶段测得的都是未命中缓存时的耗时
+
+    Returns:
+        阶段名到耗时（秒）的映射
+    """
+    clear_caches()
+    timings: Dict[str, float] = {}
+    timings["read_file"], texts = _timed(lambda: [read_file(path) for path in paths])
+    timings["regex"], texts = _timed(
+        lambda: [strip_punctuation(text, sentence_breaks=True) for text in texts]
+    )
+    timings["jieba"], words = _timed(lambda: [segment(text) for text in texts])
+    timings["filter"], words = _timed(lambda: [filter_words(w) for w in words])
+    timings["normalize_words"], words = _timed(
+        lambda: [normalize_words(w) for w in words]
+    )
+
+    def vectorize() -> Tuple[List[Counter], CorpusIndex]:
+        counters = [Counter(w) for w in words]
+        index = CorpusIndex.from_tokens((str(i), w) for i, w in enumerate(words))
+        return counters, index
+
+    timings["vectorize"], (counters, index) = _timed(vectorize)
+    timings["score_pairs"], _ = _timed(
+        lambda: [
+            counter_cosine_similarity(a, b) for a, b in zip(counters, counters[1:])
+        ]
+    )
+    timings["score_corpus"], _ = _timed(lambda: [index.score_tokens(w) for w in words])
+    return timings
+
+
+def benchmark_size(
+    name: str, n_docs: int, doc_chars: int, repeat: int = 1
+) -> Dict[str, Any]:
+    """
+    在一种规模的语料上运行基准测试
+
+    各阶段取 repeat 次运行中的最短耗时；峰值内存单独用 tracemalloc 再跑一次测得
+
+    Returns:
+        该规模的测试结果
+    """
+    documents = generate_corpus(n_docs, doc_chars, seed=len(name))
+    total_bytes = sum(len(doc.encode("utf-8")) for doc in documents)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for i, doc in enumerate(documents):
+            path = os.path.join(directory, f"{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(doc)
+            paths.append(path)
+
+        best: Dict[str, float] = {}
+        for _ in range(repeat):
+            for stage, seconds in run_pipeline(paths).items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+
+        tracemalloc.start()
+        try:
+            run_pipeline(paths)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    stages = {}
+    for stage, seconds in best.items():
+        seconds = max(seconds, 1e-9)
+        stages[stage] = {
+            "seconds": round(seconds, 6),
+            "docs_per_s": round(n_docs / seconds, 2),
+            "mb_per_s": round(total_bytes / seconds / 1e6, 3),
+        }
+    return {
+        "documents": n_docs,
+        "doc_chars": doc_chars,
+        "bytes": total_bytes,
+        "total_seconds": round(sum(best.values()), 6),
+        "peak_memory_bytes": peak,
+        "stages": stages,
+    }
+
+
+def run_benchmark(sizes: List[str], repeat: int = 1) -> Dict[str, Any]:
+    """
+    运行指定规模的基准测试
+
+    Returns:
+        可直接保存为 JSON 的测试结果
+    """
+    init_jieba()
+    results = {}
+    for name in sizes:
+        n_docs, doc_chars = CORPUS_SIZES[name]
+        results[name] = benchmark_size(name, n_docs, doc_chars, repeat)
+    return {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare_results(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25
+) -> List[str]:
+    """
+    与基线比较，找出耗时或峰值内存超出基线 (1 + tolerance) 倍的项目
+
+    只比较两份结果中都存在的规模和阶段，绝对差异小于 MIN_REGRESSION_SECONDS 的耗时不计
+
+    Returns:
+        性能回退描述列表，为空表示没有回退
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        for stage, timing in result["stages"].items():
+            base_timing = base["stages"].get(stage)
+            if base_timing is None:
+                continue
+            limit = max(
+                base_timing["seconds"] * (1 + tolerance),
+                base_timing["seconds"] + MIN_REGRESSION_SECONDS,
+            )
+            if timing["seconds"] > limit:
+                regressions.append(
+                    f"{name}/{stage}: {timing['seconds']:.4f}秒 > "
+                    f"基线 {base_timing['seconds']:.4f}秒"
+                )
+        limit = base["peak_memory_bytes"] * (1 + tolerance)
+        if result["peak_memory_bytes"] > limit:
+            regressions.append(
+                f"{name}/峰值内存: {result['peak_memory_bytes']} 字节 > "
+                f"基线 {base['peak_memory_bytes']} 字节"
+            )
+    return regressions
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    """
+    以表格形式打印测试结果
+    """
+    for name, result in report["results"].items():
+        print(
+            f"[{name}] {result['documents']} 篇 × {result['doc_chars']} 字，"
+            f"峰值内存 {result['peak_memory_bytes'] / 1e6:.1f} MB"
+        )
+        for stage, timing in result["stages"].items():
+            print(
+                f"  {stage:<16}{timing['seconds']:>10.4f}秒"
+                f"{timing['docs_per_s']:>12.1f} 篇/秒{timing['mb_per_s']:>10.2f} MB/秒"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：运行基准测试，可保存结果或与基线比较
+    """
+    parser = argparse.ArgumentParser(description="论文查重基准测试")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=list(CORPUS_SIZES),
+        default=list(CORPUS_SIZES),
+        help="语料规模",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="每种规模重复运行的次数，取最短耗时"
+    )
+    parser.add_argument("-o", "--output", help="将结果保存为 JSON 基线")
+    parser.add_argument(
+        "--baseline", help="与该 JSON 基线比较，发现回退时以状态码 1 退出"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="允许的相对变慢比例"
+    )
+    parser.add_argument(
+        "--segmenters",
+        nargs="*",
+        choices=list(SEGMENTERS),
+        help="改为比较这些分词后端的吞吐量与精度，不指定时比较全部后端",
+    )
+    parser.add_argument(
+        "--scoring",
+        action="store_true",
+        help="改为比较各计算后端与基线的单对打分耗时，默认后端慢于基线时以状态码 1 退出",
+    )
+    args = parser.parse_args(argv)
+
+    if args.scoring:
+        scoring_report = evaluate_scoring()
+        print_scoring_results(scoring_report)
+        limit = scoring_report["baseline"]["seconds"] * (1 + args.tolerance)
+        if scoring_report[DEFAULT_BACKEND]["seconds"] > limit:
+            print(f"默认后端 {DEFAULT_BACKEND} 慢于基线")
+            sys.exit(1)
+        return
+
+    if args.segmenters is not None:
+        print_segmenter_results(
+            evaluate_segmenters(args.segmenters or list(SEGMENTERS))
+        )
+        return
+
+    report = run_benchmark(args.sizes, args.repeat)
+    print_results(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 '{args.output}'")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        if regressions:
+            print("发现性能回退：")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("与基线相比没有性能回退")
+
+
+if __name__ == "__main__":
+    main()
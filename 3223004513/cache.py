@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分词结果磁盘缓存
+以文本内容哈希 + 预处理配置指纹 + 分词后端为键，持久化 preprocess 的输出，
+同一参考文档在多次运行之间无需重复分词
+"""
+import hashlib
+import os
+import tempfile
+import zlib
+from typing import List, Optional
+
+import jieba  # type: ignore
+
+import main
+import segmenters
+
+CACHE_MAGIC = b"PCTK"
+CACHE_FORMAT_VERSION = 1
+CACHE_SUFFIX = ".tok"
+# 词语分隔符：preprocess 会移除所有非 \w\s 字符，因此词语中不可能出现 NUL
+TOKEN_SEPARATOR = "\x00"
+
+
+def _jieba_dictionary_path() -> str:
+    """
+    返回 jieba 当前使用的主词典文件路径
+    """
+    dictionary = jieba.dt.dictionary
+    if dictionary is None:
+        dictionary = os.path.join(
+            os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME
+        )
+    return os.path.abspath(dictionary)
+
+
+def preprocess_fingerprint() -> str:
+    """
+    计算预处理配置的指纹：同义词表、停用词表、jieba 版本与词典文件
+
+    任一项变化都会得到不同的指纹，从而使旧缓存自然失效
+
+    Returns:
+        十六进制指纹字符串
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}\n".encode("utf-8"))
+    for key, value in sorted(main.SYNONYMS.items()):
+        digest.update(f"s{key}\t{value}\n".encode("utf-8"))
+    for word in sorted(main.STOPWORDS):
+        digest.update(f"w{word}\n".encode("utf-8"))
+    digest.update(f"j{jieba.__version__}\n".encode("utf-8"))
+    dictionary = _jieba_dictionary_path()
+    try:
+        stat = os.stat(dictionary)
+        digest.update(
+            f"d{dictionary}\t{stat.st_size}\t{stat.st_mtime_ns}\n".encode("utf-8")
+        )
+    except OSError:
+        digest.update(f"d{dictionary}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def encode_tokens(words: List[str]) -> bytes:
+    """
+    将词列表编码为紧凑的二进制格式：魔数 + 版本号 + zlib 压缩的 UTF-8 文本
+    """
+    payload = TOKEN_SEPARATOR.join(words).encode("utf-8")
+    return CACHE_MAGIC + bytes([CACHE_FORMAT_VERSION]) + zlib.compress(payload)
+
+
+def decode_tokens(data: bytes) -> List[str]:
+    """
+    解码 encode_tokens 的输出
+
+    Raises:
+        ValueError: 数据格式或版本不匹配
+    """
+    header_size = len(CACHE_MAGIC) + 1
+    if data[: len(CACHE_MAGIC)] != CACHE_MAGIC or len(data) < header_size:
+        raise ValueError("缓存文件格式错误")
+    if data[len(CACHE_MAGIC)] != CACHE_FORMAT_VERSION:
+        raise ValueError("缓存文件版本不匹配")
+    try:
+        payload = zlib.decompress(data[header_size:]).decode("utf-8")
+    except (zlib.error, UnicodeDecodeError) as e:
+        raise ValueError(f"缓存文件已损坏：{e}")
+    return payload.split(TOKEN_SEPARATOR) if payload else []
+
+
+class TokenCache:
+    """
+    分词结果磁盘缓存
+
+    - 每个条目一个文件，先写临时文件再原子替换，并发读取方不会读到半写入的数据
+    - 命中时刷新文件修改时间，总大小超过上限时按修改时间淘汰最久未使用的条目
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = fingerprint or preprocess_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entries())
+
+    def key(self, text: str) -> str:
+        """
+        计算文本的缓存键，包含当前默认分词后端的名称，不同后端的结果互不覆盖
+        """
+        digest = hashlib.sha256(self.fingerprint.encode("ascii"))
+        digest.update(segmenters.get_segmenter().name.encode("utf-8") + b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + CACHE_SUFFIX)
+
+    def _entries(self) -> List[str]:
+        paths: List[str] = []
+        for root, _, files in os.walk(self.directory):
+            paths.extend(
+                os.path.join(root, name)
+                for name in files
+                if name.endswith(CACHE_SUFFIX)
+            )
+        return paths
+
+    def get(self, text: str) -> Optional[List[str]]:
+        """
+        读取文本的缓存分词结果，未命中或缓存损坏时返回 None
+        """
+        path = self._path(self.key(text))
+        try:
+            with open(path, "rb") as f:
+                words = decode_tokens(f.read())
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # 刷新最近使用时间
+        except OSError:
+            pass
+        return words
+
+    def put(self, text: str, words: List[str]) -> None:
+        """
+        写入文本的分词结果
+        """
+        path = self._path(self.key(text))
+        data = encode_tokens(words)
+        try:
+            old_size = os.path.getsize(path)  # 覆盖已有条目时不重复计入大小
+        except OSError:
+            old_size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self._size += len(data) - old_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        按最近使用时间淘汰条目，直到总大小降到上限的 90% 以下
+        """
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._size = total
+
+    def preprocess(self, text: str) -> List[str]:
+        """
+        带缓存的 preprocess，可直接作为分词函数传给 CorpusIndex
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            处理后的词列表
+        """
+        words = self.get(text)
+        if words is not None:
+            self.hits += 1
+            return words
+        self.misses += 1
+        words = main.preprocess(text)
+        self.put(text, words)
+        return words
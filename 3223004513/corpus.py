@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+参考语料库批量查重
+对参考语料只分词一次，保存为稀疏词频矩阵，再用一次稀疏矩阵乘法为待测文本打分
+"""
+import argparse
+import sys
+from array import array
+from collections import Counter
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from cache import TokenCache
+from docfile import DocumentFile, write_document_file
+from ingest import IngestError, ingest_files, read_files
+from main import preprocess, read_file
+from termids import Vocabulary, encode_counts
+from weighting import (
+    IDF_WEIGHTINGS,
+    WEIGHTINGS,
+    IdfTable,
+    check_weighting,
+    weigh_matrix,
+    weigh_tokens,
+)
+
+Tokenizer = Callable[[str], List[str]]
+
+
+def build_tf_matrix(
+    documents: Iterable[List[str]], vocabulary: Vocabulary
+) -> sparse.csr_matrix:
+    """
+    将分词结果构建为 CSR 格式的词频矩阵，每行对应一篇文档
+
+    Args:
+        documents: 每篇文档的词列表
+        vocabulary: 词表，遇到新词时会被扩充
+
+    Returns:
+        形状为 (文档数, 词表大小) 的稀疏词频矩阵
+    """
+    indptr = array("q", [0])
+    indices = array("i")
+    data = array("f")
+    for words in documents:
+        # 每行的列号升序排列，矩阵直接处于规范形式
+        ids, counts = encode_counts(words, vocabulary)
+        indices.frombytes(ids.tobytes())
+        data.frombytes(counts.astype(np.float32).tobytes())
+        indptr.append(len(indices))
+
+    return sparse.csr_matrix(
+        (
+            np.frombuffer(data, dtype=np.float32),
+            np.frombuffer(indices, dtype=np.int32),
+            np.frombuffer(indptr, dtype=np.int64),
+        ),
+        shape=(len(indptr) - 1, len(vocabulary)),
+    )
+
+
+def row_norms(matrix: sparse.csr_matrix) -> np.ndarray:
+    """
+    计算稀疏矩阵每一行的 L2 模长
+    """
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+
+
+class CorpusIndex:
+    """
+    参考语料库索引：稀疏词频矩阵 + 词表 + 预先计算好的加权矩阵和行模长
+
+    weighting 为 tfidf 或 bm25 且未提供 IDF 表时，IDF 由参考语料本身计算
+    """
+
+    def __init__(
+        self,
+        doc_ids: Sequence[str],
+        matrix: sparse.csr_matrix,
+        vocabulary: Vocabulary,
+        tokenizer: Tokenizer = preprocess,
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> None:
+        if matrix.shape[0] != len(doc_ids):
+            raise ValueError("文档编号数量与矩阵行数不一致")
+        if weighting in IDF_WEIGHTINGS and idf_table is None:
+            idf_table = IdfTable.from_matrix(matrix, vocabulary)
+        check_weighting(weighting, idf_table)
+        self.doc_ids = list(doc_ids)
+        self.matrix = matrix
+        self.vocabulary = vocabulary
+        self.weighting = weighting
+        self.idf_table = idf_table
+        self.weighted = weigh_matrix(matrix, vocabulary, weighting, idf_table)
+        self.norms = row_norms(self.weighted)
+        self.tokenizer = tokenizer
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def from_tokens(
+        cls,
+        documents: Iterable[Tuple[str, List[str]]],
+        tokenizer: Tokenizer = preprocess,
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> "CorpusIndex":
+        """
+        由已分词的文档构建索引
+
+        Args:
+            documents: (文档编号, 词列表) 序列
+            tokenizer: 查询时对待测文本使用的预处理函数
+            weighting: 加权方式
+            idf_table: IDF 表，默认由参考语料本身计算
+
+        Returns:
+            语料库索引
+        """
+        doc_ids: List[str] = []
+
+        def words_of() -> Iterable[List[str]]:
+            for doc_id, words in documents:
+                doc_ids.append(doc_id)
+                yield words
+
+        vocabulary = Vocabulary()
+        matrix = build_tf_matrix(words_of(), vocabulary)
+        return cls(doc_ids, matrix, vocabulary, tokenizer, weighting, idf_table)
+
+    @classmethod
+    def from_texts(
+        cls,
+        documents: Iterable[Tuple[str, str]],
+        tokenizer: Tokenizer = preprocess,
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> "CorpusIndex":
+        """
+        由原始文本构建索引，每篇文本只预处理一次
+
+        Args:
+            documents: (文档编号, 文本) 序列
+            tokenizer: 预处理函数
+            weighting: 加权方式
+            idf_table: IDF 表，默认由参考语料本身计算
+
+        Returns:
+            语料库索引
+        """
+        return cls.from_tokens(
+            ((doc_id, tokenizer(text)) for doc_id, text in documents),
+            tokenizer,
+            weighting,
+            idf_table,
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        file_paths: Iterable[str],
+        tokenizer: Tokenizer = preprocess,
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+        errors: Optional[List[IngestError]] = None,
+    ) -> "CorpusIndex":
+        """
+        由参考文件构建索引，文档编号即文件路径
+
+        Args:
+            file_paths: 参考文件路径
+            tokenizer: 预处理函数
+            weighting: 加权方式
+            idf_table: IDF 表，默认由参考语料本身计算
+            errors: 不为 None 时记录无法读取的文件并跳过，否则抛出异常
+
+        Raises:
+            OSError: errors 为 None 且文件无法读取
+            UnicodeDecodeError: errors 为 None 且文件编码不是 UTF-8
+        """
+        return cls.from_texts(
+            read_files(file_paths, errors), tokenizer, weighting, idf_table
+        )
+
+    def save(self, file_path: str) -> None:
+        """
+        将词表和词频矩阵保存为可内存映射的文档向量文件（见 docfile.py），不包括加权方式和 IDF 表
+        """
+        write_document_file(file_path, self.doc_ids, self.matrix, self.vocabulary)
+
+    @classmethod
+    def load(
+        cls,
+        file_path: str,
+        tokenizer: Tokenizer = preprocess,
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> "CorpusIndex":
+        """
+        以 mmap 方式加载文档向量文件，不需要重新读取和分词参考文件
+
+        tf 加权时词频矩阵直接引用文件中的数据，多个进程加载同一文件时共享页缓存
+
+        Raises:
+            ValueError: 文件格式或版本不匹配
+        """
+        documents = DocumentFile(file_path)
+        return cls(
+            documents.doc_ids(),
+            documents.matrix(),
+            documents.vocabulary(),
+            tokenizer,
+            weighting,
+            idf_table,
+        )
+
+    def query_vector(self, words: List[str]) -> Tuple[np.ndarray, float]:
+        """
+        将已分词文本转换为与索引同样加权的查询向量
+
+        Args:
+            words: 待测文本的词列表
+
+        Returns:
+            (长度为词表大小的稠密查询向量, 查询模长)；模长包含词表外的词，
+            与 calculate_cosine_similarity 的结果保持一致
+        """
+        counts = Counter(words)
+        tokens = list(counts)
+        weights = weigh_tokens(
+            tokens,
+            np.fromiter(counts.values(), dtype=np.float64),
+            self.weighting,
+            self.idf_table,
+        )
+        query_norm = float(np.sqrt(np.dot(weights, weights)))
+        query = np.zeros(len(self.vocabulary), dtype=np.float64)
+        for word, weight in zip(tokens, weights):
+            token_id = self.vocabulary.get(word)
+            if token_id is not None:
+                query[token_id] = weight
+        return query, query_norm
+
+    def score_tokens(self, words: List[str]) -> np.ndarray:
+        """
+        计算一篇已分词文本与全部参考文档的余弦相似度
+
+        Args:
+            words: 待测文本的词列表
+
+        Returns:
+            长度为文档数的相似度数组 (0-1)
+        """
+        scores = np.zeros(len(self.doc_ids), dtype=np.float64)
+        if not words or not self.doc_ids:
+            return scores
+
+        query, query_norm = self.query_vector(words)
+        dots = self.weighted.dot(query)
+        nonzero = self.norms > 0
+        scores[nonzero] = dots[nonzero] / (self.norms[nonzero] * query_norm)
+        return scores
+
+    def query_tokens(
+        self, words: List[str], top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        返回与已分词文本最相似的 top_k 篇参考文档
+
+        Args:
+            words: 待测文本的词列表
+            top_k: 返回的文档数
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        scores = self.score_tokens(words)
+        if top_k <= 0 or scores.size == 0:
+            return []
+        if top_k < scores.size:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(scores.size)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in order]
+
+    def query(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        返回与待测文本最相似的 top_k 篇参考文档
+
+        Args:
+            text: 待测文本
+            top_k: 返回的文档数
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        return self.query_tokens(self.tokenizer(text), top_k)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：将一篇待测论文与一批参考论文比较，输出最相似的若干篇
+    """
+    parser = argparse.ArgumentParser(description="论文查重：一对多批量比较")
+    parser.add_argument("query_file", help="待检测论文的文件")
+    parser.add_argument("reference_files", nargs="*", help="参考论文文件")
+    parser.add_argument(
+        "-k", "--top-k", type=int, default=10, help="输出的最相似文档数"
+    )
+    parser.add_argument("--cache-dir", help="分词结果缓存目录，重复运行时跳过分词")
+    parser.add_argument(
+        "-j", "--workers", type=int, help="并行预处理的进程数，默认为 CPU 核数"
+    )
+    parser.add_argument(
+        "--weighting", choices=WEIGHTINGS, default="tf", help="加权方式"
+    )
+    parser.add_argument("--idf", help="tfidf、bm25 使用的 IDF 表，默认由参考文件计算")
+    parser.add_argument(
+        "--save-idf", help="将参考文件的 IDF 表保存到该文件，供以后的查询使用"
+    )
+    parser.add_argument(
+        "--docs", help="改为加载 --save-docs 生成的文档向量文件，不再读取和分词参考文件"
+    )
+    parser.add_argument(
+        "--save-docs", help="将参考文件的分词结果保存为可内存映射的文档向量文件"
+    )
+    args = parser.parse_args(argv)
+
+    if not args.reference_files and not args.docs:
+        parser.error("需要参考论文文件或 --docs")
+
+    tokenizer: Tokenizer = preprocess
+    if args.cache_dir:
+        tokenizer = TokenCache(args.cache_dir).preprocess
+
+    try:
+        idf_table = IdfTable.load(args.idf) if args.idf else None
+        if args.docs:
+            print("正在加载文档向量文件...")
+            index = CorpusIndex.load(args.docs, tokenizer, args.weighting, idf_table)
+        else:
+            print("正在构建参考语料索引...")
+            # 无法读取的参考文件只报告并跳过，不终止整批查重
+            errors: List[IngestError] = []
+            index = CorpusIndex.from_tokens(
+                ingest_files(
+                    args.reference_files,
+                    errors,
+                    workers=args.workers,
+                    tokenizer=tokenizer,
+                ),
+                tokenizer,
+                args.weighting,
+                idf_table,
+            )
+            for error in errors:
+                print(error.message, file=sys.stderr)
+        if args.save_docs:
+            index.save(args.save_docs)
+            print(f"文档向量已保存到 '{args.save_docs}'")
+        if args.save_idf:
+            IdfTable.from_matrix(index.matrix, index.vocabulary).save(args.save_idf)
+            print(f"IDF 表已保存到 '{args.save_idf}'")
+
+        print("正在计算相似度...")
+        matches = index.query(read_file(args.query_file), args.top_k)
+
+        for doc_id, similarity in matches:
+            print(f"{similarity * 100:.2f}%\t{doc_id}")
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+完全重复检测
+以规范化文本（移除标点、折叠空白）的摘要为键建立哈希索引，
+在与文本长度成线性的时间内找出完全相同或只相差空白、标点的副本，不需要分词和构建向量
+"""
+import argparse
+import pickle
+import sys
+from typing import Dict, Iterable, List, Optional
+
+from ingest import IngestError
+from main import content_key, describe_read_error, load_text
+
+DEDUP_FORMAT_VERSION = 1
+
+
+class DuplicateIndex:
+    """
+    规范化文本摘要 -> [文档编号] 的哈希索引
+    """
+
+    def __init__(self) -> None:
+        self.table: Dict[bytes, List[str]] = {}
+        # 每篇文档的摘要，用于删除
+        self.keys: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.keys
+
+    def add(self, doc_id: str, text: str) -> List[str]:
+        """
+        增量插入一篇文档，编号已存在时替换旧文档
+
+        Returns:
+            插入前已在索引中的重复文档编号
+        """
+        if doc_id in self.keys:
+            self.remove(doc_id)
+        key = content_key(text)
+        duplicates = self.table.setdefault(key, [])
+        existing = list(duplicates)
+        duplicates.append(doc_id)
+        self.keys[doc_id] = key
+        return existing
+
+    def remove(self, doc_id: str) -> None:
+        """
+        从索引中删除文档
+
+        Raises:
+            KeyError: 文档不存在
+        """
+        key = self.keys.pop(doc_id)
+        duplicates = self.table[key]
+        duplicates.remove(doc_id)
+        if not duplicates:
+            del self.table[key]
+
+    def find(self, text: str) -> List[str]:
+        """
+        查找与文本完全相同或只相差空白、标点的文档
+
+        Returns:
+            按插入顺序排列的文档编号
+        """
+        return list(self.table.get(content_key(text), ()))
+
+    def groups(self) -> List[List[str]]:
+        """
+        返回索引中互为重复的文档组（每组至少两篇）
+        """
+        return [list(doc_ids) for doc_ids in self.table.values() if len(doc_ids) > 1]
+
+    def save(self, file_path: str) -> None:
+        """
+        将索引保存到磁盘
+        """
+        state = {"version": DEDUP_FORMAT_VERSION, "keys": self.keys}
+        with open(file_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: str) -> "DuplicateIndex":
+        """
+        从磁盘加载索引，哈希表由保存的摘要重建
+
+        Raises:
+            ValueError: 文件版本不匹配
+        """
+        with open(file_path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != DEDUP_FORMAT_VERSION:
+            raise ValueError(f"索引文件 '{file_path}' 版本不匹配")
+        index = cls()
+        for doc_id, key in state["keys"].items():
+            index.table.setdefault(key, []).append(doc_id)
+        index.keys = state["keys"]
+        return index
+
+    @classmethod
+    def from_files(
+        cls, file_paths: Iterable[str], errors: Optional[List[IngestError]] = None
+    ) -> "DuplicateIndex":
+        """
+        由一批文件构建索引，以文件路径为文档编号
+
+        Args:
+            file_paths: 文件路径
+            errors: 不为 None 时记录无法读取的文件并跳过，否则抛出异常
+        """
+        index = cls()
+        for path in file_paths:
+            try:
+                text = load_text(path)
+            except Exception as e:
+                if errors is None:
+                    raise
+                errors.append(IngestError(path, describe_read_error(path, e)))
+                continue
+            index.add(path, text)
+        return index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：找出一批文件中完全相同或只相差空白、标点的文件
+    """
+    parser = argparse.ArgumentParser(description="论文查重：完全重复检测")
+    parser.add_argument("files", nargs="+", help="待检测的文件")
+    args = parser.parse_args(argv)
+
+    try:
+        errors: List[IngestError] = []
+        index = DuplicateIndex.from_files(args.files, errors)
+        for error in errors:
+            print(error.message, file=sys.stderr)
+        groups = index.groups()
+        if not groups:
+            print("没有发现重复文件")
+        for doc_ids in groups:
+            print("\t".join(doc_ids))
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可内存映射的文档向量文件
+把 preprocess 的结果（词表和每篇文档的词频向量）保存为紧凑的二进制文件：文件头 + CSR 格式的
+行偏移、词语编号和词频数组 + 词语与文档编号字符串表。以 mmap 方式打开时数组直接引用文件中的数据，
+不需要反序列化，多个工作进程打开同一文件时共享页缓存中的同一份数据
+
+文件布局（小端序，每一节按 8 字节对齐）：
+
+    文件头        魔数、版本号、文档数、词数、非零元素数、词语字节数、文档编号字节数
+    indptr       int64[文档数 + 1]    每篇文档在 ids / counts 中的起止位置
+    ids          int32[非零元素数]     词语编号，每篇文档内升序排列
+    counts       float32[非零元素数]   词频，与 CorpusIndex 的矩阵类型相同，可直接引用
+    词语偏移      int64[词数 + 1]      词语在词语字节串中的起止位置
+    词语字节串    UTF-8
+    文档编号偏移  int64[文档数 + 1]
+    文档编号字节串 UTF-8
+"""
+import mmap
+import os
+import struct
+import tempfile
+from collections import Counter
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from termids import TermCounts, Vocabulary
+
+DOCFILE_MAGIC = b"PCDV"
+DOCFILE_FORMAT_VERSION = 1
+# 魔数、版本号、文档数、词数、非零元素数、词语字节数、文档编号字节数
+_HEADER = struct.Struct("<4sIQQQQQ")
+_ALIGNMENT = 8
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _encode_strings(strings: Sequence[str]) -> Tuple[np.ndarray, bytes]:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return offsets, b"".join(encoded)
+
+
+def _write_section(f: BinaryIO, data: bytes) -> None:
+    f.write(data)
+    f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+
+
+def write_document_file(
+    file_path: str,
+    doc_ids: Sequence[str],
+    matrix: sparse.csr_matrix,
+    vocabulary: Vocabulary,
+) -> None:
+    """
+    将词频矩阵写入文档向量文件，先写临时文件再原子替换
+
+    Args:
+        file_path: 输出文件路径
+        doc_ids: 与矩阵各行对齐的文档编号
+        matrix: 形状为 (文档数, 词表大小) 的 CSR 词频矩阵
+        vocabulary: 矩阵列号对应的词表
+
+    Raises:
+        ValueError: 文档编号数量与矩阵行数不一致
+    """
+    if matrix.shape[0] != len(doc_ids):
+        raise ValueError("文档编号数量与矩阵行数不一致")
+    matrix = sparse.csr_matrix(matrix)
+    matrix.sort_indices()
+    n_terms = len(vocabulary)
+    token_offsets, token_bytes = _encode_strings(vocabulary.id_to_token[:n_terms])
+    doc_offsets, doc_bytes = _encode_strings(doc_ids)
+    header = _HEADER.pack(
+        DOCFILE_MAGIC,
+        DOCFILE_FORMAT_VERSION,
+        len(doc_ids),
+        n_terms,
+        matrix.nnz,
+        len(token_bytes),
+        len(doc_bytes),
+    )
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _write_section(f, header)
+            _write_section(f, np.asarray(matrix.indptr, dtype="<i8").tobytes())
+            _write_section(f, np.asarray(matrix.indices, dtype="<i4").tobytes())
+            _write_section(f, np.asarray(matrix.data, dtype="<f4").tobytes())
+            _write_section(f, token_offsets.tobytes())
+            _write_section(f, token_bytes)
+            _write_section(f, doc_offsets.tobytes())
+            _write_section(f, doc_bytes)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class DocumentFile:
+    """
+    以 mmap 方式打开的文档向量文件，数组均为只读且不复制文件中的数据
+
+    只有词表需要在打开后重建（见 vocabulary），其余数据按需从映射中读取
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Raises:
+            ValueError: 文件格式或版本不匹配，或文件被截断
+        """
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"文档向量文件 '{file_path}' 格式或版本不匹配")
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_docs, n_terms, nnz, token_size, doc_size = (
+            _HEADER.unpack_from(buffer, 0)
+        )
+        if magic != DOCFILE_MAGIC or version != DOCFILE_FORMAT_VERSION:
+            buffer.close()
+            raise ValueError(f"文档向量文件 '{file_path}' 格式或版本不匹配")
+
+        # 各节的字节数，按文件布局依次计算起始位置
+        sizes = [
+            8 * (n_docs + 1),
+            4 * nnz,
+            4 * nnz,
+            8 * (n_terms + 1),
+            token_size,
+            8 * (n_docs + 1),
+            doc_size,
+        ]
+        starts = []
+        offset = _aligned(_HEADER.size)
+        for size in sizes:
+            starts.append(offset)
+            offset = _aligned(offset + size)
+        if offset > len(buffer):
+            buffer.close()
+            raise ValueError(f"文档向量文件 '{file_path}' 不完整")
+
+        self.indptr = np.frombuffer(
+            buffer, dtype="<i8", count=n_docs + 1, offset=starts[0]
+        )
+        self.ids = np.frombuffer(buffer, dtype="<i4", count=nnz, offset=starts[1])
+        self.counts = np.frombuffer(buffer, dtype="<f4", count=nnz, offset=starts[2])
+        self._token_offsets = np.frombuffer(
+            buffer, dtype="<i8", count=n_terms + 1, offset=starts[3]
+        )
+        self._token_start = starts[4]
+        self._doc_offsets = np.frombuffer(
+            buffer, dtype="<i8", count=n_docs + 1, offset=starts[5]
+        )
+        self._doc_start = starts[6]
+
+        self.path = file_path
+        self.n_terms = n_terms
+        self._buffer = buffer
+        self._vocabulary: Optional[Vocabulary] = None
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def nnz(self) -> int:
+        return len(self.ids)
+
+    def _string(self, start: int, offsets: np.ndarray, i: int) -> str:
+        return self._buffer[
+            start + int(offsets[i]): start + int(offsets[i + 1])
+        ].decode("utf-8")
+
+    def doc_id(self, i: int) -> str:
+        """
+        第 i 篇文档的编号，只解码这一个字符串
+        """
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._string(self._doc_start, self._doc_offsets, i)
+
+    def doc_ids(self) -> List[str]:
+        """
+        全部文档编号
+        """
+        return self._strings(self._doc_start, self._doc_offsets)
+
+    def token(self, token_id: int) -> str:
+        """
+        编号对应的词语
+        """
+        if not 0 <= token_id < self.n_terms:
+            raise IndexError(token_id)
+        return self._string(self._token_start, self._token_offsets, token_id)
+
+    def _strings(self, start: int, offsets: np.ndarray) -> List[str]:
+        raw = self._buffer[start: start + int(offsets[-1])]
+        bounds = offsets.tolist()
+        return [
+            raw[bounds[i]: bounds[i + 1]].decode("utf-8")
+            for i in range(len(bounds) - 1)
+        ]
+
+    def vocabulary(self) -> Vocabulary:
+        """
+        由文件中的词语重建词表（查询时需要词语到编号的映射），结果被缓存
+        """
+        if self._vocabulary is None:
+            self._vocabulary = Vocabulary(
+                self._strings(self._token_start, self._token_offsets)
+            )
+        return self._vocabulary
+
+    def vector(self, i: int) -> TermCounts:
+        """
+        第 i 篇文档的有序词频向量，数组直接引用文件中的数据
+        """
+        start, end = int(self.indptr[i]), int(self.indptr[i + 1])
+        return TermCounts(self.ids[start:end], self.counts[start:end])
+
+    def counter(self, i: int) -> Counter:
+        """
+        第 i 篇文档的词频 Counter，与 Counter(preprocess(text)) 相同
+        """
+        ids, counts = self.vector(i)
+        return Counter({self.token(int(t)): int(c) for t, c in zip(ids, counts)})
+
+    def matrix(self) -> sparse.csr_matrix:
+        """
+        CSR 词频矩阵，data 和 indices 直接引用文件中的数据（只有行偏移会被转换类型）
+        """
+        return sparse.csr_matrix(
+            (self.counts, self.ids, self.indptr), shape=(len(self), self.n_terms)
+        )
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量文件导入
+用 asyncio 并发读取大量文件（读取在线程池中执行，同时在途的文件数有上限），
+解码后的文本以流的形式交给预处理进程池，结果按输入顺序返回；
+单个文件读取失败只记录错误，不会终止整批导入。
+在网络存储上，吞吐量受带宽而不是单个文件的访问延迟限制
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import (
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from main import describe_read_error, init_jieba, load_text, preprocess
+
+Tokenizer = Callable[[str], List[str]]
+
+# 默认同时在途（读取中或预处理中）的文件数
+DEFAULT_CONCURRENCY = 64
+
+
+def default_workers() -> int:
+    """
+    默认预处理进程数：CPU 核数
+    """
+    return os.cpu_count() or 1
+
+
+class IngestError(NamedTuple):
+    """读取失败的文件及提示信息"""
+
+    path: str
+    message: str
+
+
+async def aingest_files(
+    file_paths: Iterable[str],
+    errors: List[IngestError],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    workers: Optional[int] = None,
+    tokenizer: Tokenizer = preprocess,
+) -> AsyncGenerator[Tuple[str, List[str]], None]:
+    """
+    并发读取并预处理一批文件，按输入顺序流式返回结果
+
+    先完成的文件在前面的文件完成之前暂存，暂存的结果同样计入在途文件数；
+    只有在消费方取走结果后才会开始读取新的文件，因此在途文件数不超过 concurrency，
+    消费方处理较慢时读取会自动暂停（背压）
+
+    Args:
+        file_paths: 文件路径序列，可以是惰性的迭代器
+        errors: 读取失败的文件会被追加到该列表
+        concurrency: 同时在途的文件数上限
+        workers: 预处理进程数，默认为 CPU 核数；为 1 时在事件循环所在线程中预处理
+        tokenizer: 预处理函数，必须可以被 pickle
+
+    Yields:
+        (文件路径, 词列表)
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency 必须为正整数")
+    loop = asyncio.get_running_loop()
+    workers = workers or default_workers()
+    read_pool = ThreadPoolExecutor(max_workers=concurrency)
+    process_pool: Optional[Executor] = None
+    if workers > 1:
+        process_pool = ProcessPoolExecutor(max_workers=workers, initializer=init_jieba)
+
+    async def ingest_one(path: str) -> Optional[Tuple[str, List[str]]]:
+        try:
+            text = await loop.run_in_executor(read_pool, load_text, path)
+        except Exception as e:
+            errors.append(IngestError(path, describe_read_error(path, e)))
+            return None
+        if process_pool is None:
+            return path, tokenizer(text)
+        return path, await loop.run_in_executor(process_pool, tokenizer, text)
+
+    paths = iter(file_paths)
+    pending: Set["asyncio.Future[Optional[Tuple[str, List[str]]]]"] = set()
+    # 进行中的任务对应的输入位置，以及已完成但尚未轮到返回的结果
+    positions: Dict["asyncio.Future[Optional[Tuple[str, List[str]]]]", int] = {}
+    finished: Dict[int, Optional[Tuple[str, List[str]]]] = {}
+    submitted = 0
+    next_position = 0
+    try:
+        while True:
+            while len(pending) + len(finished) < concurrency:
+                path = next(paths, None)
+                if path is None:
+                    break
+                task = asyncio.ensure_future(ingest_one(path))
+                pending.add(task)
+                positions[task] = submitted
+                submitted += 1
+            if not pending and not finished:
+                return
+            if next_position not in finished:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for completed in done:
+                    finished[positions.pop(completed)] = completed.result()
+            while next_position in finished:
+                result = finished.pop(next_position)
+                next_position += 1
+                if result is not None:
+                    yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        read_pool.shutdown(wait=False)
+        if process_pool is not None:
+            process_pool.shutdown(wait=True)
+
+
+def read_files(
+    file_paths: Iterable[str], errors: Optional[List[IngestError]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    在当前线程中按顺序读取一批文件，供 CorpusIndex.from_files 等不需要并发的场合使用
+
+    Args:
+        file_paths: 文件路径序列
+        errors: 不为 None 时记录无法读取的文件并跳过，否则抛出异常
+
+    Yields:
+        (文件路径, 文本)
+
+    Raises:
+        OSError: errors 为 None 且文件不存在、没有权限或读取失败
+        UnicodeDecodeError: errors 为 None 且文件编码不是 UTF-8
+    """
+    for path in file_paths:
+        try:
+            text = load_text(path)
+        except Exception as e:
+            if errors is None:
+                raise
+            errors.append(IngestError(path, describe_read_error(path, e)))
+            continue
+        yield path, text
+
+
+def ingest_files(
+    file_paths: Iterable[str],
+    errors: List[IngestError],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    workers: Optional[int] = None,
+    tokenizer: Tokenizer = preprocess,
+) -> Iterator[Tuple[str, List[str]]]:
+    """
+    aingest_files 的同步版本，在私有事件循环中执行，可直接用于 CorpusIndex.from_tokens 等
+
+    参数与 aingest_files 相同；结果按输入顺序返回，读取失败的文件追加到 errors
+    """
+    loop = asyncio.new_event_loop()
+    stream = aingest_files(file_paths, errors, concurrency, workers, tokenizer)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        loop.run_until_complete(stream.aclose())
+        loop.close()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+倒排索引查询
+为 preprocess 输出的词语建立倒排表（词语 -> 文档编号 + 归一化词频），
+top-k 余弦查询按词逐个累加得分，并用 MaxScore 剪枝提前停止扩展候选集，
+查询代价只与查询词的倒排表长度有关，而与语料库大小无关
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from allpairs import normalize_rows
+from corpus import Tokenizer, Vocabulary, build_tf_matrix
+from ingest import IngestError, read_files
+from main import preprocess
+
+
+class InvertedIndex:
+    """
+    倒排索引：按列存储（CSC）的 L2 归一化词频矩阵，每一列即一个词语的倒排表
+    """
+
+    def __init__(
+        self,
+        doc_ids: Sequence[str],
+        matrix: sparse.csr_matrix,
+        vocabulary: Vocabulary,
+        tokenizer: Tokenizer = preprocess,
+    ) -> None:
+        if matrix.shape[0] != len(doc_ids):
+            raise ValueError("文档编号数量与矩阵行数不一致")
+        self.doc_ids = list(doc_ids)
+        self.vocabulary = vocabulary
+        self.tokenizer = tokenizer
+        postings = normalize_rows(matrix).tocsc()
+        postings.sort_indices()
+        self.postings = postings
+        # 每个词语在所有文档中的最大归一化权重，用于估计得分上界
+        self.max_weights = postings.max(axis=0).toarray().ravel()
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def from_tokens(
+        cls,
+        documents: Iterable[Tuple[str, List[str]]],
+        tokenizer: Tokenizer = preprocess,
+    ) -> "InvertedIndex":
+        """
+        由已分词的文档构建倒排索引
+        """
+        doc_ids: List[str] = []
+
+        def words_of() -> Iterable[List[str]]:
+            for doc_id, words in documents:
+                doc_ids.append(doc_id)
+                yield words
+
+        vocabulary = Vocabulary()
+        matrix = build_tf_matrix(words_of(), vocabulary)
+        return cls(doc_ids, matrix, vocabulary, tokenizer)
+
+    @classmethod
+    def from_texts(
+        cls, documents: Iterable[Tuple[str, str]], tokenizer: Tokenizer = preprocess
+    ) -> "InvertedIndex":
+        """
+        由原始文本构建倒排索引
+        """
+        return cls.from_tokens(
+            ((doc_id, tokenizer(text)) for doc_id, text in documents), tokenizer
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        file_paths: Iterable[str],
+        tokenizer: Tokenizer = preprocess,
+        errors: Optional[List[IngestError]] = None,
+    ) -> "InvertedIndex":
+        """
+        由参考文件构建倒排索引，文档编号即文件路径
+
+        Args:
+            file_paths: 参考文件路径
+            tokenizer: 预处理函数
+            errors: 不为 None 时记录无法读取的文件并跳过，否则抛出异常
+
+        Raises:
+            OSError: errors 为 None 且文件无法读取
+            UnicodeDecodeError: errors 为 None 且文件编码不是 UTF-8
+        """
+        return cls.from_texts(read_files(file_paths, errors), tokenizer)
+
+    def _posting(self, token_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.postings.indptr[token_id], self.postings.indptr[token_id + 1]
+        return self.postings.indices[start:end], self.postings.data[start:end]
+
+    def query_tokens(
+        self, words: List[str], top_k: int = 10, stats: Optional[Dict[str, int]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        返回与已分词文本余弦相似度最高的 top_k 篇文档（只包含与查询有共同词语的文档）
+
+        查询词按得分上界从大到小处理。当剩余词的上界之和低于当前第 k 名的得分时，
+        未出现过的文档不可能进入 top-k，之后只更新已有候选，并剔除无望进入 top-k 的候选
+
+        Args:
+            words: 待测文本的词列表
+            top_k: 返回的文档数
+            stats: 不为 None 时写入本次查询累加的倒排表项数和最终候选数
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        if not words or top_k <= 0 or not self.doc_ids:
+            return []
+
+        counts = Counter(words)
+        # 查询模长包含词表外的词，与 calculate_cosine_similarity 的结果保持一致
+        query_norm = float(np.sqrt(sum(c * c for c in counts.values())))
+        terms = []
+        for word, count in counts.items():
+            token_id = self.vocabulary.get(word)
+            if token_id is not None:
+                weight = count / query_norm
+                terms.append((weight * self.max_weights[token_id], token_id, weight))
+        terms.sort(reverse=True)
+        # remaining[i] 为第 i 个及之后的词的上界之和
+        remaining = np.append(
+            np.cumsum([bound for bound, _, _ in terms][::-1])[::-1], 0.0
+        )
+
+        # 得分累加在按文档编号索引的稠密数组中，seen 标记已成为候选的文档；
+        # 每个词只需处理自己的倒排表，不必对累计的候选重新去重
+        n_docs = len(self.doc_ids)
+        accumulated = np.zeros(n_docs, dtype=np.float64)
+        seen = np.zeros(n_docs, dtype=bool)
+        candidates = np.empty(0, dtype=np.int32)
+        scored_postings = 0
+        expanding = True
+        for i, (_, token_id, weight) in enumerate(terms):
+            docs, values = self._posting(token_id)
+            if expanding:
+                fresh = docs[~seen[docs]]
+                seen[fresh] = True
+                candidates = np.concatenate((candidates, fresh))
+                accumulated[docs] += weight * values
+                scored_postings += len(docs)
+            else:
+                positions = np.searchsorted(docs, candidates)
+                positions[positions == len(docs)] = 0
+                found = (
+                    docs[positions] == candidates
+                    if len(docs)
+                    else np.zeros(len(candidates), bool)
+                )
+                accumulated[candidates[found]] += weight * values[positions[found]]
+                scored_postings += int(found.sum())
+
+            if len(candidates) >= top_k:
+                scores = accumulated[candidates]
+                threshold = np.partition(scores, len(scores) - top_k)[
+                    len(scores) - top_k
+                ]
+                if expanding and remaining[i + 1] < threshold:
+                    expanding = False
+                if not expanding:
+                    candidates = candidates[scores + remaining[i + 1] >= threshold]
+
+        if stats is not None:
+            stats["postings"] = scored_postings
+            stats["candidates"] = len(candidates)
+
+        scores = accumulated[candidates]
+        order = np.lexsort((candidates, -scores))[:top_k]
+        return [
+            (self.doc_ids[candidates[i]], min(float(scores[i]), 1.0)) for i in order
+        ]
+
+    def query(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        返回与待测文本最相似的 top_k 篇文档
+        """
+        return self.query_tokens(self.tokenizer(text), top_k)
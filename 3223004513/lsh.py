@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MinHash / LSH 候选索引
+对 preprocess 输出的词序列取 k 词片段（shingle）计算 MinHash 签名，按分段哈希分桶，
+查询时只对落入相同桶的候选文档重新计算精确的余弦相似度
+"""
+import pickle
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Set, Tuple
+
+import numpy as np
+
+from main import counter_cosine_similarity, preprocess
+
+Tokenizer = Callable[[str], List[str]]
+
+LSH_FORMAT_VERSION = 1
+# 哈希函数取模使用的梅森素数，保证 a * x 不会溢出 uint64
+MERSENNE_PRIME = (1 << 31) - 1
+# 计算签名时每批处理的片段数，限制中间矩阵的大小
+SHINGLE_BATCH = 4096
+
+
+def shingle_hashes(words: List[str], shingle_size: int) -> np.ndarray:
+    """
+    计算词序列中所有 k 词片段的 32 位哈希（去重）
+
+    文档不足 k 个词时，整篇文档作为一个片段
+
+    Args:
+        words: 词列表
+        shingle_size: 每个片段的词数 k
+
+    Returns:
+        片段哈希数组
+    """
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    span = min(shingle_size, len(words))
+    hashes = {
+        zlib.crc32("\x00".join(words[i: i + span]).encode("utf-8"))
+        for i in range(len(words) - span + 1)
+    }
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class MinHashLSH:
+    """
+    MinHash 签名 + LSH 分桶索引
+
+    签名长度 num_perm 被分为 bands 段，每段 rows = num_perm / bands 行。
+    两篇文档的片段 Jaccard 相似度为 s 时，成为候选的概率为 1 - (1 - s^rows)^bands：
+    增加 bands 提高召回率，增加 rows 提高精确率。
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        seed: int = 1,
+        tokenizer: Tokenizer = preprocess,
+    ) -> None:
+        if num_perm % bands != 0:
+            raise ValueError("num_perm 必须是 bands 的整数倍")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.tokenizer = tokenizer
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.counters: Dict[str, Counter] = {}
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.signatures
+
+    @property
+    def approximate_threshold(self) -> float:
+        """
+        候选概率 S 曲线的拐点，Jaccard 相似度约高于该值的文档大概率成为候选
+        """
+        return float((1.0 / self.bands) ** (1.0 / self.rows))
+
+    def signature(self, words: List[str]) -> np.ndarray:
+        """
+        计算词序列的 MinHash 签名
+
+        Args:
+            words: 词列表
+
+        Returns:
+            长度为 num_perm 的签名，空文档的签名全部为最大值
+        """
+        signature = np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        hashes = shingle_hashes(words, self.shingle_size) % np.uint64(MERSENNE_PRIME)
+        for start in range(0, hashes.size, SHINGLE_BATCH):
+            batch = hashes[start: start + SHINGLE_BATCH]
+            values = (self._a[:, None] * batch[None, :] + self._b[:, None]) % np.uint64(
+                MERSENNE_PRIME
+            )
+            np.minimum(signature, values.min(axis=1), out=signature)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows: (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, doc_id: str, words: List[str]) -> None:
+        """
+        增量插入一篇已分词的文档，编号已存在时替换旧文档
+
+        Args:
+            doc_id: 文档编号
+            words: 词列表
+        """
+        if doc_id in self.signatures:
+            self.remove(doc_id)
+        signature = self.signature(words)
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(key, set()).add(doc_id)
+        self.signatures[doc_id] = signature
+        self.counters[doc_id] = Counter(words)
+
+    def add_text(self, doc_id: str, text: str) -> None:
+        """
+        增量插入一篇原始文本
+        """
+        self.add(doc_id, self.tokenizer(text))
+
+    def remove(self, doc_id: str) -> None:
+        """
+        从索引中删除文档
+
+        Raises:
+            KeyError: 文档不存在
+        """
+        signature = self.signatures.pop(doc_id)
+        del self.counters[doc_id]
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            bucket = buckets[key]
+            bucket.discard(doc_id)
+            if not bucket:
+                del buckets[key]
+
+    def candidates(self, words: List[str]) -> Set[str]:
+        """
+        返回与词序列至少有一段签名相同的候选文档
+        """
+        if not words:
+            return set()
+        result: Set[str] = set()
+        for buckets, key in zip(self.buckets, self._band_keys(self.signature(words))):
+            result.update(buckets.get(key, ()))
+        return result
+
+    def query_tokens(
+        self, words: List[str], top_k: int = 10, threshold: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        只对候选文档计算精确余弦相似度，返回最相似的 top_k 篇
+
+        Args:
+            words: 待测文本的词列表
+            top_k: 返回的文档数
+            threshold: 相似度阈值 (0-1)，低于阈值的候选被丢弃
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        query = Counter(words)
+        scored = [
+            (doc_id, counter_cosine_similarity(query, self.counters[doc_id]))
+            for doc_id in self.candidates(words)
+        ]
+        scored = [item for item in scored if item[1] >= threshold]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:top_k]
+
+    def query(
+        self, text: str, top_k: int = 10, threshold: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        返回与待测文本最相似的 top_k 篇候选文档
+        """
+        return self.query_tokens(self.tokenizer(text), top_k, threshold)
+
+    def save(self, file_path: str) -> None:
+        """
+        将索引保存到磁盘（不包括分词函数）
+        """
+        state = {
+            "version": LSH_FORMAT_VERSION,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+            "signatures": self.signatures,
+            "counters": self.counters,
+        }
+        with open(file_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path: str, tokenizer: Tokenizer = preprocess) -> "MinHashLSH":
+        """
+        从磁盘加载索引，分桶由保存的签名重建
+
+        Raises:
+            ValueError: 文件版本不匹配
+        """
+        with open(file_path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != LSH_FORMAT_VERSION:
+            raise ValueError(f"索引文件 '{file_path}' 版本不匹配")
+
+        index = cls(
+            num_perm=state["num_perm"],
+            bands=state["bands"],
+            shingle_size=state["shingle_size"],
+            seed=state["seed"],
+            tokenizer=tokenizer,
+        )
+        for doc_id, signature in state["signatures"].items():
+            for buckets, key in zip(index.buckets, index._band_keys(signature)):
+                buckets.setdefault(key, set()).add(doc_id)
+        index.signatures = state["signatures"]
+        index.counters = state["counters"]
+        return index
+
+
+def estimate_jaccard(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """
+    用两个 MinHash 签名估计片段集合的 Jaccard 相似度
+    """
+    return float(np.mean(signature1 == signature2))
@@ -5,17 +5,39 @@
 论文查重系统
 基于余弦相似度算法计算文本重复率
 """
+import cProfile
+import os
 import re
 import sys
 import jieba  # type: ignore
 import math
 from collections import Counter
-from typing import List, Set
-from functools import lru_cache  # noqa: F401
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
 
-jieba.initialize()  # 预初始化分词模型
+import metrics
+import segmenters
+from memo import LRUCache, text_key
+from metrics import instrumented, text_bytes
+from prefixdict import JIEBA_DICT_ENV, install_prefix_dict
+
+# scoring 与 weighting 依赖 NumPy/SciPy，只在加权或选择了 numpy 后端时才导入，
+# 默认的 tf 加权单对查重不付出导入这些库的开销
+if TYPE_CHECKING:
+    from weighting import IdfTable
+
+# 分词模型在首次分词时才加载（见 init_jieba），导入本模块不再付出词典加载的开销
+_jieba_ready = False
 
 PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+# 句末标点：两侧的字不会组成一个词，分词和分词缓存都可以在这里切开
+SENTENCE_END_PATTERN = re.compile(r"[。！？!?；;]")
+WHITESPACE_PATTERN = re.compile(r"(\s+)")
+
+# 进程内分词缓存的容量（按缓存的总词数计）
+PREPROCESS_CACHE_TOKENS = 500_000
+SEGMENT_CACHE_TOKENS = 200_000
+_preprocess_cache = LRUCache(PREPROCESS_CACHE_TOKENS)
+_segment_cache = LRUCache(SEGMENT_CACHE_TOKENS)
 
 # 同义词词典 - 提高查重准确性
 SYNONYMS = {
@@ -211,6 +233,73 @@ STOPWORDS: Set[str] = {
 }
 
 
+@instrumented("init_jieba")
+def init_jieba() -> None:
+    """
+    加载分词模型，重复调用无开销
+
+    环境变量 PAPERCHECK_JIEBA_DICT 指向 prefixdict.py 生成的词典文件时直接内存映射该文件，
+    否则使用 jieba 默认的加载方式
+    """
+    global _jieba_ready
+    if _jieba_ready:
+        return
+
+    dict_path = os.environ.get(JIEBA_DICT_ENV)
+    if dict_path and os.path.isfile(dict_path):
+        try:
+            install_prefix_dict(dict_path)
+        except (OSError, ValueError) as e:
+            print(f"警告：无法映射前缀词典 '{dict_path}'：{e}", file=sys.stderr)
+            jieba.initialize()
+    else:
+        jieba.initialize()
+    _jieba_ready = True
+
+
+@instrumented("read_file", lambda args, result: (0, text_bytes(result)))
+def load_text(file_path: str) -> str:
+    """
+    读取文件内容，出错时抛出异常，供需要自行处理错误的调用方使用
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        文件内容字符串
+
+    Raises:
+        OSError: 文件不存在、没有权限或读取失败
+        UnicodeDecodeError: 文件编码不是 UTF-8
+    """
+    with open(file_path, "r", encoding="utf-8-sig") as f:  # 使用 utf-8-sig 编码去除 BOM
+        content = f.read().strip()
+        # 进一步确保去除 BOM
+        if content.startswith("\ufeff"):
+            content = content[1:]
+        return content
+
+
+def describe_read_error(file_path: str, error: Exception) -> str:
+    """
+    生成读取文件出错时的提示信息
+
+    Args:
+        file_path: 文件路径
+        error: load_text 抛出的异常
+
+    Returns:
+        提示信息
+    """
+    if isinstance(error, FileNotFoundError):
+        return f"错误：文件 '{file_path}' 不存在"
+    if isinstance(error, PermissionError):
+        return f"错误：没有权限读取文件 '{file_path}'"
+    if isinstance(error, UnicodeDecodeError):
+        return f"错误：文件 '{file_path}' 编码不是UTF-8"
+    return f"读取文件 '{file_path}' 时出错：{error}"
+
+
 def read_file(file_path: str) -> str:
     """
     读取文件内容
@@ -225,25 +314,9 @@ def read_file(file_path: str) -> str:
         SystemExit: 当文件不存在或读取失败时退出程序
     """
     try:
-        with open(
-            file_path, "r", encoding="utf-8-sig"
-        ) as f:  # 使用 utf-8-sig 编码去除 BOM
-            content = f.read().strip()
-            # 进一步确保去除 BOM
-            if content.startswith("\ufeff"):
-                content = content[1:]
-            return content
-    except FileNotFoundError:
-        print(f"错误：文件 '{file_path}' 不存在")
-        sys.exit(1)
-    except PermissionError:
-        print(f"错误：没有权限读取文件 '{file_path}'")
-        sys.exit(1)
-    except UnicodeDecodeError:
-        print(f"错误：文件 '{file_path}' 编码不是UTF-8")
-        sys.exit(1)
+        return load_text(file_path)
     except Exception as e:
-        print(f"读取文件 '{file_path}' 时出错：{e}")
+        print(describe_read_error(file_path, e))
         sys.exit(1)
 
 
@@ -269,80 +342,358 @@ def write_file(file_path: str, result: float) -> None:
         sys.exit(1)
 
 
-def normalize_words(words: List[str]) -> List[str]:
+class SynonymTrie:
+    """
+    同义词前缀树
+
+    按字符存储同义词，匹配时沿分词结果逐词向下走，只在词边界处接受匹配，
+    一次扫描完成最长匹配，短语长度（词数）不受限制，也不需要拼接字符串
+    """
+
+    _END = object()  # 结点上存放标准词的键
+
+    def __init__(self, synonyms: Optional[Dict[str, str]] = None) -> None:
+        self._root: Dict[object, Any] = {}
+        self.size = 0
+        for phrase, standard in (synonyms or {}).items():
+            self.add(phrase, standard)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, phrase: str, standard: str) -> None:
+        """
+        添加一条同义词
+
+        Args:
+            phrase: 同义词短语
+            standard: 统一后的标准词
+        """
+        if not phrase:
+            return
+        node = self._root
+        for char in phrase:
+            node = node.setdefault(char, {})
+        if self._END not in node:
+            self.size += 1
+        node[self._END] = standard
+
+    def normalize(self, words: List[str]) -> List[str]:
+        """
+        将词列表中的同义词短语替换为标准词，多个短语重叠时取最长匹配
+
+        Args:
+            words: 分词后的词列表
+
+        Returns:
+            标准化后的词列表
+        """
+        root = self._root
+        end = self._END
+        normalized = []
+        i = 0
+        n = len(words)
+        while i < n:
+            node = root
+            match = None
+            match_end = i
+            j = i
+            while j < n:
+                for char in words[j]:
+                    child = node.get(char)
+                    if child is None:
+                        break
+                    node = child
+                else:
+                    j += 1
+                    standard = node.get(end)
+                    if standard is not None:
+                        match, match_end = standard, j
+                    continue
+                break
+            if match is None:
+                normalized.append(words[i])
+                i += 1
+            else:
+                normalized.append(match)
+                i = match_end
+        return normalized
+
+
+def load_synonyms(file_path: str) -> Dict[str, str]:
+    """
+    从文本文件加载同义词表
+
+    每行一条，同义词与标准词之间用空白分隔，空行和以 # 开头的行被忽略
+
+    Args:
+        file_path: 同义词文件路径
+
+    Returns:
+        同义词到标准词的映射
+
+    Raises:
+        ValueError: 某一行格式错误
+    """
+    synonyms = {}
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split()
+            if len(fields) != 2:
+                raise ValueError(f"同义词文件 '{file_path}' 第 {line_number} 行格式错误")
+            synonyms[fields[0]] = fields[1]
+    return synonyms
+
+
+_synonym_trie = SynonymTrie(SYNONYMS)
+
+
+def set_synonyms(synonyms: Dict[str, str]) -> None:
+    """
+    替换同义词表并重建前缀树
+
+    直接修改 SYNONYMS 不会影响 normalize_words，需通过本函数更新
+
+    Args:
+        synonyms: 新的同义词表
+    """
+    global _synonym_trie
+    SYNONYMS.clear()
+    SYNONYMS.update(synonyms)
+    _synonym_trie = SynonymTrie(SYNONYMS)
+    _preprocess_cache.clear()
+
+
+def clear_caches() -> None:
+    """
+    清空进程内的分词缓存
+
+    直接修改 STOPWORDS 或 jieba 词典（如 jieba.add_word）后需要调用
+    """
+    _preprocess_cache.clear()
+    _segment_cache.clear()
+
+
+def configure_caches(preprocess_tokens: int, segment_tokens: int) -> None:
+    """
+    修改分词缓存的容量，0 表示禁用
+
+    Args:
+        preprocess_tokens: preprocess 缓存可保存的总词数
+        segment_tokens: 文本块分词缓存可保存的总词数
+    """
+    _preprocess_cache.resize(preprocess_tokens)
+    _segment_cache.resize(segment_tokens)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    返回分词缓存的命中、未命中、淘汰次数及当前大小
+
+    Returns:
+        {"preprocess": {...}, "segment": {...}}
+    """
+    return {"preprocess": _preprocess_cache.stats(), "segment": _segment_cache.stats()}
+
+
+@instrumented("normalize_words", lambda args, result: (len(args[0]), 0))
+def normalize_words(words: List[str], trie: Optional[SynonymTrie] = None) -> List[str]:
     """
     将同义词转换为统一形式
 
     Args:
         words: 分词后的词列表
+        trie: 同义词前缀树，默认使用 SYNONYMS 构建的前缀树
 
     Returns:
         标准化后的词列表
     """
-    normalized = []
-    i = 0
-    while i < len(words):
-        matched = False
-        # 检查2-gram和3-gram
-        for n in range(3, 0, -1):
-            if i + n <= len(words):
-                phrase = "".join(words[i: i + n])
-                if phrase in SYNONYMS:
-                    normalized.append(SYNONYMS[phrase])
-                    i += n
-                    matched = True
-                    break
-        if not matched:
-            normalized.append(words[i])
-            i += 1
-    return normalized
+    if trie is None:
+        trie = _synonym_trie
+    return trie.normalize(words)
 
 
-def preprocess(text: str) -> List[str]:
+def strip_punctuation(text: str, sentence_breaks: bool = False) -> str:
+    """
+    移除标点符号（预处理第一步）
+
+    Args:
+        text: 原始文本
+        sentence_breaks: 为 True 时把句末标点换成换行，使 segment 以句为单位分词和缓存
+
+    Returns:
+        去除标点后的文本
+    """
+    if sentence_breaks:
+        text = SENTENCE_END_PATTERN.sub("\n", text)
+    return PUNCTUATION_PATTERN.sub("", text)
+
+
+def _normalize_whitespace(match: "re.Match[str]") -> str:
+    # jieba 把 "\r\n" 切为一个两字符的词，会通过 filter_words 保留下来；
+    # 其余空白字符各自成为单字符的词，被过滤掉
+    return "\r\n" * match.group(0).count("\r\n") or " "
+
+
+def normalize_text(text: str) -> str:
+    """
+    规范化文本：移除标点符号，空白折叠为单个空格并去掉首尾空白；
+    含有 Windows 换行符 CRLF 的空白只保留其中的 CRLF（与分词结果一致，见 _normalize_whitespace）
+
+    preprocess 丢弃标点和单字符的空白，且 jieba 对空白分隔的文本块各自独立分词，
+    因此规范化结果相同的两段文本分词结果一定相同。标点被直接删除而不是替换为空白，
+    与 preprocess 保持一致
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        规范化后的文本
+    """
+    text = strip_punctuation(text)
+    return WHITESPACE_PATTERN.sub(_normalize_whitespace, text).strip(" ")
+
+
+def content_key(text: str) -> bytes:
+    """
+    移除标点、空白折叠为单个空格后的文本的 128 位摘要，只相差空白或标点的文本摘要相同
+    """
+    return text_key(WHITESPACE_PATTERN.sub(" ", strip_punctuation(text)).strip())
+
+
+@instrumented("segment", lambda args, result: (len(result), text_bytes(args[0])))
+def segment(text: str, segmenter: Optional[str] = None) -> List[str]:
+    """
+    分词（预处理第二步），默认使用 jieba 精确模式
+
+    Args:
+        text: 去除标点后的文本
+        segmenter: 分词后端名称（见 segmenters.SEGMENTERS），默认使用 segmenters.set_segmenter 选择的后端
+
+    Returns:
+        分词结果
+    """
+    backend = segmenters.get_segmenter(segmenter)
+    if backend.needs_dictionary:
+        init_jieba()
+    if not backend.block_cache:
+        return backend.cut(text)
+
+    words: List[str] = []
+    prefix = backend.name.encode("utf-8") + b"\x00"
+    # jieba 对空白分隔的文本块各自独立分词，按块缓存不改变分词结果；
+    # preprocess 把句末标点换成了换行，因此每块至多是一句，不同段落中相同的句子也能命中缓存
+    for block in WHITESPACE_PATTERN.split(text):
+        if not block:
+            continue
+        if block.isspace():
+            words.extend(backend.cut(block))
+            continue
+        key = prefix + text_key(block)
+        cached = _segment_cache.get(key)
+        if cached is None:
+            cached = tuple(backend.cut(block))
+            _segment_cache.put(key, cached, len(cached) + 1)
+        words.extend(cached)
+    return words
+
+
+def filter_words(words: List[str]) -> List[str]:
+    """
+    过滤停用词、空字符和单个字符（预处理第三步）
+
+    Args:
+        words: 分词结果
+
+    Returns:
+        过滤后的词列表
+    """
+    return [word for word in words if word not in STOPWORDS and len(word) > 1]
+
+
+@instrumented("preprocess", lambda args, result: (len(result), text_bytes(args[0])))
+def preprocess(text: str, segmenter: Optional[str] = None) -> List[str]:
     """
     文本预处理：分词并过滤停用词和标点符号
 
     Args:
         text: 原始文本
+        segmenter: 分词后端名称，默认使用 segmenters.set_segmenter 选择的后端
 
     Returns:
         处理后的词列表
     """
-    # 使用预编译的正则表达式移除标点符号
-    text = PUNCTUATION_PATTERN.sub("", text)
+    # 重复出现的文本（模板、引用等）直接返回缓存的结果；缓存键区分分词后端
+    backend = segmenters.get_segmenter(segmenter)
+    key = backend.name.encode("utf-8") + b"\x00" + text_key(text)
+    cached = _preprocess_cache.get(key)
+    if cached is not None:
+        return list(cached)
+
+    # 使用预编译的正则表达式移除标点符号，句末标点换成换行
+    text = strip_punctuation(text, sentence_breaks=True)
 
-    # 使用jieba分词，并转换为列表
-    words = list(jieba.cut(text))
+    # 分词，并转换为列表
+    words = segment(text, backend.name)
 
     # 过滤停用词、空字符和单个字符
-    words = [word for word in words if word not in STOPWORDS and len(word) > 1]
+    words = filter_words(words)
 
-    # 同义词标准化（如果normalize_words函数存在）
+    # 同义词标准化
     words = normalize_words(words)
 
+    _preprocess_cache.put(key, tuple(words), len(words) + 1)
     return words
 
 
-def calculate_cosine_similarity(text1: str, text2: str) -> float:
+@instrumented(
+    "calculate_cosine_similarity",
+    lambda args, result: (0, text_bytes(args[0]) + text_bytes(args[1])),
+)
+def calculate_cosine_similarity(
+    text1: str,
+    text2: str,
+    weighting: str = "tf",
+    idf_table: Optional["IdfTable"] = None,
+    segmenter: Optional[str] = None,
+) -> float:
     """
     计算两个文本的余弦相似度
 
     Args:
         text1: 文本1
         text2: 文本2
+        weighting: 加权方式，"tf"、"sublinear"、"tfidf" 或 "bm25"
+        idf_table: 参考语料的 IDF 表，tfidf 和 bm25 需要
+        segmenter: 分词后端名称，默认使用 segmenters.set_segmenter 选择的后端
 
     Returns:
         相似度得分 (0-1)
+
+    Raises:
+        ValueError: 加权方式未知，或需要 IDF 表却没有提供
     """
+    if weighting != "tf":
+        from weighting import check_weighting
+
+        check_weighting(weighting, idf_table)
+
     # 空文本处理
     if not text1 and not text2:
         return 1.0  # 两个空文本视为相同
     elif not text1 or not text2:
         return 0.0
 
+    # 只相差空白或标点的副本分词结果相同，无需分词即可判定为完全相同
+    if normalize_text(text1) == normalize_text(text2):
+        return 1.0
+
     # 分词并获取词频
-    words1 = preprocess(text1)
-    words2 = preprocess(text2)
+    words1 = preprocess(text1, segmenter)
+    words2 = preprocess(text2, segmenter)
 
     # 如果预处理后两个文本都为空，返回1
     if not words1 and not words2:
@@ -350,47 +701,163 @@ def calculate_cosine_similarity(text1: str, text2: str) -> float:
     elif not words1 or not words2:
         return 0.0
 
-    # 获取所有词汇
-    vocab = set(words1) | set(words2)
+    # 默认的 python 后端在 tf 加权下与直接比较词频相同，不必导入 scoring
+    if weighting == "tf" and _uses_python_scoring():
+        return min(counter_cosine_similarity(Counter(words1), Counter(words2)), 1.0)
+
+    # 由可替换的计算后端向量化并打分
+    import scoring
+
+    backend = scoring.get_backend()
+    vec1 = backend.vectorize(words1, weighting, idf_table)
+    vec2 = backend.vectorize(words2, weighting, idf_table)
+    return backend.cosine(vec1, vec2)
+
+
+def screened_cosine_similarity(
+    text1: str,
+    text2: str,
+    low: float = 0.3,
+    high: float = 0.8,
+    screen: str = "bigram",
+    segmenter: Optional[str] = None,
+    weighting: str = "tf",
+    idf_table: Optional["IdfTable"] = None,
+) -> float:
+    """
+    先用廉价的分词后端初筛，结果落在临界区间 [low, high] 内时再用精确的分词后端复核
 
-    # 构建词频向量
-    vec1 = Counter(words1)
-    vec2 = Counter(words2)
+    Args:
+        text1: 文本1
+        text2: 文本2
+        low: 临界区间下限 (0-1)
+        high: 临界区间上限 (0-1)
+        screen: 初筛使用的分词后端
+        segmenter: 复核使用的分词后端，默认使用 segmenters.set_segmenter 选择的后端
+        weighting: 加权方式
+        idf_table: 参考语料的 IDF 表，tfidf 和 bm25 需要
 
-    vector1 = [vec1.get(word, 0) for word in vocab]
-    vector2 = [vec2.get(word, 0) for word in vocab]
+    Returns:
+        相似度得分 (0-1)：区间外为初筛结果，区间内为复核结果
+    """
+    score = calculate_cosine_similarity(text1, text2, weighting, idf_table, screen)
+    if low <= score <= high:
+        score = calculate_cosine_similarity(
+            text1, text2, weighting, idf_table, segmenter
+        )
+    return score
 
-    # 计算点积
-    dot_product = sum(v1 * v2 for v1, v2 in zip(vector1, vector2))
 
-    # 计算模长
-    magnitude1 = math.sqrt(sum(v * v for v in vector1))
-    magnitude2 = math.sqrt(sum(v * v for v in vector2))
+def _uses_python_scoring() -> bool:
+    # scoring 尚未导入时还没有选择过后端，默认后端由环境变量 PAPERCHECK_SCORING 决定
+    module = sys.modules.get("scoring")
+    if module is not None:
+        return isinstance(module.get_backend(), module.PythonBackend)
+    return os.environ.get("PAPERCHECK_SCORING", "python") == "python"
 
-    # 避免除零错误
-    if magnitude1 == 0 or magnitude2 == 0:
+
+def counter_cosine_similarity(vec1: Counter, vec2: Counter) -> float:
+    """
+    计算两个词频向量的余弦相似度
+
+    Args:
+        vec1: 文本1的词频
+        vec2: 文本2的词频
+
+    Returns:
+        相似度得分 (0-1)，任一向量为空时返回 0
+    """
+    if not vec1 or not vec2:
         return 0.0
 
-    # 计算余弦相似度
-    similarity = dot_product / (magnitude1 * magnitude2)
+    # 只遍历较小的向量计算点积
+    if len(vec1) > len(vec2):
+        vec1, vec2 = vec2, vec1
+    dot_product = sum(count * vec2.get(word, 0) for word, count in vec1.items())
+
+    magnitude1 = math.sqrt(sum(v * v for v in vec1.values()))
+    magnitude2 = math.sqrt(sum(v * v for v in vec2.values()))
+
+    return dot_product / (magnitude1 * magnitude2)
+
+
+USAGE = (
+    "用法: python main.py [原文文件] [抄袭版论文的文件] [答案文件] [--metrics 指标文件] "
+    "[--profile 性能分析文件] [--weighting tf|sublinear|tfidf|bm25] [--idf IDF文件] "
+    "[--segmenter jieba|jieba-nohmm|jieba-parallel|bigram|trigram]"
+)
+# 可选参数：参数名 -> 选项键
+OPTIONS = {
+    "--metrics": "metrics",
+    "--profile": "profile",
+    "--weighting": "weighting",
+    "--idf": "idf",
+    "--segmenter": "segmenter",
+}
+
+
+def parse_args(argv: List[str]) -> Optional[Tuple[List[str], Dict[str, str]]]:
+    """
+    解析命令行参数
+
+    Args:
+        argv: 不含程序名的参数列表
 
-    return similarity
+    Returns:
+        (三个位置参数, 可选参数)，参数不合法时返回 None
+    """
+    positional = []
+    options = {}
+    i = 0
+    while i < len(argv):
+        if argv[i] in OPTIONS:
+            if i + 1 >= len(argv):
+                return None
+            options[OPTIONS[argv[i]]] = argv[i + 1]
+            i += 2
+        else:
+            positional.append(argv[i])
+            i += 1
+    if len(positional) != 3:
+        return None
+    return positional, options
 
 
 def main() -> None:
     """
     主函数：处理命令行参数并执行查重
+
+    --metrics 将各阶段耗时、词数和字节数写入 JSON 文件，
+    --profile 将 cProfile 统计写入文件（可用 pstats 或 snakeviz 查看），
+    --weighting 选择加权方式，--idf 指定 tfidf、bm25 使用的 IDF 表（由 corpus.py --save-idf 生成），
+    --segmenter 选择分词后端
     """
-    if len(sys.argv) != 4:
-        print("用法: python main.py [原文文件] [抄袭版论文的文件] [答案文件]")
+    parsed = parse_args(sys.argv[1:])
+    if parsed is None:
+        print(USAGE)
         print("示例: python main.py orig.txt plagiarized.txt result.txt")
         sys.exit(1)
 
-    original_file = sys.argv[1]
-    plagiarized_file = sys.argv[2]
-    output_file = sys.argv[3]
+    (original_file, plagiarized_file, output_file), options = parsed
+
+    profiler = cProfile.Profile() if "profile" in options else None
+    if "metrics" in options:
+        metrics.enable()
+    if profiler is not None:
+        profiler.enable()
 
     try:
+        # 只传入命令行指定的加权参数，其余使用默认值
+        score_options: Dict[str, Any] = {}
+        if "weighting" in options:
+            score_options["weighting"] = options["weighting"]
+        if "idf" in options:
+            from weighting import IdfTable
+
+            score_options["idf_table"] = IdfTable.load(options["idf"])
+        if "segmenter" in options:
+            segmenters.set_segmenter(options["segmenter"])
+
         # 读取文件内容
         print("正在读取文件...")
         original_text = read_file(original_file)
@@ -398,7 +865,9 @@ def main() -> None:
 
         # 计算相似度
         print("正在计算相似度...")
-        similarity = calculate_cosine_similarity(original_text, plagiarized_text)
+        similarity = calculate_cosine_similarity(
+            original_text, plagiarized_text, **score_options
+        )
 
         # 将相似度转换为百分比并写入文件
         result = similarity * 100
@@ -406,6 +875,12 @@ def main() -> None:
 
         print(f"查重完成！重复率: {result:.2f}%")
 
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(options["profile"])
+        if "metrics" in options:
+            metrics.dump_json(options["metrics"])
+
     except KeyboardInterrupt:
         print("\n程序被用户中断")
         sys.exit(1)
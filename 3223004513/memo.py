@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程内 LRU 缓存
+以文本内容的哈希为键缓存分词结果，总容量按词数限制，并统计命中、未命中和淘汰次数
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def text_key(text: str) -> bytes:
+    """
+    文本的 128 位 BLAKE2 摘要，用作缓存键，长文本不会被缓存键长期引用
+    """
+    return hashlib.blake2b(
+        text.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+
+
+class LRUCache:
+    """
+    线程安全的 LRU 缓存，每个条目有一个代价（如词数），总代价不超过 max_cost
+
+    代价超过 max_cost 的条目不会被缓存；max_cost 为 0 时缓存被禁用
+    """
+
+    def __init__(self, max_cost: int) -> None:
+        self.max_cost = max_cost
+        self.cost = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[bytes, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """
+        查询缓存，命中时将条目移到最近使用的位置
+
+        Returns:
+            缓存的值，未命中时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, value: Any, cost: int) -> None:
+        """
+        写入缓存，总代价超出上限时淘汰最久未使用的条目
+        """
+        if cost > self.max_cost:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.cost -= old[1]
+            self._entries[key] = (value, cost)
+            self.cost += cost
+            self._evict()
+
+    def resize(self, max_cost: int) -> None:
+        """
+        修改容量上限，必要时立即淘汰条目
+        """
+        with self._lock:
+            self.max_cost = max_cost
+            self._evict()
+
+    def _evict(self) -> None:
+        # 调用方持有锁
+        while self.cost > self.max_cost:
+            _, (_, evicted_cost) = self._entries.popitem(last=False)
+            self.cost -= evicted_cost
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        清空缓存，统计数据保留
+        """
+        with self._lock:
+            self._entries.clear()
+            self.cost = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        返回统计数据：hits、misses、evictions、entries、cost、max_cost
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "cost": self.cost,
+                "max_cost": self.max_cost,
+            }
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分阶段计时与统计
+为读文件、分词、同义词标准化、相似度计算等阶段记录调用次数、墙钟时间、CPU 时间、
+词数和字节数；默认关闭，关闭时被装饰的函数只多一次布尔判断
+"""
+import functools
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+# 从 (位置参数, 返回值) 中计算 (词数, 字节数)
+Measure = Callable[[Tuple[Any, ...], Any], Tuple[int, int]]
+
+_enabled = False
+_lock = threading.Lock()
+_stages: Dict[str, Dict[str, float]] = {}
+
+
+def enable() -> None:
+    """
+    开启统计
+    """
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    关闭统计，已记录的数据保留
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """
+    清空已记录的数据
+    """
+    with _lock:
+        _stages.clear()
+
+
+def record(
+    stage: str, wall: float, cpu: float, tokens: int = 0, nbytes: int = 0
+) -> None:
+    """
+    记录一次阶段调用
+
+    Args:
+        stage: 阶段名
+        wall: 墙钟时间（秒）
+        cpu: 当前进程的 CPU 时间（秒）
+        tokens: 处理的词数
+        nbytes: 处理的字节数
+    """
+    with _lock:
+        stats = _stages.get(stage)
+        if stats is None:
+            stats = _stages[stage] = {
+                "calls": 0,
+                "wall_seconds": 0.0,
+                "cpu_seconds": 0.0,
+                "tokens": 0,
+                "bytes": 0,
+            }
+        stats["calls"] += 1
+        stats["wall_seconds"] += wall
+        stats["cpu_seconds"] += cpu
+        stats["tokens"] += tokens
+        stats["bytes"] += nbytes
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    返回当前统计数据的副本，各阶段的耗时均包含其内部调用的阶段
+
+    Returns:
+        {"stages": {阶段名: {calls, wall_seconds, cpu_seconds, tokens, bytes}}}
+    """
+    with _lock:
+        return {"stages": {stage: dict(stats) for stage, stats in _stages.items()}}
+
+
+def dump_json(file_path: str) -> None:
+    """
+    将统计数据写入 JSON 文件
+    """
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, ensure_ascii=False, indent=2)
+
+
+def text_bytes(text: Any) -> int:
+    """
+    文本的 UTF-8 字节数
+    """
+    return len(text.encode("utf-8")) if isinstance(text, str) else 0
+
+
+def instrumented(stage: str, measure: Optional[Measure] = None) -> Callable[[F], F]:
+    """
+    装饰器：统计开启时记录被装饰函数的耗时
+
+    Args:
+        stage: 阶段名
+        measure: 计算词数和字节数的函数，参数为 (位置参数, 返回值)
+
+    Returns:
+        装饰器
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return func(*args, **kwargs)
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            result = func(*args, **kwargs)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            tokens, nbytes = measure(args, result) if measure else (0, 0)
+            record(stage, wall, cpu, tokens, nbytes)
+            return result
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -6,8 +6,26 @@
 用于测试论文查重系统的性能
 """
 
+from benchmark import evaluate_scoring
 from main import calculate_cosine_similarity
+from prefixdict import JIEBA_DICT_ENV
+from scoring import DEFAULT_BACKEND
+import os
+import subprocess
+import sys
+import tempfile
 import time
+import unittest
+
+# 冷启动时间预算（秒）：使用内存映射前缀词典时，一次 python main.py a b c 的总耗时上限
+STARTUP_BUDGET_SECONDS = 0.8
+# import main 的累计耗时预算（秒），由 python -X importtime 测得，不含解释器启动
+IMPORT_BUDGET_SECONDS = 0.3
+# 默认计算后端的单对打分耗时相对基线允许的变慢比例
+SCORING_TOLERANCE = 0.1
+# 设置该环境变量后，pytest 才会运行依赖机器速度的冷启动测试
+PERF_TEST_ENV = "PAPERCHECK_PERF_TESTS"
+
 
 def test_performance():
     """性能测试函数"""
@@ -26,5 +44,110 @@ def test_performance():
     print(f"执行时间: {end_time - start_time:.4f}秒")
     print(f"相似度: {similarity:.4f}")
 
+
+def measure_startup(env=None):
+    """测量一次完整的命令行查重（含解释器启动和分词模型加载）耗时"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        orig = os.path.join(tmp, "orig.txt")
+        plag = os.path.join(tmp, "plag.txt")
+        with open(orig, "w", encoding="utf-8") as f:
+            f.write("今天是星期天，天气晴，今天晚上我要去看电影。")
+        with open(plag, "w", encoding="utf-8") as f:
+            f.write("今天是周天，天气晴朗，我晚上要去看电影。")
+
+        start_time = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(here, "main.py"),
+                orig,
+                plag,
+                os.path.join(tmp, "ans.txt"),
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        return time.perf_counter() - start_time
+
+
+def measure_import():
+    """测量 import main 的累计耗时（含 jieba 等依赖，不含解释器启动）"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=here,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    # 每行为 "import time: 自身耗时 | 累计耗时 | 模块名"，单位为微秒
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "main":
+            return int(fields[1]) / 1e6
+    raise RuntimeError("importtime 输出中没有 main 模块")
+
+
+def check_import_time():
+    """导入测试：import main 不应加载 NumPy/SciPy，耗时应在预算之内"""
+    elapsed = measure_import()
+    print(f"导入时间: {elapsed:.4f}秒（预算 {IMPORT_BUDGET_SECONDS}秒）")
+    assert elapsed < IMPORT_BUDGET_SECONDS
+
+
+def check_startup_time():
+    """冷启动测试：预编译前缀词典后，启动耗时应在预算之内"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        dict_path = os.path.join(tmp, "jieba.pd")
+        subprocess.run(
+            [sys.executable, os.path.join(here, "prefixdict.py"), dict_path],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        env = dict(os.environ, **{JIEBA_DICT_ENV: dict_path})
+        elapsed = measure_startup(env)
+
+    print(f"冷启动时间: {elapsed:.4f}秒（预算 {STARTUP_BUDGET_SECONDS}秒）")
+    assert elapsed < STARTUP_BUDGET_SECONDS
+
+
+def test_startup_time():
+    """冷启动耗时与机器负载有关，只在设置 PAPERCHECK_PERF_TESTS 时由 pytest 运行"""
+    if not os.environ.get(PERF_TEST_ENV):
+        raise unittest.SkipTest(f"设置 {PERF_TEST_ENV}=1 以运行冷启动测试")
+    check_startup_time()
+
+
+def check_scoring_default():
+    """单对打分测试：默认计算后端不应慢于最初版本的打分方式"""
+    report = evaluate_scoring()
+    seconds = report[DEFAULT_BACKEND]["seconds"]
+    baseline = report["baseline"]["seconds"]
+    print(f"单对打分时间: {seconds:.4f}秒（基线 {baseline:.4f}秒）")
+    assert seconds <= baseline * (1 + SCORING_TOLERANCE)
+
+
+def test_import_time():
+    """导入耗时与机器负载有关，只在设置 PAPERCHECK_PERF_TESTS 时由 pytest 运行"""
+    if not os.environ.get(PERF_TEST_ENV):
+        raise unittest.SkipTest(f"设置 {PERF_TEST_ENV}=1 以运行导入耗时测试")
+    check_import_time()
+
+
+def test_scoring_default():
+    """打分耗时与机器负载有关，只在设置 PAPERCHECK_PERF_TESTS 时由 pytest 运行"""
+    if not os.environ.get(PERF_TEST_ENV):
+        raise unittest.SkipTest(f"设置 {PERF_TEST_ENV}=1 以运行打分耗时测试")
+    check_scoring_default()
+
+
 if __name__ == "__main__":
     test_performance()
+    check_import_time()
+    check_startup_time()
+    check_scoring_default()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于上界的候选过滤
+为每篇参考文档预先计算 L1 范数（tf 加权时即词数）、L2 模长和权重最大的若干词语（签名），
+查询时先用这些统计量计算余弦相似度的上界，只对上界不低于阈值的文档精确打分。
+上界严格成立，因此不会漏掉任何相似度达到阈值的文档
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from corpus import CorpusIndex
+
+# 比较上界与阈值时允许的浮点误差（索引矩阵为 float32）
+BOUND_TOLERANCE = 1e-6
+
+
+class BoundedIndex:
+    """
+    在 CorpusIndex 之上增加逐文档统计量，支持带阈值的剪枝查询
+
+    对查询向量 q 与文档向量 d（非负），记 T 为 d 的签名词集合、r 为 d 在 T 之外部分的模长：
+
+    - 长度上界：q·d ≤ max(q) · ‖d‖₁，q·d ≤ max(d) · ‖q‖₁
+    - 签名上界：q·d ≤ Σ_{t∈T} q_t d_t + min(‖q 在 T 之外部分‖ · r, min_{t∈T} d_t · ‖q 在 T 之外部分‖₁)，
+      前一项为柯西-施瓦茨不等式，后一项利用 T 之外的权重都不超过签名中的最小权重
+
+    真实文本的词频分布高度偏斜，少数几个词即可覆盖文档模长的大部分，签名上界因此很紧
+    """
+
+    def __init__(self, index: CorpusIndex, signature_size: int = 8) -> None:
+        if signature_size < 1:
+            raise ValueError("signature_size 必须为正整数")
+        self.index = index
+        self.signature_size = signature_size
+        weighted = index.weighted.tocsr()
+        n_docs = weighted.shape[0]
+
+        self.l1_norms = np.asarray(abs(weighted).sum(axis=1), dtype=np.float64).ravel()
+        self.norms = index.norms.astype(np.float64)
+        self.max_weights = np.zeros(n_docs, dtype=np.float64)
+        # 签名：每篇文档权重最大的 signature_size 个词，不足时以权重 0 补齐
+        self.signature_ids = np.zeros((n_docs, signature_size), dtype=np.int32)
+        self.signature_weights = np.zeros((n_docs, signature_size), dtype=np.float64)
+        for row in range(n_docs):
+            start, end = weighted.indptr[row], weighted.indptr[row + 1]
+            if start == end:
+                continue
+            data = weighted.data[start:end].astype(np.float64)
+            top = np.argsort(-data, kind="stable")[:signature_size]
+            self.signature_ids[row, : len(top)] = weighted.indices[start:end][top]
+            self.signature_weights[row, : len(top)] = data[top]
+            self.max_weights[row] = data[top[0]]
+        residual = self.norms**2 - (self.signature_weights**2).sum(axis=1)
+        self.residual_norms = np.sqrt(np.maximum(residual, 0.0))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def upper_bounds(self, query: np.ndarray, query_norm: float) -> np.ndarray:
+        """
+        计算查询向量与全部参考文档余弦相似度的上界
+
+        Args:
+            query: CorpusIndex.query_vector 返回的稠密查询向量
+            query_norm: 查询模长（包含词表外的词）
+
+        Returns:
+            长度为文档数的上界数组，零向量文档的上界为 0
+        """
+        bounds = np.zeros(len(self.index), dtype=np.float64)
+        nonzero = self.norms > 0
+        if query_norm == 0 or not nonzero.any():
+            return bounds
+        bounds[nonzero] = self._bounds(np.flatnonzero(nonzero), query, query_norm)
+        return bounds
+
+    def _length_bounds(
+        self, rows: np.ndarray, query: np.ndarray, query_norm: float
+    ) -> np.ndarray:
+        query_max = float(query.max()) if query.size else 0.0
+        query_l1 = float(query.sum())
+        dots = np.minimum(
+            query_max * self.l1_norms[rows], self.max_weights[rows] * query_l1
+        )
+        return dots / (self.norms[rows] * query_norm)
+
+    def _signature_bounds(
+        self, rows: np.ndarray, query: np.ndarray, query_norm: float
+    ) -> np.ndarray:
+        query_weights = query[self.signature_ids[rows]]
+        # 补齐位置的权重为 0，对点积没有贡献；但查询在该列上的权重不能从剩余部分中扣除
+        query_weights = np.where(self.signature_weights[rows] > 0, query_weights, 0.0)
+        head = (query_weights * self.signature_weights[rows]).sum(axis=1)
+        # 签名之外的部分取两个上界中较小的一个；签名未填满时 residual 与最小权重均为 0
+        rest_l2 = np.sqrt(
+            np.maximum(query_norm**2 - (query_weights**2).sum(axis=1), 0.0)
+        )
+        rest_l1 = np.maximum(query.sum() - query_weights.sum(axis=1), 0.0)
+        rest = np.minimum(
+            rest_l2 * self.residual_norms[rows],
+            self.signature_weights[rows, -1] * rest_l1,
+        )
+        return (head + rest) / (self.norms[rows] * query_norm)
+
+    def _bounds(
+        self, rows: np.ndarray, query: np.ndarray, query_norm: float
+    ) -> np.ndarray:
+        return np.minimum(
+            self._length_bounds(rows, query, query_norm),
+            self._signature_bounds(rows, query, query_norm),
+        )
+
+    def search_tokens(
+        self, words: List[str], threshold: float, stats: Optional[Dict[str, int]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        返回与已分词文本余弦相似度不低于阈值且大于 0 的全部参考文档
+
+        先用长度上界排除文档，再对剩余文档计算签名上界，最后只对上界达到阈值的文档精确打分
+
+        Args:
+            words: 待测文本的词列表
+            threshold: 相似度阈值 (0-1)
+            stats: 不为 None 时写入文档总数及各阶段剩余的文档数（documents、length、signature、matches）
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        rows = np.flatnonzero(self.norms > 0)
+        matches: List[Tuple[str, float]] = []
+        if stats is not None:
+            stats.update(documents=len(self.index), length=0, signature=0, matches=0)
+        if not words or rows.size == 0:
+            return matches
+
+        query, query_norm = self.index.query_vector(words)
+        if not query.any():
+            return matches
+        cutoff = threshold - BOUND_TOLERANCE
+        rows = rows[self._length_bounds(rows, query, query_norm) >= cutoff]
+        length_survivors = rows.size
+        rows = rows[self._signature_bounds(rows, query, query_norm) >= cutoff]
+
+        scores = self.index.weighted[rows].dot(query) / (self.norms[rows] * query_norm)
+        keep = (scores >= threshold) & (scores > 0)
+        rows, scores = rows[keep], np.minimum(scores[keep], 1.0)
+        order = np.lexsort((rows, -scores))
+        matches = [(self.index.doc_ids[rows[i]], float(scores[i])) for i in order]
+        if stats is not None:
+            stats.update(
+                length=int(length_survivors),
+                signature=int(len(keep)),
+                matches=len(matches),
+            )
+        return matches
+
+    def search(self, text: str, threshold: float) -> List[Tuple[str, float]]:
+        """
+        返回与待测文本余弦相似度不低于阈值且大于 0 的全部参考文档
+        """
+        return self.search_tokens(self.index.tokenizer(text), threshold)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可内存映射的 jieba 前缀词典
+将 jieba 的前缀词典（词语 -> 词频）预编译为开放寻址哈希表文件，
+通过 mmap 打开即可使用，无需反序列化；多个进程共享页缓存中的同一份数据
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from typing import Dict, Optional, Tuple
+
+import jieba  # type: ignore
+
+# 指向预编译词典文件的环境变量，设置后 main.init_jieba 直接映射该文件
+JIEBA_DICT_ENV = "PAPERCHECK_JIEBA_DICT"
+
+PREFIX_DICT_MAGIC = b"PCPD"
+PREFIX_DICT_VERSION = 1
+# 文件头：魔数、版本号、槽位数、词典总词频、词条数
+_HEADER = struct.Struct("<4sIQQQ")
+# 词条：2 字节长度 + UTF-8 编码的词语
+_KEY_LENGTH = struct.Struct("<H")
+
+
+def write_prefix_dict(file_path: str, freq: Dict[str, int], total: int) -> None:
+    """
+    将前缀词典写入可内存映射的文件
+
+    每个槽位为两个 uint32：词条在数据区的偏移 + 1（0 表示空槽位）以及词频，
+    槽位数为不小于 2 倍词条数的 2 的幂，线性探测
+
+    Args:
+        file_path: 输出文件路径
+        freq: 词语到词频的映射（jieba.dt.FREQ）
+        total: 词典总词频（jieba.dt.total）
+    """
+    n_slots = 1
+    while n_slots < 2 * max(len(freq), 1):
+        n_slots <<= 1
+    mask = n_slots - 1
+
+    slots = [0] * (2 * n_slots)
+    blob = bytearray()
+    for word, count in freq.items():
+        key = word.encode("utf-8")
+        slot = zlib.crc32(key) & mask
+        while slots[2 * slot]:
+            slot = (slot + 1) & mask
+        slots[2 * slot] = len(blob) + 1
+        slots[2 * slot + 1] = count
+        blob += _KEY_LENGTH.pack(len(key)) + key
+
+    header = _HEADER.pack(
+        PREFIX_DICT_MAGIC, PREFIX_DICT_VERSION, n_slots, total, len(freq)
+    )
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(struct.pack(f"<{2 * n_slots}I", *slots))
+            f.write(blob)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class MappedPrefixDict:
+    """
+    以 mmap 方式打开的只读前缀词典，实现 jieba 分词用到的 in / [] / get 接口
+    """
+
+    def __init__(self, file_path: str) -> None:
+        with open(file_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_slots, total, size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != PREFIX_DICT_MAGIC or version != PREFIX_DICT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"前缀词典文件 '{file_path}' 格式或版本不匹配")
+        self.total = total
+        self._size = size
+        self._mask = n_slots - 1
+        slots_end = _HEADER.size + 8 * n_slots
+        self._slots = memoryview(self._mmap)[_HEADER.size: slots_end].cast("I")
+        self._blob = slots_end
+        # get_DAG 先判断 in 再取值，缓存最近一次查询避免重复探测；
+        # 键和值放在同一个元组中整体替换，多线程下不会读到错配的结果
+        self._last: Tuple[Optional[str], Optional[int]] = (None, None)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _lookup(self, word: str) -> Optional[int]:
+        last_word, last_value = self._last
+        if word == last_word:
+            return last_value
+        key = word.encode("utf-8")
+        slots = self._slots
+        mm = self._mmap
+        mask = self._mask
+        slot = zlib.crc32(key) & mask
+        value = None
+        while True:
+            offset = slots[2 * slot]
+            if not offset:
+                break
+            start = self._blob + offset - 1
+            length = mm[start] | (mm[start + 1] << 8)
+            if length == len(key) and mm[start + 2: start + 2 + length] == key:
+                value = slots[2 * slot + 1]
+                break
+            slot = (slot + 1) & mask
+        self._last = (word, value)
+        return value
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and self._lookup(word) is not None
+
+    def __getitem__(self, word: str) -> int:
+        value = self._lookup(word)
+        if value is None:
+            raise KeyError(word)
+        return value
+
+    def get(self, word: str, default: Optional[int] = None) -> Optional[int]:
+        value = self._lookup(word)
+        return default if value is None else value
+
+
+def install_prefix_dict(file_path: str) -> None:
+    """
+    用内存映射的前缀词典替换 jieba 默认词典，跳过 jieba 的词典加载过程
+
+    映射后的词典只读，之后不能再调用 jieba.add_word 等修改词典的接口
+
+    Args:
+        file_path: write_prefix_dict 生成的文件路径
+
+    Raises:
+        ValueError: 文件格式或版本不匹配
+    """
+    prefix_dict = MappedPrefixDict(file_path)
+    with jieba.dt.lock:
+        jieba.dt.FREQ = prefix_dict
+        jieba.dt.total = prefix_dict.total
+        jieba.dt.initialized = True
+
+
+def main() -> None:
+    """
+    命令行入口：将 jieba 默认词典编译为可内存映射的文件
+    """
+    if len(sys.argv) != 2:
+        print("用法: python prefixdict.py [输出文件]")
+        print(f"之后设置环境变量 {JIEBA_DICT_ENV}=[输出文件] 即可在启动时直接映射词典")
+        sys.exit(1)
+
+    jieba.initialize()
+    write_prefix_dict(sys.argv[1], jieba.dt.FREQ, jieba.dt.total)
+    print(f"前缀词典已写入 '{sys.argv[1]}'，共 {len(jieba.dt.FREQ)} 个词条")
+
+
+if __name__ == "__main__":
+    main()
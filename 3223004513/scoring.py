@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可替换的相似度计算后端
+"python" 后端用字典和纯 Python 循环实现，单对比较时省去词表编码和数组转换，是默认后端；
+"numpy" 后端用有序编号数组、NumPy 向量运算和 SciPy 稀疏矩阵实现，适合一次计算一批文档对。
+文档向量在构建时即算好模长，同一文档参与多次比较时不再重复计算
+"""
+import math
+import os
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from termids import Vocabulary, common_indices, encode_counts
+from weighting import IdfTable, check_weighting, weigh_counts, weigh_tokens
+
+# 选择默认后端的环境变量
+SCORING_BACKEND_ENV = "PAPERCHECK_SCORING"
+DEFAULT_BACKEND = "python"
+
+
+class PythonVector(NamedTuple):
+    """词语到权重的映射及其模长"""
+
+    weights: Dict[str, float]
+    norm: float
+
+
+class NumpyVector(NamedTuple):
+    """按词表编号升序排列的权重向量、模长及编号所属的词表"""
+
+    ids: np.ndarray
+    weights: np.ndarray
+    norm: float
+    vocabulary: Vocabulary
+
+
+class ScoringBackend(ABC):
+    """
+    相似度计算后端的接口：vectorize 把词列表转换为带模长的向量，
+    dot 计算点积，cosine / cosine_batch 计算一对或一批向量的余弦相似度
+    """
+
+    name = ""
+
+    @abstractmethod
+    def vectorize(
+        self,
+        words: List[str],
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> Any:
+        """
+        将词列表转换为带模长的向量
+
+        Raises:
+            ValueError: 加权方式未知，或需要 IDF 表却没有提供
+        """
+
+    @abstractmethod
+    def dot(self, vec1: Any, vec2: Any) -> float:
+        """
+        计算两个向量的点积
+        """
+
+    def cosine(self, vec1: Any, vec2: Any) -> float:
+        """
+        计算两个向量的余弦相似度
+
+        Returns:
+            相似度得分 (0-1)，任一向量为零向量时返回 0
+        """
+        if vec1.norm == 0 or vec2.norm == 0:
+            return 0.0
+        return min(self.dot(vec1, vec2) / (vec1.norm * vec2.norm), 1.0)
+
+    def cosine_batch(self, pairs: Sequence[Tuple[Any, Any]]) -> List[float]:
+        """
+        计算一批向量对的余弦相似度
+
+        Args:
+            pairs: (向量1, 向量2) 序列
+
+        Returns:
+            与 pairs 对齐的相似度列表
+        """
+        return [self.cosine(vec1, vec2) for vec1, vec2 in pairs]
+
+
+class PythonBackend(ScoringBackend):
+    """
+    纯 Python 后端：遍历较小向量的字典计算点积
+    """
+
+    name = "python"
+
+    def vectorize(
+        self,
+        words: List[str],
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> PythonVector:
+        check_weighting(weighting, idf_table)
+        counts = Counter(words)
+        if weighting == "tf":
+            weights: Dict[str, float] = dict(counts)
+        elif weighting == "sublinear":
+            weights = {word: 1.0 + math.log(count) for word, count in counts.items()}
+        else:
+            tokens = list(counts)
+            values = weigh_tokens(
+                tokens,
+                np.fromiter(counts.values(), dtype=np.float64),
+                weighting,
+                idf_table,
+            )
+            weights = dict(zip(tokens, values.tolist()))
+        return PythonVector(weights, math.sqrt(sum(w * w for w in weights.values())))
+
+    def dot(self, vec1: PythonVector, vec2: PythonVector) -> float:
+        small, large = vec1.weights, vec2.weights
+        if len(small) > len(large):
+            small, large = large, small
+        return float(sum(weight * large.get(word, 0) for word, weight in small.items()))
+
+
+class NumpyBackend(ScoringBackend):
+    """
+    NumPy/SciPy 后端：点积只访问两个有序编号数组的共同编号，批量计算时把一批向量对
+    拼成两个 CSR 矩阵，用一次逐元素乘法和按行求和得到全部点积
+
+    后端实例持有编码向量用的词表，词数超过 max_vocabulary 时换用新词表，
+    旧词表随引用它的向量一起释放；比较两个不同词表编码的向量时先按词语对齐编号
+    """
+
+    name = "numpy"
+    max_vocabulary = 1 << 20
+
+    def __init__(self) -> None:
+        self.vocabulary = Vocabulary()
+
+    def vectorize(
+        self,
+        words: List[str],
+        weighting: str = "tf",
+        idf_table: Optional[IdfTable] = None,
+    ) -> NumpyVector:
+        if len(self.vocabulary) > self.max_vocabulary:
+            self.vocabulary = Vocabulary()
+        vocabulary = self.vocabulary
+        vec = weigh_counts(
+            encode_counts(words, vocabulary), vocabulary, weighting, idf_table
+        )
+        weights = vec.counts.astype(np.float64)
+        norm = float(np.sqrt(np.dot(weights, weights)))
+        return NumpyVector(vec.ids, weights, norm, vocabulary)
+
+    @staticmethod
+    def _align(vec: NumpyVector, vocabulary: Vocabulary) -> NumpyVector:
+        # 将向量的编号换成另一词表中的编号，该词表中没有的词语对点积没有贡献，直接丢弃
+        if vec.vocabulary is vocabulary:
+            return vec
+        tokens = vec.vocabulary.id_to_token
+        lookup = vocabulary.token_to_id
+        ids = np.array([lookup.get(tokens[i], -1) for i in vec.ids.tolist()], np.int32)
+        keep = np.flatnonzero(ids >= 0)
+        order = keep[np.argsort(ids[keep])]
+        return NumpyVector(ids[order], vec.weights[order], vec.norm, vocabulary)
+
+    def dot(self, vec1: NumpyVector, vec2: NumpyVector) -> float:
+        vec2 = self._align(vec2, vec1.vocabulary)
+        index1, index2 = common_indices(vec1.ids, vec2.ids)
+        return float(np.dot(vec1.weights[index1], vec2.weights[index2]))
+
+    def cosine_batch(
+        self, pairs: Sequence[Tuple[NumpyVector, NumpyVector]]
+    ) -> List[float]:
+        if not pairs:
+            return []
+        # 每对向量只需编号在同一词表内一致，各行可以来自不同的词表
+        pairs = [(vec1, self._align(vec2, vec1.vocabulary)) for vec1, vec2 in pairs]
+        width = max(len(vec1.vocabulary) for vec1, _ in pairs)
+        left = _stack([vec1 for vec1, _ in pairs], width)
+        right = _stack([vec2 for _, vec2 in pairs], width)
+        dots = np.asarray(left.multiply(right).sum(axis=1), dtype=np.float64).ravel()
+        norms = np.array(
+            [vec1.norm * vec2.norm for vec1, vec2 in pairs], dtype=np.float64
+        )
+        scores = np.zeros(len(pairs), dtype=np.float64)
+        nonzero = norms > 0
+        scores[nonzero] = np.minimum(dots[nonzero] / norms[nonzero], 1.0)
+        return scores.tolist()
+
+
+def _stack(vectors: Sequence[NumpyVector], width: int) -> sparse.csr_matrix:
+    indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+    np.cumsum([len(vec.ids) for vec in vectors], out=indptr[1:])
+    indices = np.concatenate([vec.ids for vec in vectors])
+    data = np.concatenate([vec.weights for vec in vectors])
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(vectors), width))
+
+
+BACKENDS: Dict[str, Type[ScoringBackend]] = {
+    PythonBackend.name: PythonBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+_backend: Optional[ScoringBackend] = None
+
+
+def set_backend(name: str) -> None:
+    """
+    选择默认后端
+
+    Raises:
+        ValueError: 后端名称未知
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"未知的相似度计算后端：{name}")
+    _backend = BACKENDS[name]()
+
+
+def get_backend() -> ScoringBackend:
+    """
+    返回默认后端，首次调用时按环境变量 PAPERCHECK_SCORING 选择，未设置时使用 python 后端
+    """
+    if _backend is None:
+        set_backend(os.environ.get(SCORING_BACKEND_ENV, DEFAULT_BACKEND))
+    assert _backend is not None
+    return _backend
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可替换的分词后端
+"jieba" 为 jieba 默认的精确模式；"jieba-nohmm" 关闭 HMM 新词发现，速度更快；
+"jieba-parallel" 按行把文本分发到多个进程，适合很长的文本；
+"bigram" / "trigram" 把连续的汉字切成重叠的字符 n-gram，不需要词典，速度最快但精度较低，
+适合大规模初筛，处于临界区间的结果再交给 jieba 复核（见 main.screened_cosine_similarity）。
+
+所有后端都把空白视为分隔符，只相差空白的文本分词结果相同
+"""
+import multiprocessing
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Type
+
+import jieba  # type: ignore
+
+# 选择默认后端的环境变量
+SEGMENTER_ENV = "PAPERCHECK_SEGMENTER"
+DEFAULT_SEGMENTER = "jieba"
+
+# 汉字（含扩展 A 区与兼容汉字）连续出现的片段，以及其他由 \w 组成的片段（英文、数字等）
+_HAN = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_HAN_OR_WORD_PATTERN = re.compile(f"([{_HAN}]+)|([^\\W{_HAN}]+)")
+
+
+class Segmenter(ABC):
+    """
+    分词后端的接口
+
+    Attributes:
+        name: 后端名称，同时作为分词缓存键的一部分
+        needs_dictionary: 分词前是否需要加载 jieba 词典
+        block_cache: 是否按空白分隔的文本块缓存分词结果
+        posix_only: 是否只能在 POSIX 系统上使用
+    """
+
+    name = ""
+    needs_dictionary = False
+    block_cache = False
+    posix_only = False
+
+    @abstractmethod
+    def cut(self, text: str) -> List[str]:
+        """
+        对去除标点后的文本分词，返回的词中可能包含空白，由调用方过滤
+        """
+
+    def close(self) -> None:
+        """
+        释放后端持有的资源（如进程池）
+        """
+
+
+class JiebaSegmenter(Segmenter):
+    """
+    jieba 精确模式，启用 HMM 新词发现
+    """
+
+    name = "jieba"
+    needs_dictionary = True
+    block_cache = True
+    hmm = True
+
+    def cut(self, text: str) -> List[str]:
+        # 直接调用默认分词器实例，不受 jieba.enable_parallel 对模块级 jieba.cut 的替换影响
+        return jieba.dt.lcut(text, HMM=self.hmm)
+
+
+class JiebaNoHmmSegmenter(JiebaSegmenter):
+    """
+    jieba 精确模式，关闭 HMM：词典外的连续汉字逐字切分，省去维特比解码
+    """
+
+    name = "jieba-nohmm"
+    hmm = False
+
+
+def _cut_lines(text: str) -> List[str]:
+    return jieba.dt.lcut(text)
+
+
+class JiebaParallelSegmenter(Segmenter):
+    """
+    jieba 并行模式：按行切分文本，在进程池中分别分词后按原顺序拼接，结果与精确模式相同
+
+    与 jieba.enable_parallel 相同，工作进程以 fork 方式创建并继承已加载的词典，只支持 POSIX 系统；
+    进程池在首次分词时创建，不修改全局的 jieba.cut
+    """
+
+    name = "jieba-parallel"
+    needs_dictionary = True
+    posix_only = True
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        self.workers = workers
+        self._pool: Optional[Any] = None
+
+    def cut(self, text: str) -> List[str]:
+        lines = text.splitlines(True)
+        if len(lines) <= 1:
+            return _cut_lines(text)
+        if self._pool is None:
+            self._pool = multiprocessing.get_context("fork").Pool(self.workers)
+        words: List[str] = []
+        for part in self._pool.map(_cut_lines, lines):
+            words.extend(part)
+        return words
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+
+class CharNgramSegmenter(Segmenter):
+    """
+    字符 n-gram：连续汉字切成重叠的 n 字片段（不足 n 字时保留整段），
+    英文、数字等其他字符按空白和汉字边界整段保留
+    """
+
+    name = "bigram"
+    n = 2
+
+    def cut(self, text: str) -> List[str]:
+        words: List[str] = []
+        n = self.n
+        for match in _HAN_OR_WORD_PATTERN.finditer(text):
+            han = match.group(1)
+            if han is None:
+                words.append(match.group(2))
+            elif len(han) <= n:
+                words.append(han)
+            else:
+                words.extend(han[i: i + n] for i in range(len(han) - n + 1))
+        return words
+
+
+class CharTrigramSegmenter(CharNgramSegmenter):
+    """
+    字符三元组
+    """
+
+    name = "trigram"
+    n = 3
+
+
+SEGMENTERS: Dict[str, Type[Segmenter]] = {
+    JiebaSegmenter.name: JiebaSegmenter,
+    JiebaNoHmmSegmenter.name: JiebaNoHmmSegmenter,
+    JiebaParallelSegmenter.name: JiebaParallelSegmenter,
+    CharNgramSegmenter.name: CharNgramSegmenter,
+    CharTrigramSegmenter.name: CharTrigramSegmenter,
+}
+
+_segmenters: Dict[str, Segmenter] = {}
+_default: Optional[str] = None
+
+
+def _check_segmenter(name: str) -> None:
+    # 在选择后端时就报告不可用的后端，而不是等到分词时才失败
+    if name not in SEGMENTERS:
+        raise ValueError(f"未知的分词后端：{name}")
+    if SEGMENTERS[name].posix_only and os.name != "posix":
+        raise ValueError(f"分词后端 {name} 只支持 POSIX 系统")
+
+
+def get_segmenter(name: Optional[str] = None) -> Segmenter:
+    """
+    返回指定名称的后端实例，同一名称在进程内只创建一次
+
+    Args:
+        name: 后端名称，为 None 时返回默认后端；默认后端首次使用时按环境变量
+            PAPERCHECK_SEGMENTER 选择，未设置时为 jieba
+
+    Raises:
+        ValueError: 后端名称未知，或后端在当前系统上不可用
+    """
+    if name is None:
+        if _default is None:
+            set_segmenter(os.environ.get(SEGMENTER_ENV, DEFAULT_SEGMENTER))
+        assert _default is not None
+        name = _default
+    segmenter = _segmenters.get(name)
+    if segmenter is None:
+        _check_segmenter(name)
+        segmenter = _segmenters[name] = SEGMENTERS[name]()
+    return segmenter
+
+
+def set_segmenter(name: str) -> None:
+    """
+    选择默认后端。分词缓存以后端名称区分，切换后端不需要清空缓存
+
+    Raises:
+        ValueError: 后端名称未知，或后端在当前系统上不可用
+    """
+    global _default
+    _check_segmenter(name)
+    _default = name
+
+
+def close_segmenters() -> None:
+    """
+    释放全部已创建后端的资源
+    """
+    for segmenter in _segmenters.values():
+        segmenter.close()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+片段级查重
+将两篇文档切分为句子或段落，一次性向量化全部片段，用一次稀疏矩阵乘法找出
+待测文档每个片段在原文中最相似的片段，输出带字符偏移的对齐结果
+"""
+import argparse
+import json
+import re
+import sys
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from allpairs import normalize_rows
+from corpus import Vocabulary, build_tf_matrix
+from main import describe_read_error, preprocess
+
+Tokenizer = Callable[[str], List[str]]
+
+# 句子：若干非结束符字符 + 紧随其后的结束符
+SENTENCE_PATTERN = re.compile(r"[^。！？!?；;\n]+[。！？!?；;]*")
+# 段落：以换行分隔的非空行
+PARAGRAPH_PATTERN = re.compile(r"[^\n]+")
+SEGMENT_PATTERNS = {"sentence": SENTENCE_PATTERN, "paragraph": PARAGRAPH_PATTERN}
+
+
+class Segment(NamedTuple):
+    """文档片段及其在传入文本中的字符偏移 [start, end)，text 为去除首尾空白后的片段"""
+
+    start: int
+    end: int
+    text: str
+
+
+class SegmentMatch(NamedTuple):
+    """待测文档片段与原文中最相似片段的对齐结果"""
+
+    original: Segment
+    plagiarized: Segment
+    similarity: float
+
+
+def read_document(file_path: str) -> str:
+    """
+    读取待比较的文档，只去除 BOM，保留首尾空白和原有的换行符，
+    片段偏移因此就是文件内容中的字符位置（main.read_file 会去除首尾空白并统一换行符）
+
+    Raises:
+        OSError: 文件不存在、没有权限或读取失败
+        UnicodeDecodeError: 文件编码不是 UTF-8
+    """
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        return f.read()
+
+
+def split_segments(text: str, unit: str = "sentence") -> List[Segment]:
+    """
+    将文本切分为片段，去除首尾空白后为空的片段被丢弃
+
+    偏移量指向传入的 text 本身而不是去除空白后的文本，text[start:end] 即片段文本
+
+    Args:
+        text: 原始文本
+        unit: "sentence"（句子）或 "paragraph"（段落）
+
+    Returns:
+        片段列表
+    """
+    pattern = SEGMENT_PATTERNS.get(unit)
+    if pattern is None:
+        raise ValueError(f"不支持的切分单位：{unit}")
+
+    segments = []
+    for match in pattern.finditer(text):
+        raw = match.group()
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        start = match.start() + (len(raw) - len(raw.lstrip()))
+        segments.append(Segment(start, start + len(stripped), stripped))
+    return segments
+
+
+def match_segments(
+    original: str,
+    plagiarized: str,
+    unit: str = "sentence",
+    threshold: float = 0.5,
+    tokenizer: Tokenizer = preprocess,
+) -> List[SegmentMatch]:
+    """
+    为待测文档的每个片段找出原文中最相似的片段
+
+    Args:
+        original: 原文
+        plagiarized: 待测文档
+        unit: 切分单位，"sentence" 或 "paragraph"
+        threshold: 相似度阈值 (0-1)，低于阈值的片段不输出
+        tokenizer: 预处理函数
+
+    Returns:
+        按待测文档片段顺序排列的对齐结果，original / plagiarized 的偏移量分别指向传入的两篇文本
+    """
+    original_segments = split_segments(original, unit)
+    plagiarized_segments = split_segments(plagiarized, unit)
+    if not original_segments or not plagiarized_segments:
+        return []
+
+    # 两篇文档的全部片段共用一个词表，一次完成向量化
+    documents = [
+        tokenizer(segment.text) for segment in original_segments + plagiarized_segments
+    ]
+    matrix = normalize_rows(build_tf_matrix(documents, Vocabulary()))
+    split = len(original_segments)
+    # 相似度矩阵保持稀疏，没有共同词语的片段对不占内存
+    scores = (matrix[split:] @ matrix[:split].T).tocsr()
+    best = np.asarray(scores.argmax(axis=1)).ravel()
+    best_scores = scores.max(axis=1).toarray().ravel()
+
+    matches = []
+    for i, (j, score) in enumerate(zip(best, best_scores)):
+        if score > 0 and score >= threshold:
+            matches.append(
+                SegmentMatch(
+                    original_segments[j],
+                    plagiarized_segments[i],
+                    min(float(score), 1.0),
+                )
+            )
+    return matches
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：输出待测文档中与原文相似的片段及其位置
+    """
+    parser = argparse.ArgumentParser(description="论文查重：片段级比较")
+    parser.add_argument("original_file", help="原文文件")
+    parser.add_argument("plagiarized_file", help="抄袭版论文的文件")
+    parser.add_argument(
+        "-u",
+        "--unit",
+        choices=sorted(SEGMENT_PATTERNS),
+        default="sentence",
+        help="切分单位",
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=50.0,
+        help="只输出重复率不低于该百分比的片段",
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON Lines 格式输出")
+    args = parser.parse_args(argv)
+
+    try:
+        # 输出的偏移量用于在原文件中定位片段，因此不能去除首尾空白或转换换行符
+        texts = []
+        for path in (args.original_file, args.plagiarized_file):
+            try:
+                texts.append(read_document(path))
+            except Exception as e:
+                print(describe_read_error(path, e))
+                sys.exit(1)
+        original, plagiarized = texts
+        matches = match_segments(original, plagiarized, args.unit, args.threshold / 100)
+
+        for match in matches:
+            similarity = round(match.similarity * 100, 2)
+            if args.json:
+                record = {
+                    "original": [match.original.start, match.original.end],
+                    "plagiarized": [match.plagiarized.start, match.plagiarized.end],
+                    "similarity": similarity,
+                    "text": match.plagiarized.text,
+                }
+                print(json.dumps(record, ensure_ascii=False))
+            else:
+                source, copy = match.original, match.plagiarized
+                print(
+                    f"{similarity:.2f}%\t"
+                    f"原文[{source.start}:{source.end}]\t"
+                    f"抄袭[{copy.start}:{copy.end}]\t{copy.text}"
+                )
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
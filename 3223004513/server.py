@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻查重服务
+进程常驻内存，分词模型、停用词表、同义词表以及可选的参考语料索引只加载一次；
+通过 TCP 或 Unix 套接字接收 JSON Lines 请求，CPU 密集的 preprocess 在进程池中执行
+
+请求格式（每行一个 JSON 对象）：
+    {"op": "ping"}
+    {"op": "compare", "text1": "...", "text2": "..."}
+    {"op": "query", "text": "...", "top_k": 10}
+    {"op": "query", "words": ["...", ...], "top_k": 10}   # 已分词的查询，跳过 preprocess
+    {"op": "info"}
+
+响应格式：
+    {"ok": true, ...} 或 {"ok": false, "error": "错误信息"}
+"""
+import argparse
+import asyncio
+import json
+import socket
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from corpus import CorpusIndex
+from ingest import IngestError, ingest_files
+from main import calculate_cosine_similarity, init_jieba, preprocess
+from weighting import WEIGHTINGS, IdfTable
+
+Address = Union[Tuple[str, int], str]
+
+# 单个请求的最大字节数
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class SimilarityServer:
+    """
+    查重服务：持有常驻的分词进程池和参考语料索引
+
+    参考语料的查询在线程池中执行（索引只读，NumPy/SciPy 运算时释放 GIL），
+    大查询不会阻塞事件循环上的其他连接
+    """
+
+    def __init__(
+        self, index: Optional[CorpusIndex] = None, workers: Optional[int] = None
+    ) -> None:
+        self.index = index
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=init_jieba)
+        self.query_executor = ThreadPoolExecutor(max_workers=workers)
+        self._server: Optional[asyncio.Server] = None
+
+    async def _preprocess(self, *texts: str) -> List[List[str]]:
+        loop = asyncio.get_running_loop()
+        return list(
+            await asyncio.gather(
+                *(
+                    loop.run_in_executor(self.executor, preprocess, text)
+                    for text in texts
+                )
+            )
+        )
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        处理一个请求
+
+        Args:
+            request: 解码后的请求对象
+
+        Returns:
+            响应对象
+        """
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+
+        if op == "compare":
+            text1 = request.get("text1")
+            text2 = request.get("text2")
+            if not isinstance(text1, str) or not isinstance(text2, str):
+                return {
+                    "ok": False,
+                    "error": "compare 请求需要字符串字段 text1 和 text2",
+                }
+            # 与命令行使用同一个函数，空文本、规范化文本相同等情况的处理规则一致
+            loop = asyncio.get_running_loop()
+            similarity = await loop.run_in_executor(
+                self.executor, calculate_cosine_similarity, text1, text2
+            )
+            return {"ok": True, "similarity": similarity}
+
+        if op == "info":
+            return {
+                "ok": True,
+                "documents": len(self.index) if self.index is not None else 0,
+            }
+
+        if op == "query":
+            text = request.get("text")
+            words = request.get("words")
+            top_k = request.get("top_k", 10)
+            if words is not None:
+                valid = isinstance(words, list) and all(
+                    isinstance(word, str) for word in words
+                )
+            else:
+                valid = isinstance(text, str)
+            if not valid or not isinstance(top_k, int):
+                return {
+                    "ok": False,
+                    "error": "query 请求需要字符串字段 text（或字符串列表 words）和整数字段 top_k",
+                }
+            if self.index is None:
+                return {"ok": False, "error": "服务未加载参考语料"}
+            if words is None:
+                assert isinstance(text, str)
+                (words,) = await self._preprocess(text)
+            loop = asyncio.get_running_loop()
+            matches = await loop.run_in_executor(
+                self.query_executor, self.index.query_tokens, words, top_k
+            )
+            return {
+                "ok": True,
+                "matches": [[doc_id, score] for doc_id, score in matches],
+            }
+
+        return {"ok": False, "error": f"未知的操作：{op}"}
+
+    async def _respond(self, line: bytes) -> Dict[str, Any]:
+        # 只有无法解码的请求行才是格式错误，处理合法请求时抛出的异常一律报告为处理错误
+        try:
+            request = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return {"ok": False, "error": f"请求格式错误：{e}"}
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "请求格式错误：请求必须是 JSON 对象"}
+        try:
+            return await self.handle_request(request)
+        except Exception as e:
+            return {"ok": False, "error": f"处理请求时出错：{e}"}
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    response: Dict[str, Any] = {"ok": False, "error": "请求过大"}
+                    writer.write(
+                        json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+                    )
+                    break
+                if not line:
+                    break
+                response = await self._respond(line)
+                writer.write(
+                    json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+                )
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 0, unix_path: Optional[str] = None
+    ) -> asyncio.Server:
+        """
+        开始监听，unix_path 不为空时监听 Unix 套接字，否则监听 TCP 端口
+
+        Returns:
+            asyncio 服务对象
+        """
+        if unix_path:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=unix_path, limit=MAX_REQUEST_BYTES
+            )
+        else:
+            self._server = await asyncio.start_server(
+                self._handle_connection, host, port, limit=MAX_REQUEST_BYTES
+            )
+        return self._server
+
+    @property
+    def address(self) -> Address:
+        """
+        实际监听的地址：TCP 为 (主机, 端口)，Unix 套接字为路径
+        """
+        if self._server is None:
+            raise RuntimeError("服务尚未启动")
+        sockname = self._server.sockets[0].getsockname()
+        return sockname if isinstance(sockname, str) else (sockname[0], sockname[1])
+
+    async def serve_forever(self) -> None:
+        """
+        持续处理请求直到被取消
+        """
+        if self._server is None:
+            raise RuntimeError("服务尚未启动")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self) -> None:
+        """
+        停止监听并关闭进程池和查询线程池
+        """
+        if self._server is not None:
+            self._server.close()
+        self.executor.shutdown(wait=False)
+        self.query_executor.shutdown(wait=False)
+
+
+def send_request(
+    address: Address, request: Dict[str, Any], timeout: float = 60.0
+) -> Dict[str, Any]:
+    """
+    向查重服务发送一个请求并等待响应
+
+    Args:
+        address: TCP 地址 (主机, 端口) 或 Unix 套接字路径
+        request: 请求对象
+        timeout: 超时时间（秒）
+
+    Returns:
+        响应对象
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(address)
+    else:
+        sock = socket.create_connection(address, timeout=timeout)
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ConnectionError("服务端关闭了连接")
+    return json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：启动常驻查重服务
+    """
+    parser = argparse.ArgumentParser(description="论文查重常驻服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--unix", help="改为监听该路径的 Unix 套接字")
+    parser.add_argument(
+        "--corpus", nargs="*", default=[], help="预先加载的参考论文文件"
+    )
+    parser.add_argument("-j", "--workers", type=int, help="分词进程数，默认为 CPU 核数")
+    parser.add_argument(
+        "--weighting", choices=WEIGHTINGS, default="tf", help="参考语料索引的加权方式"
+    )
+    parser.add_argument(
+        "--idf", help="tfidf、bm25 使用的 IDF 表；分片部署时各分片应共用同一张全局表"
+    )
+    args = parser.parse_args(argv)
+
+    init_jieba()
+    index = None
+    if args.corpus:
+        print("正在构建参考语料索引...")
+        # 无法读取的参考文件只报告并跳过，不影响服务启动
+        errors: List[IngestError] = []
+        index = CorpusIndex.from_tokens(
+            ingest_files(args.corpus, errors, workers=args.workers),
+            weighting=args.weighting,
+            idf_table=IdfTable.load(args.idf) if args.idf else None,
+        )
+        for error in errors:
+            print(error.message, file=sys.stderr)
+
+    server = SimilarityServer(index, args.workers)
+
+    async def run() -> None:
+        await server.start(args.host, args.port, args.unix)
+        print(f"查重服务已启动：{server.address}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n服务已停止")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分片参考语料库查询
+参考文档按编号的哈希分配到多个分片，每个分片是一个持有部分索引的常驻查重服务（server.py），
+可以运行在本机的不同进程或不同主机上。协调器只对待测文本分词一次，把词列表并发发送给全部分片，
+收集各分片的 top-k 后合并为全局 top-k。
+
+余弦相似度只依赖待测文本和单篇参考文档，因此 tf、sublinear 加权下分片查询的结果与单机索引相同；
+tfidf、bm25 加权需要各分片加载同一张全局 IDF 表（server.py --idf）
+"""
+import argparse
+import asyncio
+import heapq
+import multiprocessing
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from corpus import CorpusIndex
+from ingest import IngestError, ingest_files
+from main import preprocess, read_file
+from server import Address, SimilarityServer, send_request
+from weighting import WEIGHTINGS, IdfTable
+
+Tokenizer = Callable[[str], List[str]]
+
+# 等待本地分片进程启动（包括构建索引）的最长时间（秒）
+SHARD_START_TIMEOUT = 600.0
+
+
+def shard_of(doc_id: str, n_shards: int) -> int:
+    """
+    文档所属的分片号，与进程和 Python 的哈希随机化无关
+
+    Args:
+        doc_id: 文档编号
+        n_shards: 分片数
+
+    Returns:
+        0 到 n_shards - 1 之间的分片号
+    """
+    if n_shards < 1:
+        raise ValueError("分片数必须为正整数")
+    return zlib.crc32(doc_id.encode("utf-8")) % n_shards
+
+
+def partition(doc_ids: Iterable[str], n_shards: int) -> List[List[str]]:
+    """
+    将文档编号按 shard_of 分配到各分片，分片内保持输入顺序
+    """
+    shards: List[List[str]] = [[] for _ in range(n_shards)]
+    for doc_id in doc_ids:
+        shards[shard_of(doc_id, n_shards)].append(doc_id)
+    return shards
+
+
+def merge_matches(
+    results: Iterable[Sequence[Tuple[str, float]]], top_k: int
+) -> List[Tuple[str, float]]:
+    """
+    合并各分片的 top-k 结果
+
+    Args:
+        results: 各分片按相似度降序排列的 (文档编号, 相似度) 列表
+        top_k: 返回的文档数
+
+    Returns:
+        全局按相似度降序排列的 top_k 个结果，相似度相同时按文档编号排序
+    """
+    if top_k <= 0:
+        return []
+    merged = (match for matches in results for match in matches)
+    return heapq.nsmallest(top_k, merged, key=lambda match: (-match[1], match[0]))
+
+
+def parse_address(text: str) -> Address:
+    """
+    解析节点地址："主机:端口" 为 TCP 地址，其他为 Unix 套接字路径
+    """
+    host, sep, port = text.rpartition(":")
+    if sep and host and port.isdigit():
+        return (host, int(port))
+    return text
+
+
+class ShardCoordinator:
+    """
+    分片查询协调器：分发查询、收集并合并各分片的结果
+    """
+
+    def __init__(
+        self,
+        addresses: Sequence[Address],
+        tokenizer: Tokenizer = preprocess,
+        timeout: float = 60.0,
+    ) -> None:
+        if not addresses:
+            raise ValueError("至少需要一个分片")
+        self.addresses = list(addresses)
+        self.tokenizer = tokenizer
+        self.timeout = timeout
+        # 每个分片一个线程，全部分片的请求同时发出
+        self._executor = ThreadPoolExecutor(max_workers=len(self.addresses))
+
+    def __enter__(self) -> "ShardCoordinator":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _scatter(self, request: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        向全部分片发送同一请求
+
+        Raises:
+            RuntimeError: 任一分片返回错误
+        """
+        futures = [
+            self._executor.submit(send_request, address, request, self.timeout)
+            for address in self.addresses
+        ]
+        responses = [future.result() for future in futures]
+        for address, response in zip(self.addresses, responses):
+            if not response.get("ok"):
+                raise RuntimeError(f"分片 {address} 返回错误：{response.get('error')}")
+        return responses
+
+    def documents(self) -> List[int]:
+        """
+        返回各分片持有的文档数
+        """
+        return [response["documents"] for response in self._scatter({"op": "info"})]
+
+    def query_tokens(
+        self, words: List[str], top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        返回全部分片中与已分词文本最相似的 top_k 篇参考文档
+
+        Args:
+            words: 待测文本的词列表
+            top_k: 返回的文档数
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        if top_k <= 0:
+            return []
+        responses = self._scatter({"op": "query", "words": words, "top_k": top_k})
+        return merge_matches(
+            (
+                [(doc_id, float(score)) for doc_id, score in response["matches"]]
+                for response in responses
+            ),
+            top_k,
+        )
+
+    def query(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        返回全部分片中与待测文本最相似的 top_k 篇参考文档
+        """
+        return self.query_tokens(self.tokenizer(text), top_k)
+
+    def close(self) -> None:
+        """
+        关闭请求线程池，不影响分片服务
+        """
+        self._executor.shutdown(wait=False)
+
+
+def _serve_shard(
+    file_paths: List[str],
+    weighting: str,
+    idf_path: Optional[str],
+    workers: int,
+    conn: Connection,
+) -> None:
+    # 本地分片进程：构建索引、启动服务、报告地址，父进程发送停止信号或退出后关闭；
+    # 无法读取的参考文件只报告并跳过，不会使整个分片退出
+    errors: List[IngestError] = []
+    index = CorpusIndex.from_tokens(
+        ingest_files(file_paths, errors, workers=workers),
+        weighting=weighting,
+        idf_table=IdfTable.load(idf_path) if idf_path else None,
+    )
+    for error in errors:
+        print(error.message, file=sys.stderr)
+    server = SimilarityServer(index, workers)
+
+    async def run() -> None:
+        await server.start("127.0.0.1", 0)
+        conn.send(server.address)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, conn.recv)
+        except EOFError:
+            pass
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.close()
+        conn.close()
+
+
+class LocalCluster:
+    """
+    在本机启动若干分片进程，每个进程持有一部分参考文件的索引，用于测试和单机多核部署
+    """
+
+    def __init__(
+        self,
+        file_paths: Iterable[str],
+        n_shards: int,
+        weighting: str = "tf",
+        idf_path: Optional[str] = None,
+        workers: int = 1,
+    ) -> None:
+        """
+        Args:
+            file_paths: 参考文件路径
+            n_shards: 分片数
+            weighting: 加权方式
+            idf_path: tfidf、bm25 使用的全局 IDF 表
+            workers: 每个分片的分词进程数
+        """
+        context = multiprocessing.get_context("spawn")
+        self.shards = partition(file_paths, n_shards)
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self._connections: List[Connection] = []
+        self.addresses: List[Address] = []
+        try:
+            for shard_paths in self.shards:
+                parent, child = context.Pipe()
+                process = context.Process(
+                    target=_serve_shard,
+                    args=(shard_paths, weighting, idf_path, workers, child),
+                    daemon=True,
+                )
+                process.start()
+                child.close()
+                self.processes.append(process)
+                self._connections.append(parent)
+            for started, conn in zip(self.processes, self._connections):
+                if not conn.poll(SHARD_START_TIMEOUT):
+                    raise RuntimeError(f"分片进程 {started.pid} 启动超时")
+                self.addresses.append(conn.recv())
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "LocalCluster":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def coordinator(self, tokenizer: Tokenizer = preprocess) -> ShardCoordinator:
+        """
+        返回连接到全部本地分片的协调器
+        """
+        return ShardCoordinator(self.addresses, tokenizer)
+
+    def close(self) -> None:
+        """
+        通知全部分片进程退出并等待其结束
+        """
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._connections = []
+        self.processes = []
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：在分片语料库中查找与待测论文最相似的若干篇参考论文
+    """
+    parser = argparse.ArgumentParser(description="论文查重：分片语料库查询")
+    parser.add_argument("query_file", help="待检测论文的文件")
+    parser.add_argument(
+        "reference_files", nargs="*", help="在本机启动分片时使用的参考论文文件"
+    )
+    parser.add_argument(
+        "-k", "--top-k", type=int, default=10, help="输出的最相似文档数"
+    )
+    parser.add_argument(
+        "-s", "--shards", type=int, default=2, help="本机启动的分片进程数"
+    )
+    parser.add_argument(
+        "--nodes",
+        nargs="+",
+        help="已运行的分片服务地址（主机:端口 或 Unix 套接字路径）",
+    )
+    parser.add_argument(
+        "--weighting", choices=WEIGHTINGS, default="tf", help="本机分片的加权方式"
+    )
+    parser.add_argument("--idf", help="本机分片共用的全局 IDF 表")
+    args = parser.parse_args(argv)
+
+    if not args.nodes and not args.reference_files:
+        parser.error("需要参考论文文件或 --nodes")
+
+    cluster: Optional[LocalCluster] = None
+    try:
+        text = read_file(args.query_file)
+        if args.nodes:
+            addresses = [parse_address(node) for node in args.nodes]
+        else:
+            print(f"正在启动 {args.shards} 个分片...")
+            cluster = LocalCluster(
+                args.reference_files, args.shards, args.weighting, args.idf
+            )
+            addresses = cluster.addresses
+
+        print("正在计算相似度...")
+        with ShardCoordinator(addresses) as coordinator:
+            matches = coordinator.query(text, args.top_k)
+
+        for doc_id, similarity in matches:
+            print(f"{similarity * 100:.2f}%\t{doc_id}")
+
+    except (OSError, RuntimeError) as e:
+        print(f"错误：分片查询失败 - {e}", file=sys.stderr)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+    finally:
+        if cluster is not None:
+            cluster.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可增量更新的参考语料库
+以 preprocess 的输出为基础，持久化词表、每篇文档的词频向量和文档频率，
+支持追加、删除和更新文档而无需重建整个索引
+
+存储采用分段结构：新文档先进入内存缓冲区，写盘时生成一个不可变的段文件；
+删除只记录墓碑，由合并（可在后台线程中执行）统一清理。目录结构：
+
+    manifest.json   段列表、墓碑、词表长度、文档频率文件名、写入代数和下一个段号
+    vocab.jsonl     词表，每行一个 JSON 字符串，行号即词语编号；只追加新词，不整体重写
+    df-000001.npy   按词语编号排列的文档频率
+    seg-000001.npz  段文件：文档编号、CSR 词频矩阵（行模长在加载时由矩阵重新计算）
+
+除词表外的文件都先写临时文件再原子替换；替换 manifest.json 是一次写入的提交点。
+词表只增不减，写入时先截掉上次中断留下的未提交行再追加新词，读取时只读清单记录的长度；
+文档频率每次写入新文件，因此在任意时刻中断都不会读到彼此不一致的元数据
+"""
+import json
+import os
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from corpus import Vocabulary, row_norms
+from main import preprocess
+
+Tokenizer = Callable[[str], List[str]]
+
+STORE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+VOCAB_FILE = "vocab.jsonl"
+# 旧版本清单没有记录文档频率文件名时使用的文件
+DF_FILE = "df.npy"
+
+# 缓冲区中的文档：词语编号数组 + 对应词频数组
+_BufferedDoc = Tuple[np.ndarray, np.ndarray]
+
+
+def _write_temp(file_path: str, write: Callable[[str], None]) -> str:
+    # 在目标文件所在目录写临时文件，返回其路径，由调用方替换为目标文件
+    directory = os.path.dirname(file_path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path
+
+
+def _atomic_write(file_path: str, write: Callable[[str], None]) -> None:
+    tmp_path = _write_temp(file_path, write)
+    try:
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class Segment:
+    """
+    不可变的文档段：CSR 词频矩阵、行模长，以及标记已删除文档的存活掩码
+
+    段文件只保存文档编号和矩阵，行模长在构建或加载时由矩阵计算
+    """
+
+    def __init__(
+        self, name: str, doc_ids: List[str], matrix: sparse.csr_matrix
+    ) -> None:
+        self.name = name
+        self.doc_ids = doc_ids
+        self.matrix = matrix
+        self.norms = row_norms(matrix)
+        self.alive = np.ones(len(doc_ids), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @classmethod
+    def from_documents(
+        cls,
+        name: str,
+        documents: Iterable[Tuple[str, np.ndarray, np.ndarray]],
+        width: int,
+    ) -> "Segment":
+        """
+        由 (文档编号, 词语编号, 词频) 序列构建段
+        """
+        doc_ids: List[str] = []
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        for doc_id, ids, counts in documents:
+            doc_ids.append(doc_id)
+            indices.append(ids)
+            data.append(counts)
+            indptr.append(indptr[-1] + len(ids))
+        matrix = sparse.csr_matrix(
+            (
+                (
+                    np.concatenate(data).astype(np.float32)
+                    if data
+                    else np.empty(0, np.float32)
+                ),
+                (
+                    np.concatenate(indices).astype(np.int32)
+                    if indices
+                    else np.empty(0, np.int32)
+                ),
+                np.asarray(indptr, dtype=np.int64),
+            ),
+            shape=(len(doc_ids), width),
+        )
+        return cls(name, doc_ids, matrix)
+
+    def save(self, file_path: str) -> None:
+        def write(tmp_path: str) -> None:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    doc_ids=np.array(self.doc_ids, dtype=str),
+                    indptr=self.matrix.indptr,
+                    indices=self.matrix.indices,
+                    data=self.matrix.data,
+                    shape=np.array(self.matrix.shape, dtype=np.int64),
+                )
+
+        _atomic_write(file_path, write)
+
+    @classmethod
+    def load(cls, name: str, file_path: str) -> "Segment":
+        with np.load(file_path, allow_pickle=False) as arrays:
+            matrix = sparse.csr_matrix(
+                (arrays["data"], arrays["indices"], arrays["indptr"]),
+                shape=tuple(arrays["shape"]),
+            )
+            doc_ids = [str(doc_id) for doc_id in arrays["doc_ids"]]
+        return cls(name, doc_ids, matrix)
+
+
+class CorpusStore:
+    """
+    持久化、可增量更新的参考语料库
+
+    线程安全：查询与写入可以并发进行，合并可以在后台线程中执行
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        tokenizer: Tokenizer = preprocess,
+        flush_threshold: int = 1000,
+    ) -> None:
+        self.directory = directory
+        self.tokenizer = tokenizer
+        self.flush_threshold = flush_threshold
+        self.vocabulary = Vocabulary()
+        self.df = np.zeros(0, dtype=np.int64)
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._segments: List[Segment] = []
+        self._locations: Dict[str, Tuple[Segment, int]] = {}
+        self._buffer: "OrderedDict[str, _BufferedDoc]" = OrderedDict()
+        self._buffer_segment: Optional[Segment] = None
+        self._persisted_vocab = 0
+        # vocab.jsonl 中已提交部分的字节数，追加新词前截断到这里
+        self._vocab_bytes = 0
+        self._next_segment = 1
+        self._generation = 0
+        self._df_file: Optional[str] = None
+        self._dirty = False
+        self._compacting: Optional[Set[str]] = None
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(os.path.join(directory, MANIFEST_FILE)):
+            self._load()
+
+    def __enter__(self) -> "CorpusStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._locations) + len(self._buffer)
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            return doc_id in self._locations or doc_id in self._buffer
+
+    # ---- 持久化 ----
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self) -> None:
+        with open(self._path(MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"语料库 '{self.directory}' 版本不匹配")
+
+        # 词表只增不减，比清单新的词表可能多出未提交的词语，只读取清单记录的长度
+        vocab_size = manifest.get("vocab_size")
+        with open(self._path(VOCAB_FILE), "rb") as f:
+            for i, line in enumerate(f):
+                if vocab_size is not None and i >= vocab_size:
+                    break
+                self.vocabulary.add(json.loads(line))
+                self._vocab_bytes += len(line)
+        self._persisted_vocab = len(self.vocabulary)
+        self._generation = manifest.get("generation", 0)
+        self._df_file = manifest.get("df", DF_FILE)
+        self.df = np.load(self._path(self._df_file))
+        self.df = np.pad(self.df, (0, len(self.vocabulary) - len(self.df)))
+
+        self._next_segment = manifest["next_segment"]
+        deleted = manifest.get("deleted", {})
+        for name in manifest["segments"]:
+            segment = Segment.load(name, self._path(name))
+            segment.alive[deleted.get(name, [])] = False
+            self._segments.append(segment)
+            for row in np.flatnonzero(segment.alive):
+                self._locations[segment.doc_ids[row]] = (segment, int(row))
+
+    def _write_metadata(self) -> None:
+        # 先向词表追加新词，再把文档频率和清单写入临时文件并依次替换；替换清单即提交。
+        # 清单记录的词表长度不变，追加的行在提交前不会被读取
+        vocab_size = len(self.vocabulary)
+        vocab_path = self._path(VOCAB_FILE)
+        new_tokens = self.vocabulary.id_to_token[self._persisted_vocab: vocab_size]
+        data = b"".join(
+            json.dumps(token, ensure_ascii=False).encode("utf-8") + b"\n"
+            for token in new_tokens
+        )
+        if data or not os.path.exists(vocab_path):
+            with open(vocab_path, "ab") as f:
+                f.truncate(self._vocab_bytes)
+                f.write(data)
+
+        staged: List[Tuple[str, str]] = []
+        try:
+            df = self.df[:vocab_size].copy()
+            # 每次写入使用新的文件名，不覆盖当前清单引用的文件
+            generation = self._generation + 1
+            df_file = f"df-{generation:06d}.npy"
+
+            def write_df(tmp_path: str) -> None:
+                with open(tmp_path, "wb") as f:
+                    np.save(f, df)
+
+            staged.append(
+                (_write_temp(self._path(df_file), write_df), self._path(df_file))
+            )
+
+            manifest = {
+                "version": STORE_FORMAT_VERSION,
+                "next_segment": self._next_segment,
+                "segments": [segment.name for segment in self._segments],
+                "deleted": {
+                    segment.name: np.flatnonzero(~segment.alive).tolist()
+                    for segment in self._segments
+                    if not segment.alive.all()
+                },
+                "generation": generation,
+                "vocab_size": vocab_size,
+                "df": df_file,
+            }
+
+            def write_manifest(tmp_path: str) -> None:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, ensure_ascii=False)
+
+            manifest_path = self._path(MANIFEST_FILE)
+            staged.append((_write_temp(manifest_path, write_manifest), manifest_path))
+
+            while staged:
+                tmp_path, file_path = staged[0]
+                os.replace(tmp_path, file_path)
+                staged.pop(0)
+        finally:
+            for tmp_path, _ in staged:
+                os.remove(tmp_path)
+
+        old_df_file, self._df_file = self._df_file, df_file
+        if old_df_file is not None:
+            try:
+                os.remove(self._path(old_df_file))
+            except OSError:
+                pass
+        self._generation = generation
+        self._persisted_vocab = vocab_size
+        self._vocab_bytes += len(data)
+        self._dirty = False
+
+    def _new_segment_name(self) -> str:
+        name = f"seg-{self._next_segment:06d}.npz"
+        self._next_segment += 1
+        return name
+
+    def flush(self) -> None:
+        """
+        将缓冲区中的文档写为新的段文件，并持久化词表、文档频率和墓碑
+        """
+        with self._lock:
+            if self._buffer:
+                segment = Segment.from_documents(
+                    self._new_segment_name(),
+                    (
+                        (doc_id, ids, counts)
+                        for doc_id, (ids, counts) in self._buffer.items()
+                    ),
+                    len(self.vocabulary),
+                )
+                segment.save(self._path(segment.name))
+                self._segments.append(segment)
+                for row, doc_id in enumerate(segment.doc_ids):
+                    self._locations[doc_id] = (segment, row)
+                self._buffer.clear()
+                self._buffer_segment = None
+                self._dirty = True
+            if self._dirty or not os.path.exists(self._path(MANIFEST_FILE)):
+                self._write_metadata()
+
+    # ---- 写入 ----
+
+    def add(self, doc_id: str, words: List[str]) -> None:
+        """
+        追加一篇已分词的文档
+
+        Raises:
+            KeyError: 文档编号已存在
+        """
+        counts = Counter(words)
+        with self._lock:
+            if doc_id in self:
+                raise KeyError(f"文档 '{doc_id}' 已存在")
+            ids = np.fromiter(
+                (self.vocabulary.add(word) for word in counts),
+                dtype=np.int32,
+                count=len(counts),
+            )
+            if len(self.vocabulary) > len(self.df):
+                self.df = np.pad(
+                    self.df,
+                    (0, max(len(self.vocabulary), 2 * len(self.df)) - len(self.df)),
+                )
+            self.df[ids] += 1
+            self._buffer[doc_id] = (
+                ids,
+                np.fromiter(counts.values(), dtype=np.float32, count=len(counts)),
+            )
+            self._buffer_segment = None
+            if len(self._buffer) >= self.flush_threshold:
+                self.flush()
+
+    def add_text(self, doc_id: str, text: str) -> None:
+        """
+        追加一篇原始文本
+        """
+        self.add(doc_id, self.tokenizer(text))
+
+    def delete(self, doc_id: str) -> None:
+        """
+        删除文档：缓冲区中的文档直接移除，已写盘的文档记录墓碑
+
+        Raises:
+            KeyError: 文档不存在
+        """
+        with self._lock:
+            if doc_id in self._buffer:
+                ids, _ = self._buffer.pop(doc_id)
+                self._buffer_segment = None
+            else:
+                segment, row = self._locations.pop(doc_id)
+                segment.alive[row] = False
+                start, end = segment.matrix.indptr[row], segment.matrix.indptr[row + 1]
+                ids = segment.matrix.indices[start:end]
+                self._dirty = True
+                if self._compacting is not None:
+                    self._compacting.add(doc_id)
+            self.df[ids] -= 1
+
+    def update(self, doc_id: str, words: List[str]) -> None:
+        """
+        更新文档内容，文档不存在时直接追加
+        """
+        with self._lock:
+            if doc_id in self:
+                self.delete(doc_id)
+            self.add(doc_id, words)
+
+    def update_text(self, doc_id: str, text: str) -> None:
+        """
+        用原始文本更新文档内容
+        """
+        self.update(doc_id, self.tokenizer(text))
+
+    # ---- 合并 ----
+
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
+        """
+        将所有段合并为一个段并清除墓碑
+
+        Args:
+            background: 为 True 时在后台线程中合并并立即返回该线程
+
+        Returns:
+            后台合并线程，前台合并时返回 None
+        """
+        if background:
+            thread = threading.Thread(target=self._compact, daemon=True)
+            thread.start()
+            return thread
+        self._compact()
+        return None
+
+    def _compact(self) -> None:
+        with self._compact_lock:
+            with self._lock:
+                self.flush()
+                segments = list(self._segments)
+                if len(segments) <= 1 and all(
+                    segment.alive.all() for segment in segments
+                ):
+                    return
+                # 合并期间的删除会记录下来，合并完成后在新段上补记墓碑
+                snapshot = [(segment, segment.alive.copy()) for segment in segments]
+                width = len(self.vocabulary)
+                name = self._new_segment_name()
+                self._compacting = set()
+
+            def documents() -> Iterable[Tuple[str, np.ndarray, np.ndarray]]:
+                for segment, alive in snapshot:
+                    indptr, indices, data = (
+                        segment.matrix.indptr,
+                        segment.matrix.indices,
+                        segment.matrix.data,
+                    )
+                    for row in np.flatnonzero(alive):
+                        start, end = indptr[row], indptr[row + 1]
+                        yield segment.doc_ids[row], indices[start:end], data[start:end]
+
+            try:
+                merged = Segment.from_documents(name, documents(), width)
+                merged.save(self._path(name))
+            except BaseException:
+                with self._lock:
+                    self._compacting = None
+                raise
+
+            with self._lock:
+                deleted = self._compacting
+                self._compacting = None
+                rows = {doc_id: row for row, doc_id in enumerate(merged.doc_ids)}
+                for doc_id in deleted:
+                    if doc_id in rows:
+                        merged.alive[rows[doc_id]] = False
+                for doc_id, row in rows.items():
+                    if merged.alive[row]:
+                        self._locations[doc_id] = (merged, row)
+
+                compacted = {id(segment) for segment in segments}
+                self._segments = [merged] + [
+                    s for s in self._segments if id(s) not in compacted
+                ]
+                self._write_metadata()
+
+            for segment in segments:
+                try:
+                    os.remove(self._path(segment.name))
+                except OSError:
+                    pass
+
+    # ---- 查询 ----
+
+    def document_frequency(self, token: str) -> int:
+        """
+        包含该词语的存活文档数
+        """
+        with self._lock:
+            token_id = self.vocabulary.get(token)
+            return 0 if token_id is None else int(self.df[token_id])
+
+    def _searchable_segments(self) -> List[Segment]:
+        segments = list(self._segments)
+        if self._buffer:
+            if self._buffer_segment is None:
+                self._buffer_segment = Segment.from_documents(
+                    "buffer",
+                    (
+                        (doc_id, ids, counts)
+                        for doc_id, (ids, counts) in self._buffer.items()
+                    ),
+                    len(self.vocabulary),
+                )
+            segments.append(self._buffer_segment)
+        return segments
+
+    def query_tokens(
+        self, words: List[str], top_k: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        返回与已分词文本余弦相似度最高的 top_k 篇存活文档
+
+        Args:
+            words: 待测文本的词列表
+            top_k: 返回的文档数
+
+        Returns:
+            按相似度降序排列的 (文档编号, 相似度) 列表
+        """
+        if not words or top_k <= 0:
+            return []
+        counts = Counter(words)
+        query_norm = float(np.sqrt(sum(c * c for c in counts.values())))
+
+        with self._lock:
+            query = np.zeros(len(self.vocabulary), dtype=np.float64)
+            for word, count in counts.items():
+                token_id = self.vocabulary.get(word)
+                if token_id is not None:
+                    query[token_id] = count
+            segments = [
+                (segment, segment.alive.copy())
+                for segment in self._searchable_segments()
+            ]
+
+        results: List[Tuple[str, float]] = []
+        for segment, alive in segments:
+            if not len(segment):
+                continue
+            dots = segment.matrix.dot(query[: segment.matrix.shape[1]])
+            valid = alive & (segment.norms > 0)
+            scores = np.zeros(len(segment), dtype=np.float64)
+            scores[valid] = dots[valid] / (segment.norms[valid] * query_norm)
+            candidates = np.flatnonzero(alive)
+            if len(candidates) > top_k:
+                top = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+                candidates = candidates[top]
+            results.extend(
+                (segment.doc_ids[row], float(scores[row])) for row in candidates
+            )
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:top_k]
+
+    def query(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        返回与待测文本最相似的 top_k 篇存活文档
+        """
+        return self.query_tokens(self.tokenizer(text), top_k)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+大文件流式查重
+按固定大小分块读取文件并在句子边界切分，逐块预处理后累加到词频计数中，
+峰值内存与分块大小成正比，而不是与文档大小成正比
+"""
+import argparse
+import sys
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from main import counter_cosine_similarity, preprocess, write_file
+
+Tokenizer = Callable[[str], List[str]]
+
+# 默认每块读取的字符数
+DEFAULT_CHUNK_SIZE = 1 << 20
+# 句子结束符，分块只在这些字符之后切分，避免把一个词切成两半
+SENTENCE_ENDINGS = "。！？!?；;\n"
+
+
+def _last_boundary(text: str) -> int:
+    return max(text.rfind(ending) for ending in SENTENCE_ENDINGS)
+
+
+def iter_sentence_chunks(
+    file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    按块读取 UTF-8 文本文件，每块在最后一个句子结束符处切分
+
+    一块中找不到句子结束符时，累积到 2 倍块大小后强制切分，保证内存有界
+
+    Args:
+        file_path: 文件路径
+        chunk_size: 每次读取的字符数
+
+    Yields:
+        以完整句子结尾的文本块
+
+    Raises:
+        OSError: 文件无法打开或读取
+        UnicodeDecodeError: 文件编码不是 UTF-8
+    """
+    pending = ""
+    with open(file_path, "r", encoding="utf-8-sig") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            cut = _last_boundary(pending) + 1
+            if cut == 0 and len(pending) >= 2 * chunk_size:
+                cut = len(pending)
+            if cut > 0:
+                yield pending[:cut]
+                pending = pending[cut:]
+    if pending:
+        yield pending
+
+
+def count_tokens(chunks: Iterable[str], tokenizer: Tokenizer = preprocess) -> Counter:
+    """
+    逐块预处理文本并累加词频
+
+    Args:
+        chunks: 文本块序列
+        tokenizer: 预处理函数
+
+    Returns:
+        整篇文本的词频
+    """
+    counts: Counter = Counter()
+    for chunk in chunks:
+        counts.update(tokenizer(chunk))
+    return counts
+
+
+def count_file_tokens(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    tokenizer: Tokenizer = preprocess,
+) -> Counter:
+    """
+    流式计算文件的词频
+    """
+    return count_tokens(iter_sentence_chunks(file_path, chunk_size), tokenizer)
+
+
+def stream_cosine_similarity(
+    file_path1: str, file_path2: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> float:
+    """
+    流式计算两个文件的余弦相似度
+
+    Args:
+        file_path1: 文件1路径
+        file_path2: 文件2路径
+        chunk_size: 每次读取的字符数
+
+    Returns:
+        相似度得分 (0-1)
+    """
+    counts1 = count_file_tokens(file_path1, chunk_size)
+    counts2 = count_file_tokens(file_path2, chunk_size)
+
+    # 与 calculate_cosine_similarity 一致：两者都为空时视为相同
+    if not counts1 and not counts2:
+        return 1.0
+    return counter_cosine_similarity(counts1, counts2)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：流式比较两个大文件
+    """
+    parser = argparse.ArgumentParser(description="论文查重：大文件流式比较")
+    parser.add_argument("original_file", help="原文文件")
+    parser.add_argument("plagiarized_file", help="抄袭版论文的文件")
+    parser.add_argument("output_file", help="答案文件")
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每次读取的字符数"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        print("正在流式计算相似度...")
+        similarity = stream_cosine_similarity(
+            args.original_file, args.plagiarized_file, args.chunk_size
+        )
+
+        result = similarity * 100
+        write_file(args.output_file, result)
+
+        print(f"查重完成！重复率: {result:.2f}%")
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"读取文件时出错：{e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
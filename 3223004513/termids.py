@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词语编号表示
+将词语驻留为 int32 编号，文档表示为按编号排序的 (编号, 词频) 数组，
+点积只需在两个有序编号数组中查找共同编号，避免逐次比较时重复哈希字符串和构建稠密向量。
+
+编号只在同一词表内有意义：相互比较的向量必须由同一个词表编码，
+词表由调用方按索引或按一批比较创建，随之释放，不在进程内无限增长
+"""
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class Vocabulary:
+    """
+    词表：将词语映射为连续的整数编号（驻留），编号即稀疏矩阵的列号
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()) -> None:
+        self.token_to_id: Dict[str, int] = {}
+        self.id_to_token: List[str] = []
+        self._lock = threading.Lock()
+        for token in tokens:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return len(self.id_to_token)
+
+    def __contains__(self, token: object) -> bool:
+        return token in self.token_to_id
+
+    def __getstate__(self) -> Dict[str, List[str]]:
+        return {"id_to_token": self.id_to_token}
+
+    def __setstate__(self, state: Dict[str, List[str]]) -> None:
+        self.__init__(state["id_to_token"])  # type: ignore
+
+    def add(self, token: str) -> int:
+        """
+        返回词语的编号，不存在时分配新编号（线程安全）
+
+        Args:
+            token: 词语
+
+        Returns:
+            词语编号
+        """
+        token_id = self.token_to_id.get(token)
+        if token_id is None:
+            with self._lock:
+                token_id = self.token_to_id.get(token)
+                if token_id is None:
+                    token_id = len(self.id_to_token)
+                    self.id_to_token.append(token)
+                    self.token_to_id[token] = token_id
+        return token_id
+
+    def get(self, token: str) -> Optional[int]:
+        """
+        查询词语编号，不在词表中时返回 None
+        """
+        return self.token_to_id.get(token)
+
+    def encode(self, words: List[str]) -> np.ndarray:
+        """
+        将词列表转换为编号数组，遇到新词时扩充词表
+
+        Args:
+            words: 词列表
+
+        Returns:
+            int32 编号数组，顺序与 words 相同
+        """
+        return np.fromiter(map(self.add, words), dtype=np.int32, count=len(words))
+
+
+class TermCounts(NamedTuple):
+    """按编号升序排列的词频向量"""
+
+    ids: np.ndarray
+    counts: np.ndarray
+
+
+def term_counts(ids: np.ndarray) -> TermCounts:
+    """
+    统计编号数组中每个编号出现的次数
+
+    Args:
+        ids: 词语编号数组
+
+    Returns:
+        按编号升序排列的 (编号, 词频)
+    """
+    unique, counts = np.unique(ids, return_counts=True)
+    return TermCounts(
+        unique.astype(np.int32, copy=False), counts.astype(np.int32, copy=False)
+    )
+
+
+def encode_counts(words: List[str], vocabulary: Vocabulary) -> TermCounts:
+    """
+    将词列表转换为按编号排序的词频向量，遇到新词时扩充词表
+
+    先按词语计数再转换编号，每个不同的词只查一次词表
+    """
+    counter = Counter(words)
+    ids = np.fromiter(map(vocabulary.add, counter), dtype=np.int32, count=len(counter))
+    counts = np.fromiter(counter.values(), dtype=np.int32, count=len(counter))
+    order = np.argsort(ids)
+    return TermCounts(ids[order], counts[order])
+
+
+def common_indices(ids1: np.ndarray, ids2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    两个升序且无重复的编号数组中共同编号的位置
+
+    在较长的数组中二分查找较短数组的每个编号，复杂度为 O(m log n)（m ≤ n），
+    不像 np.intersect1d 那样需要把两个数组拼接后重新排序
+
+    Returns:
+        (共同编号在 ids1 中的下标, 在 ids2 中的下标)，按编号升序排列
+    """
+    swap = len(ids1) > len(ids2)
+    small, large = (ids2, ids1) if swap else (ids1, ids2)
+    if not len(small) or not len(large):
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    positions = np.searchsorted(large, small)
+    positions[positions == len(large)] = 0
+    found = large[positions] == small
+    index_small, index_large = np.flatnonzero(found), positions[found]
+    return (index_large, index_small) if swap else (index_small, index_large)
+
+
+def dot(vec1: TermCounts, vec2: TermCounts) -> float:
+    """
+    两个有序词频向量的点积，只访问共同的编号
+    """
+    index1, index2 = common_indices(vec1.ids, vec2.ids)
+    return float(np.dot(vec1.counts[index1].astype(np.float64), vec2.counts[index2]))
+
+
+def norm(vec: TermCounts) -> float:
+    """
+    词频向量的 L2 模长
+    """
+    counts = vec.counts.astype(np.float64)
+    return float(np.sqrt(np.dot(counts, counts)))
+
+
+def cosine_similarity(vec1: TermCounts, vec2: TermCounts) -> float:
+    """
+    计算两个有序词频向量的余弦相似度
+
+    Returns:
+        相似度得分 (0-1)，任一向量为空时返回 0
+    """
+    if not len(vec1.ids) or not len(vec2.ids):
+        return 0.0
+    return min(dot(vec1, vec2) / (norm(vec1) * norm(vec2)), 1.0)
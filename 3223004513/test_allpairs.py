@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提交作业两两查重单元测试
+"""
+
+import io
+import json
+import unittest
+
+from main import calculate_cosine_similarity, preprocess
+from allpairs import iter_similar_pairs, write_pairs
+
+TEXTS = [
+    "今天是星期天，天气晴，今天晚上我要去看电影。",
+    "今天是周天，天气晴朗，我晚上要去看电影。",
+    "今天天气很好，我们一起去公园玩。公园里有很多人。",
+    "这是一个测试，包含标点！",
+]
+
+
+class TestIterSimilarPairs(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = [preprocess(text) for text in TEXTS]
+
+    def test_matches_pairwise_similarity(self):
+        """测试分块结果与逐对计算一致，且只输出 i < j 的文档对"""
+        pairs = list(iter_similar_pairs(self.documents, block_size=1))
+        self.assertTrue(pairs)
+        for i, j, score in pairs:
+            self.assertLess(i, j)
+            expected = calculate_cosine_similarity(TEXTS[i], TEXTS[j])
+            self.assertAlmostEqual(score, expected, places=5)
+        self.assertEqual(pairs, sorted(pairs))
+
+    def test_threshold_filters_pairs(self):
+        """测试阈值过滤低相似度文档对"""
+        pairs = list(iter_similar_pairs(self.documents, threshold=0.7))
+        self.assertEqual([(i, j) for i, j, _ in pairs], [(0, 1)])
+
+
+class TestWritePairs(unittest.TestCase):
+
+    def test_write_csv(self):
+        """测试 CSV 输出"""
+        output = io.StringIO()
+        count = write_pairs(iter([(0, 1, 0.8123)]), ["a.txt", "b.txt"], output)
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            ["doc1,doc2,similarity", "a.txt,b.txt,81.23"],
+        )
+
+    def test_write_jsonl(self):
+        """测试 JSON Lines 输出"""
+        output = io.StringIO()
+        write_pairs(iter([(0, 1, 0.5)]), ["a.txt", "b.txt"], output, "jsonl")
+        record = json.loads(output.getvalue())
+        self.assertEqual(record, {"doc1": "a.txt", "doc2": "b.txt", "similarity": 50.0})
+
+    def test_unknown_format(self):
+        """测试不支持的输出格式"""
+        with self.assertRaises(ValueError):
+            write_pairs(iter([]), [], io.StringIO(), "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查重流程基准测试单元测试
+"""
+
+import copy
+import unittest
+
+from benchmark import (
+    baseline_cosine_similarity,
+    benchmark_size,
+    compare_results,
+    evaluate_scoring,
+    evaluate_segmenters,
+    generate_corpus,
+)
+from scoring import BACKENDS
+
+
+class TestBenchmark(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.result = benchmark_size("tiny", 3, 200)
+        cls.report = {"version": 1, "results": {"tiny": cls.result}}
+
+    def test_generate_corpus_reproducible(self):
+        """测试合成语料可复现且长度正确"""
+        corpus = generate_corpus(3, 100, seed=1)
+        self.assertEqual(corpus, generate_corpus(3, 100, seed=1))
+        self.assertTrue(all(len(doc) == 100 for doc in corpus))
+
+    def test_stages_recorded(self):
+        """测试记录了每个阶段的耗时与吞吐量"""
+        stages = self.result["stages"]
+        for stage in (
+            "read_file",
+            "regex",
+            "jieba",
+            "filter",
+            "normalize_words",
+            "vectorize",
+            "score_corpus",
+        ):
+            self.assertIn(stage, stages)
+            self.assertGreater(stages[stage]["docs_per_s"], 0)
+        self.assertGreater(self.result["peak_memory_bytes"], 0)
+
+    def test_compare_detects_regression(self):
+        """测试与基线比较时发现变慢的阶段和内存增长"""
+        self.assertEqual(compare_results(self.report, self.report), [])
+        slower = copy.deepcopy(self.report)
+        slower["results"]["tiny"]["stages"]["jieba"]["seconds"] += 1.0
+        slower["results"]["tiny"]["peak_memory_bytes"] *= 2
+        regressions = compare_results(slower, self.report)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("tiny/jieba"))
+
+    def test_evaluate_segmenters(self):
+        """测试分词后端评估报告吞吐量与相对 jieba 的精度"""
+        report = evaluate_segmenters(["jieba", "bigram"], n_docs=4, doc_chars=300)
+        self.assertEqual(list(report), ["jieba", "bigram"])
+        self.assertEqual(report["jieba"]["mean_abs_error"], 0.0)
+        self.assertEqual(report["jieba"]["agreement"], 1.0)
+        for result in report.values():
+            self.assertGreater(result["mb_per_s"], 0)
+            self.assertGreaterEqual(result["max_abs_error"], result["mean_abs_error"])
+
+    def test_evaluate_scoring(self):
+        """测试计算后端评估包含基线和全部后端，且结果与基线一致"""
+        report = evaluate_scoring(n_pairs=2, doc_tokens=200, repeat=1)
+        self.assertEqual(list(report), ["baseline"] + list(BACKENDS))
+        for result in report.values():
+            self.assertGreater(result["seconds"], 0)
+            self.assertLess(result["max_abs_error"], 1e-9)
+        self.assertEqual(baseline_cosine_similarity(["a"], ["a", "a"]), 1.0)
+        self.assertEqual(baseline_cosine_similarity([], ["a"]), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分词结果磁盘缓存单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import main
+import segmenters
+from cache import TokenCache, decode_tokens, encode_tokens, preprocess_fingerprint
+
+TEXT = "今天是星期天，天气晴，今天晚上我要去看电影。"
+
+
+class TestTokenEncoding(unittest.TestCase):
+
+    def test_round_trip(self):
+        """测试编码后可以无损解码"""
+        words = ["星期天", "天气", "123", "mixed"]
+        self.assertEqual(decode_tokens(encode_tokens(words)), words)
+        self.assertEqual(decode_tokens(encode_tokens([])), [])
+
+    def test_decode_invalid(self):
+        """测试解码格式错误的数据时抛出 ValueError"""
+        with self.assertRaises(ValueError):
+            decode_tokens(b"garbage")
+
+
+class TestTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_preprocess_hits_cache(self):
+        """测试第二次处理同一文本时跳过分词"""
+        cache = TokenCache(self.directory)
+        expected = main.preprocess(TEXT)
+        self.assertEqual(cache.preprocess(TEXT), expected)
+        with patch("main.preprocess") as mock_preprocess:
+            self.assertEqual(TokenCache(self.directory).preprocess(TEXT), expected)
+            mock_preprocess.assert_not_called()
+        self.assertEqual(cache.misses, 1)
+
+    def test_segmenter_backends_do_not_collide(self):
+        """测试同一缓存目录下切换分词后端时各自命中自己的结果"""
+        try:
+            jieba_words = TokenCache(self.directory).preprocess(TEXT)
+            segmenters.set_segmenter("bigram")
+            cache = TokenCache(self.directory)
+            self.assertEqual(cache.preprocess(TEXT), main.preprocess(TEXT, "bigram"))
+            self.assertEqual(cache.misses, 1)
+            segmenters.set_segmenter("jieba")
+            self.assertEqual(TokenCache(self.directory).preprocess(TEXT), jieba_words)
+        finally:
+            segmenters.set_segmenter("jieba")
+
+    def test_fingerprint_changes_with_synonyms(self):
+        """测试同义词表变化时指纹改变，旧缓存不会命中"""
+        before = preprocess_fingerprint()
+        with patch.dict(main.SYNONYMS, {"影院": "电影"}):
+            self.assertNotEqual(preprocess_fingerprint(), before)
+        self.assertEqual(preprocess_fingerprint(), before)
+
+    def test_corrupted_entry_is_miss(self):
+        """测试损坏的缓存文件按未命中处理"""
+        cache = TokenCache(self.directory)
+        cache.put(TEXT, ["天气"])
+        with open(cache._path(cache.key(TEXT)), "wb") as f:
+            f.write(b"PCTK\x01broken")
+        self.assertIsNone(cache.get(TEXT))
+
+    def test_overwrite_keeps_size(self):
+        """测试覆盖已有条目时总大小不重复累计"""
+        cache = TokenCache(self.directory)
+        cache.put(TEXT, ["天气"] * 20)
+        cache.put(TEXT, ["天气"] * 20)
+        self.assertEqual(cache._size, os.path.getsize(cache._path(cache.key(TEXT))))
+
+    def test_evicts_least_recently_used(self):
+        """测试超过大小上限时淘汰最久未使用的条目"""
+        cache = TokenCache(self.directory, max_bytes=10**6)
+        cache.put("第一篇", ["第一"] * 50)
+        cache.put("第二篇", ["第二"] * 50)
+        old = cache._path(cache.key("第一篇"))
+        new = cache._path(cache.key("第二篇"))
+        os.utime(old, ns=(0, 0))
+        cache.max_bytes = int(os.path.getsize(new) / 0.9) + 1
+        cache.evict()
+        self.assertIsNone(cache.get("第一篇"))
+        self.assertEqual(cache.get("第二篇"), ["第二"] * 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
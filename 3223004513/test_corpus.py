@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+参考语料库批量查重单元测试
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from main import calculate_cosine_similarity
+from corpus import CorpusIndex, Vocabulary, main
+
+REFERENCES = [
+    ("orig", "今天是星期天，天气晴，今天晚上我要去看电影。"),
+    ("park", "今天天气很好，我们一起去公园玩。公园里有很多人。"),
+    ("code", "这是一个测试，包含标点！"),
+    ("empty", ""),
+]
+
+
+class TestVocabulary(unittest.TestCase):
+
+    def test_add_interns_tokens(self):
+        """测试同一词语只分配一个编号"""
+        vocabulary = Vocabulary()
+        self.assertEqual(vocabulary.add("天气"), 0)
+        self.assertEqual(vocabulary.add("电影"), 1)
+        self.assertEqual(vocabulary.add("天气"), 0)
+        self.assertEqual(len(vocabulary), 2)
+        self.assertIsNone(vocabulary.get("公园"))
+
+
+class TestCorpusIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = CorpusIndex.from_texts(REFERENCES)
+
+    def test_scores_match_pairwise_similarity(self):
+        """测试批量得分与逐对计算的余弦相似度一致"""
+        query = "今天是周天，天气晴朗，我晚上要去看电影。"
+        results = dict(self.index.query(query, top_k=len(REFERENCES)))
+        for doc_id, text in REFERENCES[:3]:
+            expected = calculate_cosine_similarity(query, text)
+            self.assertAlmostEqual(results[doc_id], expected, places=5)
+        self.assertEqual(results["empty"], 0.0)
+
+    def test_query_top_k_order(self):
+        """测试只返回 top_k 条结果且按相似度降序"""
+        results = self.index.query("今天是星期天，天气晴，今天晚上我要去看电影。", top_k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0], "orig")
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        self.assertGreaterEqual(results[0][1], results[1][1])
+
+    def test_query_empty_text(self):
+        """测试空查询文本得分全为 0"""
+        results = self.index.query("", top_k=2)
+        self.assertTrue(all(score == 0.0 for _, score in results))
+
+    def test_query_non_positive_top_k(self):
+        """测试 top_k 不大于 0 时返回空列表"""
+        self.assertEqual(self.index.query("天气", top_k=0), [])
+
+    def test_from_files_skips_unreadable(self):
+        """测试由文件构建索引时记录并跳过无法读取的文件，而不是退出进程"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for doc_id, text in REFERENCES[:2]:
+                path = os.path.join(directory, f"{doc_id}.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                paths.append(path)
+            broken = os.path.join(directory, "broken.txt")
+            with open(broken, "wb") as f:
+                f.write(b"\xff\xfe\x00")
+            missing = os.path.join(directory, "missing.txt")
+            errors = []
+            index = CorpusIndex.from_files(
+                [paths[0], missing, broken, paths[1]], errors=errors
+            )
+            self.assertEqual(index.doc_ids, paths)
+            self.assertEqual([error.path for error in errors], [missing, broken])
+            with self.assertRaises(FileNotFoundError):
+                CorpusIndex.from_files([paths[0], missing])
+
+
+class TestCorpusMain(unittest.TestCase):
+
+    def test_main_prints_matches(self):
+        """测试命令行入口输出匹配结果"""
+        paths = []
+        for _, text in REFERENCES[:2]:
+            with tempfile.NamedTemporaryFile(
+                mode="w", encoding="utf-8", delete=False, suffix=".txt"
+            ) as f:
+                f.write(text)
+            paths.append(f.name)
+        try:
+            with patch("builtins.print") as mock_print:
+                main([paths[0], paths[0], paths[1], "-k", "1"])
+            mock_print.assert_called_with(f"100.00%\t{paths[0]}")
+        finally:
+            for path in paths:
+                os.unlink(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+完全重复检测单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from dedup import DuplicateIndex
+
+ORIG = "今天是星期天，天气晴，今天晚上我要去看电影。"
+COPY = "  今天是星期天；天气晴……今天晚上我要去看电影！\n"
+PLAG = "今天是周天，天气晴朗，我晚上要去看电影。"
+
+
+class TestDuplicateIndex(unittest.TestCase):
+
+    def test_find(self):
+        """测试只相差空白和标点的副本被找到，改写过的文本不会"""
+        index = DuplicateIndex()
+        self.assertEqual(index.add("orig", ORIG), [])
+        self.assertEqual(index.add("copy", COPY), ["orig"])
+        index.add("plag", PLAG)
+        self.assertEqual(index.find(ORIG + "  "), ["orig", "copy"])
+        self.assertEqual(index.find("今天天气很好"), [])
+        self.assertEqual(index.groups(), [["orig", "copy"]])
+        self.assertEqual(len(index), 3)
+
+    def test_replace_and_remove(self):
+        """测试替换和删除文档"""
+        index = DuplicateIndex()
+        index.add("a", ORIG)
+        index.add("b", ORIG)
+        index.add("a", PLAG)
+        self.assertEqual(index.find(ORIG), ["b"])
+        index.remove("b")
+        self.assertEqual(index.find(ORIG), [])
+        self.assertNotIn("b", index)
+        with self.assertRaises(KeyError):
+            index.remove("b")
+
+    def test_save_and_load(self):
+        """测试保存和加载索引"""
+        directory = tempfile.mkdtemp()
+        try:
+            index = DuplicateIndex()
+            index.add("orig", ORIG)
+            index.add("copy", COPY)
+            path = os.path.join(directory, "dedup.idx")
+            index.save(path)
+            loaded = DuplicateIndex.load(path)
+            self.assertEqual(loaded.find(ORIG), ["orig", "copy"])
+            loaded.remove("orig")
+            self.assertEqual(loaded.find(COPY), ["copy"])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_from_files(self):
+        """测试由文件构建索引，无法读取的文件被记录并跳过"""
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for name, text in (("orig.txt", ORIG), ("copy.txt", COPY)):
+                path = os.path.join(directory, name)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                paths.append(path)
+            errors = []
+            missing = os.path.join(directory, "missing.txt")
+            index = DuplicateIndex.from_files(paths + [missing], errors)
+            self.assertEqual(index.groups(), [paths])
+            self.assertEqual([error.path for error in errors], [missing])
+            with self.assertRaises(FileNotFoundError):
+                DuplicateIndex.from_files([missing])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
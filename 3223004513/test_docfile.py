@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文档向量文件单元测试
+"""
+
+import io
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from corpus import CorpusIndex, main
+from docfile import DOCFILE_FORMAT_VERSION, DocumentFile, write_document_file
+from main import preprocess
+
+TEXTS = [
+    ("orig", "今天是星期天，天气晴，今天晚上我要去看电影。"),
+    ("论文", "机器学习是人工智能的一个分支，研究计算机如何从数据中学习。"),
+    ("empty", ""),
+    ("plag", "今天是周天，天气晴朗，我晚上要去看电影。"),
+]
+
+
+def read_vector(args):
+    path, i = args
+    documents = DocumentFile(path)
+    return documents.doc_id(i), documents.counter(i)
+
+
+class TestDocumentFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "refs.pcdv")
+        self.index = CorpusIndex.from_texts(TEXTS)
+        self.index.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        """测试保存后读出的文档编号、词表和词频向量不变"""
+        documents = DocumentFile(self.path)
+        self.assertEqual(len(documents), len(TEXTS))
+        self.assertEqual(documents.doc_ids(), [doc_id for doc_id, _ in TEXTS])
+        self.assertEqual(documents.doc_id(1), "论文")
+        self.assertEqual(
+            documents.vocabulary().id_to_token, self.index.vocabulary.id_to_token
+        )
+        for i, (_, text) in enumerate(TEXTS):
+            self.assertEqual(documents.counter(i), Counter(preprocess(text)))
+        self.assertEqual(len(documents.vector(2).ids), 0)
+        self.assertEqual((documents.matrix() != self.index.matrix).nnz, 0)
+        with self.assertRaises(IndexError):
+            documents.doc_id(len(TEXTS))
+
+    def test_zero_copy(self):
+        """测试数组直接引用映射的文件且为只读"""
+        documents = DocumentFile(self.path)
+        matrix = documents.matrix()
+        self.assertTrue(np.shares_memory(matrix.data, documents.counts))
+        self.assertTrue(np.shares_memory(matrix.indices, documents.ids))
+        self.assertTrue(np.shares_memory(documents.vector(0).ids, documents.ids))
+        self.assertFalse(documents.counts.flags.writeable)
+
+    def test_corpus_index_load(self):
+        """测试加载的索引查询结果与原索引相同"""
+        loaded = CorpusIndex.load(self.path)
+        query = "今天晚上去看电影"
+        self.assertEqual(loaded.doc_ids, self.index.doc_ids)
+        self.assertEqual(loaded.query(query, 3), self.index.query(query, 3))
+        bm25 = CorpusIndex.load(self.path, weighting="bm25")
+        expected = CorpusIndex.from_texts(TEXTS, weighting="bm25").query(query, 3)
+        self.assertEqual(bm25.query(query, 3), expected)
+
+    def test_shared_between_processes(self):
+        """测试多个工作进程打开同一文件"""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(
+                executor.map(read_vector, [(self.path, i) for i in range(len(TEXTS))])
+            )
+        self.assertEqual(
+            results, [(doc_id, Counter(preprocess(text))) for doc_id, text in TEXTS]
+        )
+
+    def test_invalid_file(self):
+        """测试格式、版本不匹配或被截断的文件"""
+        bad = os.path.join(self.directory, "bad.pcdv")
+        with open(bad, "wb") as f:
+            f.write(b"not a document file at all, just some bytes")
+        with self.assertRaises(ValueError):
+            DocumentFile(bad)
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with open(bad, "wb") as f:
+            f.write(data[:4] + struct.pack("<I", DOCFILE_FORMAT_VERSION + 1) + data[8:])
+        with self.assertRaises(ValueError):
+            DocumentFile(bad)
+
+        with open(bad, "wb") as f:
+            f.write(data[: len(data) // 2])
+        with self.assertRaises(ValueError):
+            DocumentFile(bad)
+
+        with self.assertRaises(ValueError):
+            write_document_file(bad, ["a"], self.index.matrix, self.index.vocabulary)
+
+    def test_command_line(self):
+        """测试命令行保存文档向量文件后直接加载查询"""
+        paths = []
+        for i, (_, text) in enumerate(TEXTS):
+            path = os.path.join(self.directory, f"{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            paths.append(path)
+        docs = os.path.join(self.directory, "cli.pcdv")
+        with redirect_stdout(io.StringIO()) as first:
+            main([paths[3], *paths[:3], "-k", "1", "--save-docs", docs, "-j", "1"])
+        with redirect_stdout(io.StringIO()) as second:
+            main([paths[3], "--docs", docs, "-k", "1"])
+        self.assertEqual(
+            first.getvalue().splitlines()[-1], second.getvalue().splitlines()[-1]
+        )
+        self.assertIn(paths[0], second.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量文件导入单元测试
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from main import load_text, preprocess
+from ingest import aingest_files, ingest_files
+
+TEXTS = [
+    "今天是星期天，天气晴，今天晚上我要去看电影。",
+    "今天是周天，天气晴朗，我晚上要去看电影。",
+    "这是一个测试，包含标点！",
+    "",
+]
+
+
+class TestIngestFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i, text in enumerate(TEXTS):
+            path = os.path.join(self.directory.name, f"{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            self.paths.append(path)
+        self.bad_encoding = os.path.join(self.directory.name, "gbk.txt")
+        with open(self.bad_encoding, "wb") as f:
+            f.write("今天天气晴".encode("gbk"))
+        self.missing = os.path.join(self.directory.name, "missing.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_collects_errors_and_continues(self):
+        """测试读取失败的文件被记录，其余文件正常导入"""
+        errors = []
+        paths = [self.missing] + self.paths + [self.bad_encoding]
+        results = dict(ingest_files(paths, errors, concurrency=2, workers=1))
+        self.assertEqual(
+            results, {path: preprocess(text) for path, text in zip(self.paths, TEXTS)}
+        )
+        messages = {error.path: error.message for error in errors}
+        self.assertEqual(set(messages), {self.missing, self.bad_encoding})
+        self.assertIn("不存在", messages[self.missing])
+        self.assertIn("编码不是UTF-8", messages[self.bad_encoding])
+
+    def test_process_pool_matches_sequential(self):
+        """测试多进程预处理与单进程结果一致"""
+        errors = []
+        results = dict(ingest_files(self.paths, errors, workers=2))
+        self.assertEqual(results, dict(ingest_files(self.paths, errors, workers=1)))
+        self.assertEqual(errors, [])
+
+    def test_bounded_concurrency(self):
+        """测试同时读取的文件数不超过上限，且消费方不取结果时不会继续读取"""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0, "started": 0}
+
+        def slow_load(path):
+            with lock:
+                state["active"] += 1
+                state["started"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return load_text(path)
+
+        paths = self.paths * 5
+        with patch("ingest.load_text", side_effect=slow_load):
+            stream = ingest_files(paths, [], concurrency=3, workers=1)
+            next(stream)
+            self.assertLessEqual(state["started"], 3)
+            self.assertEqual(len(list(stream)), len(paths) - 1)
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_async_api(self):
+        """测试异步接口"""
+
+        async def collect():
+            return [path async for path, _ in aingest_files(self.paths, [], workers=1)]
+
+        self.assertEqual(asyncio.run(collect()), self.paths)
+
+    def test_results_in_input_order(self):
+        """测试先读完的文件也按输入顺序返回"""
+        delays = {
+            path: 0.01 * (len(self.paths) - i) for i, path in enumerate(self.paths)
+        }
+
+        def slow_load(path):
+            time.sleep(delays.get(path, 0))
+            return load_text(path)
+
+        paths = [self.missing] + self.paths
+        with patch("ingest.load_text", side_effect=slow_load):
+            results = list(ingest_files(paths, [], concurrency=3, workers=1))
+        self.assertEqual([path for path, _ in results], self.paths)
+
+    def test_invalid_concurrency(self):
+        """测试并发数必须为正整数"""
+        with self.assertRaises(ValueError):
+            list(ingest_files(self.paths, [], concurrency=0))
+
+
+if __name__ == "__main__":
+    unittest.main()
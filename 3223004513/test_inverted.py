@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+倒排索引查询单元测试
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from corpus import CorpusIndex
+from inverted import InvertedIndex
+
+REFERENCES = [
+    ("orig", "今天是星期天，天气晴，今天晚上我要去看电影。"),
+    ("park", "今天天气很好，我们一起去公园玩。公园里有很多人。"),
+    ("code", "这是一个测试，包含标点！"),
+    ("empty", ""),
+]
+
+
+def random_corpus(n_docs, seed=0):
+    rng = random.Random(seed)
+    common = [f"c{i}" for i in range(5)]
+    rare = [f"r{i}" for i in range(2000)]
+    documents = []
+    for i in range(n_docs):
+        words = [rng.choice(common) for _ in range(30)] + [
+            rng.choice(rare) for _ in range(10)
+        ]
+        documents.append((str(i), words))
+    return documents
+
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def test_matches_corpus_index(self):
+        """测试查询结果与逐篇计算的余弦相似度一致"""
+        index = InvertedIndex.from_texts(REFERENCES)
+        exact = CorpusIndex.from_texts(REFERENCES)
+        query = "今天天气晴，晚上去看电影"
+        expected = [
+            (doc_id, score)
+            for doc_id, score in exact.query(query, top_k=4)
+            if score > 0
+        ]
+        results = index.query(query, top_k=4)
+        self.assertEqual(
+            [doc_id for doc_id, _ in results], [doc_id for doc_id, _ in expected]
+        )
+        for (_, score), (_, expected_score) in zip(results, expected):
+            self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_from_files_skips_unreadable(self):
+        """测试由文件构建倒排索引时记录并跳过无法读取的文件"""
+        with tempfile.TemporaryDirectory() as directory:
+            paths = []
+            for doc_id, text in REFERENCES[:2]:
+                path = os.path.join(directory, f"{doc_id}.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                paths.append(path)
+            missing = os.path.join(directory, "missing.txt")
+            errors = []
+            index = InvertedIndex.from_files([missing] + paths, errors=errors)
+            self.assertEqual(list(index.doc_ids), paths)
+            self.assertEqual([error.path for error in errors], [missing])
+            with self.assertRaises(FileNotFoundError):
+                InvertedIndex.from_files([missing])
+
+    def test_pruned_top_k_is_exact(self):
+        """测试剪枝后的 top-k 得分与精确结果相同"""
+        documents = random_corpus(300)
+        index = InvertedIndex.from_tokens(documents)
+        exact = CorpusIndex.from_tokens(documents)
+        rng = random.Random(1)
+        for _ in range(20):
+            query = documents[rng.randrange(len(documents))][1][25:]
+            results = index.query_tokens(query, top_k=5)
+            expected = exact.query_tokens(query, top_k=5)
+            self.assertEqual(len(results), 5)
+            for (_, score), (_, expected_score) in zip(results, expected):
+                self.assertAlmostEqual(score, expected_score, places=5)
+
+    def test_pruning_skips_postings(self):
+        """测试稀有词确定 top-k 后，常见词只更新已有候选"""
+        documents = random_corpus(300)
+        index = InvertedIndex.from_tokens(documents)
+        query = documents[7][1][30:] * 20 + ["c0"]
+        stats = {}
+        results = index.query_tokens(query, top_k=1, stats=stats)
+        self.assertEqual(results[0][0], "7")
+        common_postings = len(index._posting(index.vocabulary.get("c0"))[0])
+        self.assertLess(stats["postings"], common_postings)
+        self.assertLessEqual(stats["candidates"], 10)
+
+    def test_unknown_and_empty_query(self):
+        """测试与语料库没有共同词语的查询返回空列表"""
+        index = InvertedIndex.from_texts(REFERENCES)
+        self.assertEqual(index.query_tokens([], top_k=3), [])
+        self.assertEqual(index.query_tokens(["不存在的词"], top_k=3), [])
+        self.assertEqual(index.query("今天", top_k=0), [])
+
+    def test_query_norm_includes_unknown_words(self):
+        """测试查询向量的模长包含语料库中没有的词"""
+        index = InvertedIndex.from_tokens([("a", ["x"])])
+        ((doc_id, score),) = index.query_tokens(["x", "y"], top_k=1)
+        self.assertEqual(doc_id, "a")
+        self.assertAlmostEqual(score, 0.5**0.5, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
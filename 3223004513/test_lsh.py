@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MinHash / LSH 候选索引单元测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from main import calculate_cosine_similarity, preprocess
+from lsh import MinHashLSH, estimate_jaccard
+
+BASE = "今天天气很好，我们一起去公园玩。公园里有很多人，有的在散步，有的在跑步，还有的在骑自行车。"
+DOCUMENTS = {
+    "park": BASE,
+    "park_edit": BASE + "我们看到了一只可爱的小狗，它在追着球跑。",
+    "movie": "今天是星期天，天气晴，今天晚上我要去看电影。",
+}
+
+
+class TestMinHashLSH(unittest.TestCase):
+
+    def setUp(self):
+        self.index = MinHashLSH(num_perm=64, bands=32, shingle_size=2)
+        for doc_id, text in DOCUMENTS.items():
+            self.index.add_text(doc_id, text)
+
+    def test_signature_estimates_jaccard(self):
+        """测试相同文档签名一致，不同文档签名差异大"""
+        words = preprocess(BASE)
+        self.assertEqual(
+            estimate_jaccard(
+                self.index.signature(words), self.index.signatures["park"]
+            ),
+            1.0,
+        )
+        self.assertLess(
+            estimate_jaccard(
+                self.index.signatures["park"], self.index.signatures["movie"]
+            ),
+            0.2,
+        )
+
+    def test_query_rescored_with_cosine(self):
+        """测试候选文档用精确余弦相似度重新打分"""
+        results = self.index.query(BASE, top_k=2)
+        self.assertEqual([doc_id for doc_id, _ in results], ["park", "park_edit"])
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        expected = calculate_cosine_similarity(BASE, DOCUMENTS["park_edit"])
+        self.assertAlmostEqual(results[1][1], expected, places=5)
+        self.assertNotIn("movie", self.index.candidates(preprocess(BASE)))
+
+    def test_add_replaces_and_remove(self):
+        """测试重复插入替换旧文档，删除后不再成为候选"""
+        self.index.add_text("movie", BASE)
+        self.assertIn("movie", self.index.candidates(preprocess(BASE)))
+        self.index.remove("movie")
+        self.assertNotIn("movie", self.index)
+        self.assertNotIn("movie", self.index.candidates(preprocess(BASE)))
+
+    def test_save_and_load(self):
+        """测试保存到磁盘后重新加载，查询结果不变"""
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".lsh") as f:
+            path = f.name
+        try:
+            self.index.save(path)
+            loaded = MinHashLSH.load(path)
+            self.assertEqual(loaded.query(BASE), self.index.query(BASE))
+            loaded.add_text("new", BASE)
+            self.assertIn("new", loaded.candidates(preprocess(BASE)))
+        finally:
+            os.unlink(path)
+
+    def test_invalid_bands(self):
+        """测试签名长度不能被分段数整除时报错"""
+        with self.assertRaises(ValueError):
+            MinHashLSH(num_perm=10, bands=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,9 +8,26 @@
 
 import unittest
 import os
+import subprocess
+import sys
 import tempfile
 from unittest.mock import patch
-from main import read_file, write_file, preprocess, calculate_cosine_similarity, main
+from collections import Counter
+import main as main_module
+from main import (
+    read_file,
+    write_file,
+    normalize_words,
+    load_synonyms,
+    set_synonyms,
+    SynonymTrie,
+    preprocess,
+    normalize_text,
+    content_key,
+    calculate_cosine_similarity,
+    counter_cosine_similarity,
+    main,
+)
 
 
 class TestPaperCheck(unittest.TestCase):
@@ -43,6 +60,7 @@ class TestPaperCheck(unittest.TestCase):
             "empty_file.txt",
             "test_numbers.txt",
             "test_punctuation.txt",
+            "test_synonyms.txt",
         ]
         for file in test_files:
             if os.path.exists(file):
@@ -136,6 +154,42 @@ class TestPaperCheck(unittest.TestCase):
         self.assertIn("包含", result)
         self.assertIn("标点", result)
 
+    def test_normalize_words_longest_match(self):
+        """测试同义词按最长匹配替换，且只在词边界处结束匹配"""
+        self.assertEqual(normalize_words(["天气", "晴朗", "周天"]), ["天气晴", "星期天"])
+        self.assertEqual(normalize_words(["晴朗"]), ["晴"])
+        self.assertEqual(normalize_words(["天", "气晴朗"]), ["天气晴"])
+        self.assertEqual(normalize_words(["晴朗天"]), ["晴朗天"])
+
+    def test_synonym_trie_long_phrase(self):
+        """测试超过3个词的同义词短语"""
+        trie = SynonymTrie({"今天天气非常好": "晴", "今天": "今日"})
+        words = ["今天", "天气", "非常", "好", "今天"]
+        self.assertEqual(normalize_words(words, trie), ["晴", "今日"])
+        self.assertEqual(len(trie), 2)
+        self.assertEqual(normalize_words(words, SynonymTrie()), words)
+
+    def test_load_and_set_synonyms(self):
+        """测试从文件加载同义词表并替换默认词表"""
+        with open("test_synonyms.txt", "w", encoding="utf-8") as f:
+            f.write("# 注释\n\n影院 电影\n观影 电影\n")
+        original = dict(main_module.SYNONYMS)
+        try:
+            synonyms = load_synonyms("test_synonyms.txt")
+            self.assertEqual(synonyms, {"影院": "电影", "观影": "电影"})
+            set_synonyms(synonyms)
+            self.assertEqual(normalize_words(["影院", "周天"]), ["电影", "周天"])
+        finally:
+            set_synonyms(original)
+        self.assertEqual(normalize_words(["周天"]), ["星期天"])
+
+    def test_load_synonyms_invalid_line(self):
+        """测试同义词文件格式错误时抛出 ValueError"""
+        with open("test_synonyms.txt", "w", encoding="utf-8") as f:
+            f.write("影院\n")
+        with self.assertRaises(ValueError):
+            load_synonyms("test_synonyms.txt")
+
     def test_cosine_similarity_identical(self):
         """测试相同文本的相似度计算"""
         text1 = "今天是星期天，天气晴，今天晚上我要去看电影。"
@@ -208,6 +262,59 @@ class TestPaperCheck(unittest.TestCase):
         similarity = calculate_cosine_similarity(text1, text2)
         self.assertAlmostEqual(similarity, 1.0, places=2)
 
+    def test_normalize_text(self):
+        """测试规范化文本移除标点并折叠空白"""
+        self.assertEqual(normalize_text("  今天，天气\n\n很好！ "), "今天天气 很好")
+        self.assertEqual(content_key("今天天气 很好"), content_key("今天天气\t很好。"))
+        self.assertNotEqual(content_key("今天天气很好"), content_key("今天天气 很好"))
+
+    def test_cosine_similarity_duplicate_fast_path(self):
+        """测试只相差空白和标点的副本不经过分词直接判定为完全相同"""
+        text1 = "今天是星期天，天气晴，今天晚上我要去看电影。"
+        text2 = "今天是星期天；天气晴……今天晚上我要去看电影！\n"
+        with patch("main.preprocess") as mock_preprocess:
+            self.assertEqual(calculate_cosine_similarity(text1, text2), 1.0)
+            mock_preprocess.assert_not_called()
+        # 快速路径的结论与完整计算一致
+        self.assertEqual(preprocess(text1), preprocess(text2))
+        self.assertEqual(
+            calculate_cosine_similarity("This is  a\ttest.", "This is a test"), 1.0
+        )
+        self.assertEqual(calculate_cosine_similarity("。", "！"), 1.0)
+        self.assertEqual(calculate_cosine_similarity("", "！"), 0.0)
+
+    def test_duplicate_fast_path_crlf(self):
+        """测试 jieba 保留的 \\r\\n 词使规范化文本不同，快速路径与完整计算一致"""
+        texts = [
+            "今天天气 很好",
+            "今天天气\r\n很好",
+            "今天天气\n很好",
+            "今天天气\r\n\r\n很好",
+            "今天天气 \r\n\t很好",
+            "\r\n今天天气 很好",
+            "今天天气 很好\r\n",
+        ]
+        for text1 in texts:
+            for text2 in texts:
+                if normalize_text(text1) == normalize_text(text2):
+                    self.assertEqual(preprocess(text1), preprocess(text2))
+        self.assertNotEqual(normalize_text(texts[0]), normalize_text(texts[1]))
+        self.assertEqual(normalize_text(texts[0]), normalize_text(texts[2]))
+        self.assertEqual(normalize_text(texts[1]), normalize_text(texts[4]))
+        self.assertLess(calculate_cosine_similarity(texts[0], texts[1]), 1.0)
+        # 完全重复检测仍把换行方式不同的副本视为重复
+        self.assertEqual(content_key(texts[0]), content_key(texts[1]))
+
+    def test_counter_cosine_similarity(self):
+        """测试词频向量的余弦相似度与文本相似度一致"""
+        text1 = "今天是星期天，天气晴，今天晚上我要去看电影。"
+        text2 = "今天是周天，天气晴朗，我晚上要去看电影。"
+        similarity = counter_cosine_similarity(
+            Counter(preprocess(text1)), Counter(preprocess(text2))
+        )
+        self.assertAlmostEqual(similarity, calculate_cosine_similarity(text1, text2))
+        self.assertEqual(counter_cosine_similarity(Counter(), Counter(["天气"])), 0.0)
+
     @patch("sys.argv", ["main.py", "test_orig.txt", "test_plag.txt", "test_output.txt"])
     @patch("main.read_file")
     @patch("main.calculate_cosine_similarity")
@@ -299,6 +406,31 @@ class TestPaperCheckIntegration(unittest.TestCase):
             self.assertGreater(result, 70.0)
             self.assertLess(result, 90.0)
 
+    def test_cli_skips_numpy(self):
+        """测试默认参数的命令行查重不导入 NumPy/SciPy"""
+        code = (
+            "import sys, main\n"
+            "main.main()\n"
+            "print('numpy' in sys.modules or 'scipy' in sys.modules)"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "PAPERCHECK_SCORING"}
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                code,
+                self.orig_file.name,
+                self.plag_file.name,
+                self.output_file.name,
+            ],
+            cwd=os.path.dirname(os.path.abspath(main_module.__file__)),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.splitlines()[-1], "False")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+进程内分词缓存单元测试
+"""
+
+import unittest
+from unittest.mock import patch
+
+import jieba  # type: ignore
+
+import main
+from memo import LRUCache, text_key
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_hits_misses_and_evictions(self):
+        """测试命中、未命中与按代价淘汰最久未使用的条目"""
+        cache = LRUCache(max_cost=5)
+        self.assertIsNone(cache.get(b"a"))
+        cache.put(b"a", "A", 2)
+        cache.put(b"b", "B", 2)
+        self.assertEqual(cache.get(b"a"), "A")
+        cache.put(b"c", "C", 2)
+        self.assertIsNone(cache.get(b"b"))
+        self.assertEqual(cache.get(b"c"), "C")
+        self.assertEqual(
+            cache.stats(),
+            {
+                "hits": 2,
+                "misses": 2,
+                "evictions": 1,
+                "entries": 2,
+                "cost": 4,
+                "max_cost": 5,
+            },
+        )
+
+    def test_oversized_and_disabled(self):
+        """测试代价超过上限的条目不被缓存，缩小容量时立即淘汰"""
+        cache = LRUCache(max_cost=3)
+        cache.put(b"big", "X", 4)
+        self.assertEqual(len(cache), 0)
+        cache.put(b"a", "A", 1)
+        cache.put(b"a", "A2", 2)
+        self.assertEqual(cache.stats()["cost"], 2)
+        cache.resize(0)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_text_key(self):
+        """测试缓存键只取决于文本内容"""
+        self.assertEqual(text_key("今天天气晴"), text_key("今天" + "天气晴"))
+        self.assertNotEqual(text_key("今天天气晴"), text_key("今天天气晴朗"))
+        self.assertEqual(len(text_key("x" * 10000)), 16)
+
+
+class TestPreprocessCache(unittest.TestCase):
+
+    def setUp(self):
+        self.saved_synonyms = dict(main.SYNONYMS)
+        main.clear_caches()
+
+    def tearDown(self):
+        main.set_synonyms(self.saved_synonyms)
+        main.clear_caches()
+
+    def test_repeated_text_skips_segmentation(self):
+        """测试重复文本直接返回缓存结果，且返回的列表互不影响"""
+        text = "今天是星期天，天气晴，今天晚上我要去看电影。"
+        first = main.preprocess(text)
+        before = main.cache_stats()["preprocess"]
+        with patch("main.segment") as mock_segment:
+            second = main.preprocess(text)
+        mock_segment.assert_not_called()
+        self.assertEqual(first, second)
+        second.append("额外")
+        self.assertEqual(main.preprocess(text), first)
+        self.assertEqual(main.cache_stats()["preprocess"]["hits"], before["hits"] + 2)
+
+    def test_segment_cache_per_block(self):
+        """测试不同文本中相同的文本块只分词一次，结果与直接分词相同"""
+        template = "本文研究了中文文本相似度的计算方法"
+        text1 = f"{template}\n第一部分介绍背景"
+        text2 = f"{template}\n第二部分介绍实验"
+        self.assertEqual(main.segment(text1), list(jieba.cut(text1)))
+        before = main.cache_stats()["segment"]["hits"]
+        self.assertEqual(main.segment(text2), list(jieba.cut(text2)))
+        self.assertEqual(main.cache_stats()["segment"]["hits"], before + 1)
+
+    def test_shared_sentence_inside_paragraphs(self):
+        """测试嵌在不同段落中的相同句子命中分词缓存"""
+        sentence = "本文研究了中文文本相似度的计算方法。"
+        text1 = f"第一章介绍背景。{sentence}实验部分给出结果。"
+        text2 = f"相关工作很多。{sentence}第二章介绍实验"
+        main.preprocess(text1)
+        before = main.cache_stats()["segment"]["hits"]
+        main.preprocess(text2)
+        self.assertEqual(main.cache_stats()["segment"]["hits"], before + 1)
+        self.assertEqual(
+            main.preprocess(sentence),
+            main.normalize_words(
+                main.filter_words(list(jieba.cut(main.strip_punctuation(sentence))))
+            ),
+        )
+
+    def test_set_synonyms_invalidates_cache(self):
+        """测试替换同义词表后缓存失效"""
+        text = "今天是周天"
+        self.assertIn("星期天", main.preprocess(text))
+        main.set_synonyms({})
+        self.assertNotIn("星期天", main.preprocess(text))
+
+    def test_configure_caches(self):
+        """测试容量为 0 时禁用缓存"""
+        try:
+            main.configure_caches(0, 0)
+            main.preprocess("今天是星期天")
+            main.preprocess("今天是星期天")
+            self.assertEqual(main.cache_stats()["preprocess"]["entries"], 0)
+        finally:
+            main.configure_caches(
+                main.PREPROCESS_CACHE_TOKENS, main.SEGMENT_CACHE_TOKENS
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
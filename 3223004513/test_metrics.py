@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分阶段计时与统计单元测试
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import metrics
+from main import calculate_cosine_similarity, clear_caches, main, parse_args
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        # 命中分词缓存时不会进入 segment 阶段
+        clear_caches()
+
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        """测试关闭统计时不记录任何数据"""
+        calculate_cosine_similarity("今天天气晴", "今天天气晴朗")
+        self.assertEqual(metrics.snapshot(), {"stages": {}})
+
+    def test_enabled_records_stages(self):
+        """测试开启统计后记录各阶段的调用次数、词数和字节数"""
+        metrics.enable()
+        calculate_cosine_similarity("今天是星期天", "今天是周天")
+        stages = metrics.snapshot()["stages"]
+        self.assertEqual(stages["calculate_cosine_similarity"]["calls"], 1)
+        self.assertEqual(stages["preprocess"]["calls"], 2)
+        self.assertEqual(
+            stages["preprocess"]["bytes"], len("今天是星期天今天是周天".encode("utf-8"))
+        )
+        self.assertGreater(stages["segment"]["tokens"], 0)
+        self.assertGreaterEqual(
+            stages["calculate_cosine_similarity"]["wall_seconds"],
+            stages["preprocess"]["wall_seconds"],
+        )
+
+    def test_instrumented_decorator(self):
+        """测试装饰器保留函数信息并使用 measure 计算词数和字节数"""
+
+        @metrics.instrumented(
+            "demo", lambda args, result: (len(result), metrics.text_bytes(args[0]))
+        )
+        def split(text):
+            """拆分字符"""
+            return list(text)
+
+        self.assertEqual(split.__doc__, "拆分字符")
+        metrics.enable()
+        split("天气")
+        self.assertEqual(metrics.snapshot()["stages"]["demo"]["tokens"], 2)
+        self.assertEqual(metrics.snapshot()["stages"]["demo"]["bytes"], 6)
+
+
+class TestMainOptions(unittest.TestCase):
+
+    def test_parse_args(self):
+        """测试可选参数可以出现在任意位置"""
+        self.assertEqual(
+            parse_args(["--metrics", "m.json", "a", "b", "c"]),
+            (["a", "b", "c"], {"metrics": "m.json"}),
+        )
+        self.assertIsNone(parse_args(["a", "b", "c", "--profile"]))
+        self.assertIsNone(parse_args(["a", "b"]))
+
+    def test_main_writes_metrics_and_profile(self):
+        """测试命令行开启统计和性能分析"""
+        directory = tempfile.mkdtemp()
+        paths = [
+            os.path.join(directory, name)
+            for name in ("a.txt", "b.txt", "ans.txt", "m.json", "p.prof")
+        ]
+        for path, text in zip(paths, ("今天是星期天", "今天是周天")):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        argv = ["main.py", *paths[:3], "--metrics", paths[3], "--profile", paths[4]]
+        try:
+            with patch("sys.argv", argv):
+                main()
+            with open(paths[3], "r", encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["stages"]["read_file"]["calls"], 2)
+            self.assertGreater(os.path.getsize(paths[4]), 0)
+        finally:
+            metrics.disable()
+            metrics.reset()
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
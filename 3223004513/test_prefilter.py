@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基于上界的候选过滤单元测试
+"""
+
+import random
+import unittest
+
+import numpy as np
+
+from corpus import CorpusIndex
+from prefilter import BoundedIndex
+
+
+def random_corpus(n_docs, seed=0):
+    """每篇文档从各自的主题词中按 Zipf 分布抽样，与真实文本一样词频高度偏斜"""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(2000)]
+    weights = [1 / rank for rank in range(1, 101)]
+    documents = []
+    for i in range(n_docs):
+        topic = rng.sample(vocabulary, 100)
+        words = rng.choices(topic, weights, k=rng.randint(0, 150))
+        documents.append((str(i), words))
+    return documents
+
+
+class TestBoundedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.documents = random_corpus(400)
+        # 几篇与第 0 篇高度相似的文档
+        base = self.documents[0][1] or ["w1"]
+        for i in range(3):
+            self.documents.append((f"copy{i}", base + [f"w{i}"] * (i + 1)))
+
+    def check_exact(self, index, words, threshold):
+        bounded = BoundedIndex(index, signature_size=4)
+        scores = index.score_tokens(words)
+        query, query_norm = index.query_vector(words)
+        bounds = bounded.upper_bounds(query, query_norm)
+        self.assertTrue(np.all(bounds + 1e-6 >= scores))
+        expected = {
+            index.doc_ids[i]
+            for i in np.flatnonzero((scores >= threshold) & (scores > 0))
+        }
+        results = bounded.search_tokens(words, threshold)
+        self.assertEqual({doc_id for doc_id, _ in results}, expected)
+        for doc_id, score in results:
+            self.assertAlmostEqual(score, scores[index.doc_ids.index(doc_id)], places=6)
+        self.assertEqual(
+            [s for _, s in results], sorted((s for _, s in results), reverse=True)
+        )
+
+    def test_no_loss_at_threshold(self):
+        """测试剪枝查询的结果与逐篇精确打分后按阈值筛选的结果相同"""
+        index = CorpusIndex.from_tokens(self.documents)
+        rng = random.Random(1)
+        for threshold in (0.0, 0.2, 0.5, 0.9):
+            for _ in range(5):
+                words = self.documents[rng.randrange(len(self.documents))][1]
+                self.check_exact(index, words, threshold)
+
+    def test_weighted_index(self):
+        """测试 BM25 加权的索引上界同样成立"""
+        index = CorpusIndex.from_tokens(self.documents, weighting="bm25")
+        self.check_exact(index, self.documents[0][1], 0.5)
+        self.check_exact(index, self.documents[5][1] + ["未知"], 0.3)
+
+    def test_prunes_most_documents(self):
+        """测试高阈值时大部分文档在精确打分前被排除"""
+        index = CorpusIndex.from_tokens(self.documents)
+        stats = {}
+        results = BoundedIndex(index).search_tokens(self.documents[0][1], 0.8, stats)
+        self.assertIn("copy0", {doc_id for doc_id, _ in results})
+        self.assertEqual(stats["documents"], len(self.documents))
+        self.assertLess(stats["signature"], stats["documents"] // 10)
+        self.assertEqual(stats["matches"], len(results))
+
+    def test_empty_query(self):
+        """测试空查询和词表外的查询没有结果"""
+        bounded = BoundedIndex(CorpusIndex.from_tokens(self.documents))
+        self.assertEqual(bounded.search_tokens([], 0.1), [])
+        self.assertEqual(bounded.search_tokens(["未知"], 0.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可内存映射的 jieba 前缀词典单元测试
+"""
+
+import os
+import tempfile
+import unittest
+
+import jieba  # type: ignore
+
+from prefixdict import MappedPrefixDict, write_prefix_dict
+
+FREQ = {
+    "今": 10,
+    "今天": 50,
+    "天": 20,
+    "天气": 40,
+    "天气晴": 0,
+    "天气晴朗": 5,
+    "晴": 8,
+    "朗": 3,
+}
+
+
+class TestMappedPrefixDict(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".pd")
+        os.close(fd)
+        write_prefix_dict(self.path, FREQ, 136)
+        self.mapped = MappedPrefixDict(self.path)
+
+    def tearDown(self):
+        del self.mapped
+        os.unlink(self.path)
+
+    def test_lookup(self):
+        """测试映射后的词典与原词典查询结果一致"""
+        self.assertEqual(len(self.mapped), len(FREQ))
+        self.assertEqual(self.mapped.total, 136)
+        for word, count in FREQ.items():
+            self.assertIn(word, self.mapped)
+            self.assertEqual(self.mapped[word], count)
+            self.assertEqual(self.mapped.get(word), count)
+        self.assertNotIn("电影", self.mapped)
+        self.assertIsNone(self.mapped.get("电影"))
+        self.assertEqual(self.mapped.get("电影", 1), 1)
+        with self.assertRaises(KeyError):
+            self.mapped["电影"]
+
+    def test_segmentation_matches(self):
+        """测试使用映射词典的分词结果与普通词典一致"""
+        text = "今天天气晴朗"
+        tokenizer = jieba.Tokenizer()
+        tokenizer.FREQ, tokenizer.total, tokenizer.initialized = dict(FREQ), 136, True
+        expected = list(tokenizer.cut(text, HMM=False))
+        tokenizer.FREQ = self.mapped
+        self.assertEqual(list(tokenizer.cut(text, HMM=False)), expected)
+
+    def test_invalid_file(self):
+        """测试文件格式错误时抛出 ValueError"""
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            MappedPrefixDict(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
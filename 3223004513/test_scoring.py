@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+相似度计算后端单元测试
+"""
+
+import os
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+import scoring
+from main import calculate_cosine_similarity, counter_cosine_similarity
+from scoring import (
+    NumpyBackend,
+    PythonBackend,
+    ScoringBackend,
+    get_backend,
+    set_backend,
+)
+from weighting import IdfTable
+
+VOCABULARY = [f"词{i}" for i in range(30)]
+
+
+def random_documents(n, seed=0):
+    rng = random.Random(seed)
+    return [
+        [rng.choice(VOCABULARY) for _ in range(rng.randint(0, 40))] for _ in range(n)
+    ]
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.backends = [PythonBackend(), NumpyBackend()]
+
+    def test_backends_agree(self):
+        """测试两个后端的结果与基于 Counter 的余弦相似度一致"""
+        documents = random_documents(20)
+        for backend in self.backends:
+            vectors = [backend.vectorize(words) for words in documents]
+            for i in range(0, len(documents), 2):
+                expected = counter_cosine_similarity(
+                    Counter(documents[i]), Counter(documents[i + 1])
+                )
+                self.assertAlmostEqual(
+                    backend.cosine(vectors[i], vectors[i + 1]), expected
+                )
+
+    def test_batch_matches_single(self):
+        """测试批量计算与逐对计算结果相同"""
+        documents = random_documents(31, seed=1)
+        for backend in self.backends:
+            vectors = [backend.vectorize(words) for words in documents]
+            pairs = list(zip(vectors, vectors[1:]))
+            batch = backend.cosine_batch(pairs)
+            self.assertEqual(len(batch), len(pairs))
+            for score, (vec1, vec2) in zip(batch, pairs):
+                self.assertAlmostEqual(score, backend.cosine(vec1, vec2))
+            self.assertEqual(backend.cosine_batch([]), [])
+
+    def test_norm_is_cached(self):
+        """测试向量构建时算好模长"""
+        for backend in self.backends:
+            vector = backend.vectorize(["词1", "词1", "词2"])
+            self.assertAlmostEqual(vector.norm, 5**0.5)
+            self.assertEqual(backend.vectorize([]).norm, 0.0)
+
+    def test_weighting_agrees(self):
+        """测试加权后两个后端结果一致"""
+        documents = random_documents(10, seed=2)
+        table = IdfTable.from_documents(documents)
+        python, numpy_backend = self.backends
+        for weighting in ("sublinear", "tfidf", "bm25"):
+            for words1, words2 in zip(documents, documents[1:]):
+                expected = python.cosine(
+                    python.vectorize(words1, weighting, table),
+                    python.vectorize(words2, weighting, table),
+                )
+                actual = numpy_backend.cosine(
+                    numpy_backend.vectorize(words1, weighting, table),
+                    numpy_backend.vectorize(words2, weighting, table),
+                )
+                self.assertAlmostEqual(actual, expected)
+
+    def test_vocabulary_is_bounded(self):
+        """测试词表超过上限后换用新词表，跨词表的向量仍能正确比较"""
+        documents = random_documents(12, seed=3)
+        backend = NumpyBackend()
+        backend.max_vocabulary = 10
+        vectors = [backend.vectorize(words) for words in documents]
+        self.assertGreater(len({id(vec.vocabulary) for vec in vectors}), 1)
+        self.assertLessEqual(len(backend.vocabulary), 10 + max(map(len, documents)))
+        pairs = list(zip(vectors, vectors[1:]))
+        for (vec1, vec2), score, (words1, words2) in zip(
+            pairs, backend.cosine_batch(pairs), zip(documents, documents[1:])
+        ):
+            expected = counter_cosine_similarity(Counter(words1), Counter(words2))
+            self.assertAlmostEqual(backend.cosine(vec1, vec2), expected)
+            self.assertAlmostEqual(score, expected)
+
+    def test_incomplete_backend_rejected(self):
+        """测试缺少 dot 的后端在实例化时即报错"""
+
+        class Incomplete(ScoringBackend):
+            def vectorize(self, words, weighting="tf", idf_table=None):
+                return PythonBackend().vectorize(words, weighting, idf_table)
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def tearDown(self):
+        scoring._backend = None
+
+    def test_default_backend(self):
+        """测试未设置环境变量时单对打分默认使用纯 Python 后端"""
+        with mock.patch.dict(os.environ):
+            os.environ.pop(scoring.SCORING_BACKEND_ENV, None)
+            self.assertIsInstance(get_backend(), PythonBackend)
+
+    def test_set_backend(self):
+        """测试切换默认后端不影响单对接口的结果"""
+        text1 = "今天是星期天，天气晴，今天晚上我要去看电影。"
+        text2 = "今天是周天，天气晴朗，我晚上要去看电影。"
+        set_backend("numpy")
+        expected = calculate_cosine_similarity(text1, text2)
+        set_backend("python")
+        self.assertIsInstance(get_backend(), PythonBackend)
+        self.assertAlmostEqual(calculate_cosine_similarity(text1, text2), expected)
+        with self.assertRaises(ValueError):
+            set_backend("gpu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分词后端单元测试
+"""
+
+import os
+import unittest
+from unittest.mock import patch
+
+import jieba
+
+import segmenters
+from main import (
+    calculate_cosine_similarity,
+    clear_caches,
+    init_jieba,
+    preprocess,
+    screened_cosine_similarity,
+    segment,
+)
+from segmenters import SEGMENTERS, Segmenter, get_segmenter, set_segmenter
+
+ORIG = "今天是星期天，天气晴，今天晚上我要去看电影。"
+PLAG = "今天是周天，天气晴朗，我晚上要去看电影。"
+TEXT = "机器学习是人工智能的一个分支\n深度学习使用多层神经网络\n\n论文查重系统 检测抄袭行为"
+
+
+class TestSegmenters(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        init_jieba()
+
+    def setUp(self):
+        clear_caches()
+
+    def tearDown(self):
+        set_segmenter("jieba")
+
+    def test_jieba_modes(self):
+        """测试 jieba 各模式与直接调用 jieba 的结果相同"""
+        self.assertEqual(segment(TEXT, "jieba"), list(jieba.cut(TEXT)))
+        self.assertEqual(segment(TEXT, "jieba-nohmm"), list(jieba.cut(TEXT, HMM=False)))
+        parallel = get_segmenter("jieba-parallel")
+        try:
+            self.assertEqual(parallel.cut(TEXT), list(jieba.cut(TEXT)))
+            self.assertEqual(segment(TEXT, "jieba-parallel"), list(jieba.cut(TEXT)))
+        finally:
+            parallel.close()
+
+    def test_char_ngrams(self):
+        """测试字符 n-gram 切分汉字并整段保留英文和数字"""
+        self.assertEqual(
+            get_segmenter("bigram").cut("今天天气 hello世界 我"),
+            ["今天", "天天", "天气", "hello", "世界", "我"],
+        )
+        self.assertEqual(
+            get_segmenter("trigram").cut("今天天气 abc123"),
+            ["今天天", "天天气", "abc123"],
+        )
+        self.assertEqual(get_segmenter("bigram").cut(" \n "), [])
+
+    def test_whitespace_invariance(self):
+        """测试所有后端都把空白视为分隔符"""
+        for name in SEGMENTERS:
+            with self.subTest(segmenter=name):
+                words = [
+                    w
+                    for w in segment("今天天气  很好\n\n我们", name)
+                    if not w.isspace()
+                ]
+                self.assertEqual(
+                    words,
+                    [w for w in segment("今天天气 很好 我们", name) if not w.isspace()],
+                )
+        segmenters.close_segmenters()
+
+    def test_select_default(self):
+        """测试选择默认后端，缓存按后端区分"""
+        jieba_words = preprocess(ORIG)
+        set_segmenter("bigram")
+        bigram_words = preprocess(ORIG)
+        self.assertNotEqual(bigram_words, jieba_words)
+        self.assertEqual(bigram_words, preprocess(ORIG, "bigram"))
+        set_segmenter("jieba")
+        self.assertEqual(preprocess(ORIG), jieba_words)
+        with self.assertRaises(ValueError):
+            set_segmenter("unknown")
+        with self.assertRaises(ValueError):
+            get_segmenter("unknown")
+
+    def test_posix_only_rejected_early(self):
+        """测试在非 POSIX 系统上选择并行模式时立即报错"""
+        with patch.object(segmenters.os, "name", "nt"), patch.dict(
+            segmenters._segmenters, clear=True
+        ):
+            with self.assertRaises(ValueError):
+                set_segmenter("jieba-parallel")
+            with self.assertRaises(ValueError):
+                get_segmenter("jieba-parallel")
+            set_segmenter("bigram")
+
+    def test_incomplete_segmenter_rejected(self):
+        """测试没有实现 cut 的后端在实例化时即报错"""
+
+        class Incomplete(Segmenter):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_environment_default(self):
+        """测试未显式选择时由环境变量决定默认后端"""
+        with patch.object(segmenters, "_default", None), patch.dict(
+            os.environ, {segmenters.SEGMENTER_ENV: "trigram"}
+        ):
+            self.assertEqual(get_segmenter().name, "trigram")
+
+    def test_screened_similarity(self):
+        """测试初筛结果落在临界区间内时用 jieba 复核"""
+        bigram = calculate_cosine_similarity(ORIG, PLAG, segmenter="bigram")
+        exact = calculate_cosine_similarity(ORIG, PLAG, segmenter="jieba")
+        self.assertNotAlmostEqual(bigram, exact)
+        self.assertEqual(
+            screened_cosine_similarity(ORIG, PLAG, low=0.0, high=1.0), exact
+        )
+        self.assertEqual(
+            screened_cosine_similarity(ORIG, PLAG, low=1.0, high=0.0), bigram
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
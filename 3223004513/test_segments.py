@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+片段级查重单元测试
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from main import calculate_cosine_similarity
+from segments import main, match_segments, split_segments
+
+ORIGINAL = "今天是星期天，天气晴。今天晚上我要去看电影！\n公园里有很多人，有的在散步。"
+PLAGIARIZED = "我们一起去公园玩。  今天是周天，天气晴朗。"
+
+
+class TestSplitSegments(unittest.TestCase):
+
+    def test_sentence_offsets(self):
+        """测试句子切分的偏移量指向原文"""
+        segments = split_segments(PLAGIARIZED)
+        self.assertEqual(
+            [s.text for s in segments], ["我们一起去公园玩。", "今天是周天，天气晴朗。"]
+        )
+        for segment in segments:
+            self.assertEqual(PLAGIARIZED[segment.start: segment.end], segment.text)
+
+    def test_leading_whitespace(self):
+        """测试文本带首部空白时偏移量仍指向传入的文本"""
+        text = "\n\n  " + PLAGIARIZED
+        for unit in ("sentence", "paragraph"):
+            segments = split_segments(text, unit)
+            self.assertEqual(segments[0].start, 4)
+            for segment in segments:
+                self.assertEqual(text[segment.start: segment.end], segment.text)
+
+    def test_paragraph_unit(self):
+        """测试按段落切分"""
+        segments = split_segments(ORIGINAL, "paragraph")
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(segments[1].text, "公园里有很多人，有的在散步。")
+
+    def test_unknown_unit(self):
+        """测试不支持的切分单位"""
+        with self.assertRaises(ValueError):
+            split_segments(ORIGINAL, "chapter")
+
+
+class TestMatchSegments(unittest.TestCase):
+
+    def test_best_matching_segment(self):
+        """测试找到原文中最相似的片段，得分与逐对计算一致"""
+        matches = match_segments(ORIGINAL, PLAGIARIZED, threshold=0.5)
+        self.assertEqual(len(matches), 1)
+        match = matches[0]
+        self.assertEqual(match.original.text, "今天是星期天，天气晴。")
+        self.assertEqual(match.plagiarized.text, "今天是周天，天气晴朗。")
+        expected = calculate_cosine_similarity(
+            match.original.text, match.plagiarized.text
+        )
+        self.assertAlmostEqual(match.similarity, expected, places=5)
+
+    def test_threshold_and_empty(self):
+        """测试阈值为 0 时输出所有有共同词语的片段，空文档没有结果"""
+        matches = match_segments(ORIGINAL, PLAGIARIZED, threshold=0.0)
+        self.assertEqual(len(matches), 2)
+        self.assertEqual(match_segments("", PLAGIARIZED), [])
+
+
+class TestSegmentsMain(unittest.TestCase):
+
+    def test_offsets_point_into_files(self):
+        """测试命令行输出的偏移量指向文件原始内容（含首部空白和 CRLF）"""
+        directory = tempfile.mkdtemp()
+        contents = {
+            "orig.txt": "\r\n  " + ORIGINAL.replace("\n", "\r\n"),
+            "plag.txt": "\n\n" + PLAGIARIZED,
+        }
+        paths = {}
+        for name, text in contents.items():
+            paths[name] = os.path.join(directory, name)
+            with open(paths[name], "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+        try:
+            output = io.StringIO()
+            with redirect_stdout(output):
+                main([paths["orig.txt"], paths["plag.txt"], "--json"])
+            records = [json.loads(line) for line in output.getvalue().splitlines()]
+            self.assertEqual(len(records), 1)
+            start, end = records[0]["original"]
+            self.assertEqual(contents["orig.txt"][start:end], "今天是星期天，天气晴。")
+            start, end = records[0]["plagiarized"]
+            self.assertEqual(contents["plag.txt"][start:end], records[0]["text"])
+        finally:
+            for path in paths.values():
+                os.unlink(path)
+            os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
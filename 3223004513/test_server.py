@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+常驻查重服务单元测试
+"""
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from main import calculate_cosine_similarity, preprocess
+from corpus import CorpusIndex
+from server import SimilarityServer, send_request
+
+ORIG = "今天是星期天，天气晴，今天晚上我要去看电影。"
+PLAG = "今天是周天，天气晴朗，我晚上要去看电影。"
+
+
+class ServerThread:
+    """在后台线程的事件循环中运行查重服务"""
+
+    def __init__(self, server, **kwargs):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(server.start(**kwargs))
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def stop(self):
+        async def shutdown():
+            self.server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class TestSimilarityServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        index = CorpusIndex.from_texts(
+            [("orig", ORIG), ("other", "这是一个测试，包含标点！")]
+        )
+        cls.running = ServerThread(SimilarityServer(index, workers=2))
+        cls.address = cls.running.server.address
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.running.stop()
+
+    def test_ping(self):
+        """测试心跳请求"""
+        self.assertEqual(send_request(self.address, {"op": "ping"}), {"ok": True})
+
+    def test_compare(self):
+        """测试比较请求的结果与 calculate_cosine_similarity 一致"""
+        response = send_request(
+            self.address, {"op": "compare", "text1": ORIG, "text2": PLAG}
+        )
+        self.assertTrue(response["ok"])
+        self.assertAlmostEqual(
+            response["similarity"], calculate_cosine_similarity(ORIG, PLAG)
+        )
+        response = send_request(
+            self.address, {"op": "compare", "text1": "", "text2": ""}
+        )
+        self.assertEqual(response["similarity"], 1.0)
+
+    def test_query(self):
+        """测试对常驻参考语料的查询请求"""
+        response = send_request(self.address, {"op": "query", "text": PLAG, "top_k": 1})
+        self.assertTrue(response["ok"])
+        self.assertEqual(response["matches"][0][0], "orig")
+
+    def test_query_words(self):
+        """测试已分词的查询请求与原始文本查询结果相同"""
+        words = preprocess(PLAG)
+        by_words = send_request(
+            self.address, {"op": "query", "words": words, "top_k": 2}
+        )
+        by_text = send_request(self.address, {"op": "query", "text": PLAG, "top_k": 2})
+        self.assertEqual(by_words, by_text)
+        self.assertFalse(
+            send_request(self.address, {"op": "query", "words": [1]})["ok"]
+        )
+
+    def test_info(self):
+        """测试查询服务持有的文档数"""
+        self.assertEqual(
+            send_request(self.address, {"op": "info"}), {"ok": True, "documents": 2}
+        )
+
+    def test_concurrent_requests(self):
+        """测试并发请求互不干扰"""
+        request = {"op": "compare", "text1": ORIG, "text2": PLAG}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(
+                pool.map(lambda _: send_request(self.address, request), range(8))
+            )
+        self.assertEqual(len({r["similarity"] for r in responses}), 1)
+
+    def test_invalid_requests(self):
+        """测试错误请求返回错误信息而不是断开服务"""
+        self.assertFalse(send_request(self.address, {"op": "unknown"})["ok"])
+        self.assertFalse(
+            send_request(self.address, {"op": "compare", "text1": 1})["ok"]
+        )
+        self.assertTrue(send_request(self.address, {"op": "ping"})["ok"])
+
+
+class BlockingIndex:
+    """查询时等待事件的参考语料索引，用于检查查询是否阻塞事件循环"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __len__(self):
+        return 1
+
+    def query_tokens(self, words, top_k):
+        if words == ["出错"]:
+            raise ValueError("索引内部错误")
+        self.started.set()
+        self.release.wait(10)
+        return [("orig", 1.0)]
+
+
+class TestRequestHandling(unittest.TestCase):
+
+    def setUp(self):
+        self.index = BlockingIndex()
+        self.running = ServerThread(SimilarityServer(self.index, workers=1))
+        self.address = self.running.server.address
+
+    def tearDown(self):
+        self.index.release.set()
+        self.running.stop()
+
+    def test_query_does_not_block_loop(self):
+        """测试慢查询执行期间服务仍能响应其他连接"""
+        request = {"op": "query", "words": ["天气"], "top_k": 1}
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = pool.submit(send_request, self.address, request)
+            self.assertTrue(self.index.started.wait(10))
+            self.assertEqual(
+                send_request(self.address, {"op": "ping"}, timeout=5), {"ok": True}
+            )
+            self.index.release.set()
+            self.assertEqual(pending.result()["matches"], [["orig", 1.0]])
+
+    def test_error_categories(self):
+        """测试只有无法解码的请求报告为格式错误，处理中的异常报告为处理错误"""
+        with socket.create_connection(self.address, timeout=5) as sock:
+            with sock.makefile("rwb") as stream:
+                stream.write(b"{not json\n[1]\n")
+                stream.flush()
+                malformed = stream.readline().decode("utf-8")
+                not_object = stream.readline().decode("utf-8")
+        self.assertIn("请求格式错误", malformed)
+        self.assertIn("请求格式错误", not_object)
+        response = send_request(
+            self.address, {"op": "query", "words": ["出错"], "top_k": 1}
+        )
+        self.assertFalse(response["ok"])
+        self.assertTrue(response["error"].startswith("处理请求时出错"))
+
+
+class TestUnixSocketServer(unittest.TestCase):
+
+    def test_unix_socket(self):
+        """测试监听 Unix 套接字，未加载语料时查询返回错误"""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "check.sock")
+        running = ServerThread(SimilarityServer(workers=1), unix_path=path)
+        try:
+            self.assertEqual(running.server.address, path)
+            self.assertTrue(send_request(path, {"op": "ping"})["ok"])
+            self.assertFalse(send_request(path, {"op": "query", "text": ORIG})["ok"])
+        finally:
+            running.stop()
+            if os.path.exists(path):
+                os.unlink(path)
+            os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
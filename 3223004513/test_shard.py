@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+分片语料库查询单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from corpus import CorpusIndex
+from main import preprocess
+from shard import (
+    LocalCluster,
+    ShardCoordinator,
+    merge_matches,
+    parse_address,
+    partition,
+    shard_of,
+)
+
+TEXTS = [
+    "今天是星期天，天气晴，今天晚上我要去看电影。",
+    "今天是周天，天气晴朗，我晚上要去看电影。",
+    "机器学习是人工智能的一个分支，研究计算机如何从数据中学习。",
+    "深度学习使用多层神经网络学习数据的表示。",
+    "论文查重系统通过计算文本相似度检测抄袭行为。",
+    "文本相似度可以用余弦相似度、编辑距离等方法计算。",
+    "明天可能下雨，记得带伞出门。",
+    "春天来了，公园里的花都开了。",
+]
+
+
+class TestPartition(unittest.TestCase):
+
+    def test_shard_of_is_stable(self):
+        """测试分片号确定且在范围内"""
+        for doc_id in ("a.txt", "论文.txt", ""):
+            shard = shard_of(doc_id, 3)
+            self.assertEqual(shard, shard_of(doc_id, 3))
+            self.assertIn(shard, range(3))
+        with self.assertRaises(ValueError):
+            shard_of("a", 0)
+
+    def test_partition(self):
+        """测试每篇文档恰好分配到一个分片"""
+        doc_ids = [f"doc{i}" for i in range(100)]
+        shards = partition(doc_ids, 4)
+        self.assertEqual(len(shards), 4)
+        self.assertEqual(
+            sorted(doc_id for shard in shards for doc_id in shard), sorted(doc_ids)
+        )
+        self.assertTrue(all(shards))
+
+    def test_merge_matches(self):
+        """测试合并各分片结果为全局 top-k"""
+        merged = merge_matches([[("a", 0.9), ("b", 0.2)], [("c", 0.5)], []], 2)
+        self.assertEqual(merged, [("a", 0.9), ("c", 0.5)])
+        self.assertEqual(
+            merge_matches([[("b", 0.5)], [("a", 0.5)]], 5), [("a", 0.5), ("b", 0.5)]
+        )
+        self.assertEqual(merge_matches([[("a", 0.9)]], 0), [])
+
+    def test_parse_address(self):
+        """测试解析 TCP 地址和 Unix 套接字路径"""
+        self.assertEqual(parse_address("127.0.0.1:8765"), ("127.0.0.1", 8765))
+        self.assertEqual(parse_address("/tmp/check.sock"), "/tmp/check.sock")
+
+
+class TestLocalCluster(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.paths = []
+        for i, text in enumerate(TEXTS):
+            path = os.path.join(cls.directory, f"ref{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            cls.paths.append(path)
+        cls.cluster = LocalCluster(cls.paths, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.cluster.close()
+        shutil.rmtree(cls.directory)
+
+    def test_documents_are_distributed(self):
+        """测试各分片持有的文档数之和等于参考文档数"""
+        with self.cluster.coordinator() as coordinator:
+            counts = coordinator.documents()
+        self.assertEqual(len(counts), 3)
+        self.assertEqual(counts, [len(shard) for shard in self.cluster.shards])
+        self.assertEqual(sum(counts), len(TEXTS))
+
+    def test_same_as_single_index(self):
+        """测试分片查询的结果与单机索引相同"""
+        index = CorpusIndex.from_tokens(
+            (path, preprocess(text)) for path, text in zip(self.paths, TEXTS)
+        )
+        with self.cluster.coordinator() as coordinator:
+            for query in ("今天晚上去看电影", "用余弦相似度检测论文抄袭", "下雨"):
+                for top_k in (1, 3, len(TEXTS) + 2):
+                    expected = index.query(query, top_k)
+                    actual = coordinator.query(query, top_k)
+                    self.assertEqual(len(actual), len(expected))
+                    for (doc_id, score), (expected_id, expected_score) in zip(
+                        actual, expected
+                    ):
+                        self.assertAlmostEqual(score, expected_score, places=6)
+                        if score != 0:
+                            self.assertEqual(doc_id, expected_id)
+
+    def test_shard_error(self):
+        """测试分片返回错误时协调器抛出异常"""
+        with ShardCoordinator(self.cluster.addresses) as coordinator:
+            with self.assertRaises(RuntimeError):
+                coordinator._scatter({"op": "unknown"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+可增量更新的参考语料库单元测试
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from main import calculate_cosine_similarity
+from corpus import CorpusIndex
+from store import CorpusStore
+
+DOCUMENTS = [
+    ("orig", "今天是星期天，天气晴，今天晚上我要去看电影。"),
+    ("park", "今天天气很好，我们一起去公园玩。公园里有很多人。"),
+    ("code", "这是一个测试，包含标点！"),
+]
+QUERY = "今天是周天，天气晴朗，我晚上要去看电影。"
+
+
+class TestCorpusStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _store(self, **kwargs):
+        store = CorpusStore(self.directory, **kwargs)
+        for doc_id, text in DOCUMENTS:
+            store.add_text(doc_id, text)
+        return store
+
+    def test_query_matches_corpus_index(self):
+        """测试查询结果与一次性构建的 CorpusIndex 一致，缓冲区中的文档也可查询"""
+        store = self._store()
+        expected = dict(CorpusIndex.from_texts(DOCUMENTS).query(QUERY, top_k=3))
+        results = dict(store.query(QUERY, 3))
+        self.assertEqual(results.keys(), expected.keys())
+        for doc_id, score in results.items():
+            self.assertAlmostEqual(score, expected[doc_id], places=5)
+
+    def test_persist_and_reopen(self):
+        """测试写盘后重新打开，文档、文档频率和墓碑都被保留"""
+        with self._store(flush_threshold=2) as store:
+            store.delete("park")
+        reopened = CorpusStore(self.directory)
+        self.assertEqual(len(reopened), 2)
+        self.assertNotIn("park", reopened)
+        self.assertEqual(reopened.document_frequency("公园"), 0)
+        self.assertEqual(reopened.document_frequency("天气"), 1)
+        self.assertEqual(reopened.query(QUERY, 1)[0][0], "orig")
+
+    def test_interrupted_write_keeps_committed_state(self):
+        """测试替换清单前中断时，重新打开得到上一次提交的词表和文档频率"""
+        with self._store(flush_threshold=10):
+            pass
+        store = CorpusStore(self.directory, flush_threshold=10)
+        df = store.document_frequency("天气")
+        store.add_text("new", "机器学习是人工智能的一个分支，今天天气晴。")
+        real_replace = os.replace
+
+        def replace(src, dst):
+            if os.path.basename(dst) == "manifest.json":
+                raise OSError("模拟中断")
+            real_replace(src, dst)
+
+        with patch("store.os.replace", side_effect=replace):
+            with self.assertRaises(OSError):
+                store.flush()
+        self.assertFalse(
+            [name for name in os.listdir(self.directory) if name.endswith(".tmp")]
+        )
+
+        reopened = CorpusStore(self.directory)
+        self.assertEqual(len(reopened), len(DOCUMENTS))
+        self.assertIsNone(reopened.vocabulary.get("机器"))
+        self.assertEqual(reopened.document_frequency("天气"), df)
+
+        # 再次写入时截掉中断留下的未提交行，行号仍与词语编号一致
+        reopened.add_text("next", "深度学习使用多层神经网络。")
+        reopened.flush()
+        again = CorpusStore(self.directory)
+        self.assertEqual(again.vocabulary.id_to_token, reopened.vocabulary.id_to_token)
+        with open(os.path.join(self.directory, "vocab.jsonl"), encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), len(again.vocabulary))
+        self.assertEqual(again.query("深度学习神经网络", 1)[0][0], "next")
+
+    def test_vocabulary_is_appended(self):
+        """测试写入新段时只向词表文件追加新词，不重写已有内容"""
+        with self._store(flush_threshold=10):
+            pass
+        path = os.path.join(self.directory, "vocab.jsonl")
+        with open(path, "rb") as f:
+            committed = f.read()
+        inode = os.stat(path).st_ino
+        with CorpusStore(self.directory) as store:
+            store.add_text("new", "机器学习是人工智能的一个分支。")
+        self.assertEqual(os.stat(path).st_ino, inode)
+        with open(path, "rb") as f:
+            content = f.read()
+        self.assertTrue(content.startswith(committed))
+        self.assertGreater(len(content), len(committed))
+        self.assertIsNotNone(CorpusStore(self.directory).vocabulary.get("机器"))
+
+    def test_delete_and_update(self):
+        """测试删除后不再被查到，更新后得分反映新内容"""
+        store = self._store(flush_threshold=1)
+        store.delete("orig")
+        self.assertNotIn("orig", [doc_id for doc_id, _ in store.query(QUERY, 3)])
+        store.update_text("code", QUERY)
+        self.assertEqual(store.query(QUERY, 1), [("code", 1.0)])
+        with self.assertRaises(KeyError):
+            store.delete("orig")
+        with self.assertRaises(KeyError):
+            store.add_text("code", "重复的文档")
+
+    def test_compact(self):
+        """测试合并为单个段并清除墓碑，查询结果不变"""
+        store = self._store(flush_threshold=1)
+        store.delete("park")
+        before = store.query(QUERY, 3)
+        store.compact(background=True).join()
+        self.assertEqual(len(store._segments), 1)
+        self.assertTrue(store._segments[0].alive.all())
+        self.assertEqual(store.query(QUERY, 3), before)
+        segment_files = [
+            name for name in os.listdir(self.directory) if name.startswith("seg-")
+        ]
+        self.assertEqual(segment_files, [store._segments[0].name])
+        reopened = CorpusStore(self.directory)
+        self.assertEqual(reopened.query(QUERY, 3), before)
+
+    def test_query_scores(self):
+        """测试得分与逐对计算的余弦相似度一致"""
+        store = self._store(flush_threshold=2)
+        results = dict(store.query(QUERY, 3))
+        for doc_id, text in DOCUMENTS:
+            self.assertAlmostEqual(
+                results[doc_id], calculate_cosine_similarity(QUERY, text), places=5
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+大文件流式查重单元测试
+"""
+
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+from main import calculate_cosine_similarity, preprocess
+from streaming import (
+    count_file_tokens,
+    iter_sentence_chunks,
+    main,
+    stream_cosine_similarity,
+)
+
+TEXT1 = "今天是星期天，天气晴，今天晚上我要去看电影。" * 20
+TEXT2 = "今天是周天，天气晴朗，我晚上要去看电影。" * 20
+
+
+def _write_temp(text):
+    with tempfile.NamedTemporaryFile(
+        mode="w", encoding="utf-8", delete=False, suffix=".txt"
+    ) as f:
+        f.write(text)
+    return f.name
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.path1 = _write_temp(TEXT1)
+        self.path2 = _write_temp(TEXT2)
+
+    def tearDown(self):
+        for path in (self.path1, self.path2):
+            os.unlink(path)
+
+    def test_chunks_end_on_sentence_boundary(self):
+        """测试分块在句子结束符处切分且拼接后内容不变"""
+        chunks = list(iter_sentence_chunks(self.path1, chunk_size=30))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), TEXT1)
+        for chunk in chunks[:-1]:
+            self.assertTrue(chunk.endswith("。"))
+
+    def test_chunk_without_boundary_is_bounded(self):
+        """测试没有句子结束符时分块大小仍然有界"""
+        path = _write_temp("天气" * 100)
+        try:
+            chunks = list(iter_sentence_chunks(path, chunk_size=16))
+            self.assertTrue(all(len(chunk) <= 32 for chunk in chunks))
+            self.assertEqual("".join(chunks), "天气" * 100)
+        finally:
+            os.unlink(path)
+
+    def test_counts_match_preprocess(self):
+        """测试流式词频与整篇预处理一致"""
+        self.assertEqual(
+            count_file_tokens(self.path1, chunk_size=30), Counter(preprocess(TEXT1))
+        )
+
+    def test_stream_similarity(self):
+        """测试流式相似度与整篇计算一致"""
+        similarity = stream_cosine_similarity(self.path1, self.path2, chunk_size=50)
+        self.assertAlmostEqual(
+            similarity, calculate_cosine_similarity(TEXT1, TEXT2), places=5
+        )
+
+    def test_main_writes_result(self):
+        """测试命令行入口写入结果文件"""
+        output = _write_temp("")
+        try:
+            main([self.path1, self.path1, output])
+            with open(output, "r", encoding="utf-8") as f:
+                self.assertEqual(f.read(), "100.00")
+        finally:
+            os.unlink(output)
+
+    def test_main_missing_file(self):
+        """测试文件不存在时退出程序"""
+        with self.assertRaises(SystemExit):
+            main(["nonexistent_file.txt", self.path1, "output.txt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
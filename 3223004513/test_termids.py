@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词语编号表示单元测试
+"""
+
+import math
+import pickle
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from main import counter_cosine_similarity
+from termids import (
+    Vocabulary,
+    common_indices,
+    cosine_similarity,
+    dot,
+    encode_counts,
+    norm,
+    term_counts,
+)
+
+
+class TestVocabulary(unittest.TestCase):
+
+    def test_encode_assigns_ids(self):
+        """测试编码时为新词分配编号，已有词沿用原编号"""
+        vocabulary = Vocabulary(["天气"])
+        ids = vocabulary.encode(["电影", "天气", "电影"])
+        self.assertEqual(ids.dtype, np.int32)
+        self.assertEqual(ids.tolist(), [1, 0, 1])
+        self.assertEqual(len(vocabulary), 2)
+
+    def test_pickle_round_trip(self):
+        """测试词表可以序列化"""
+        vocabulary = pickle.loads(pickle.dumps(Vocabulary(["天气", "电影"])))
+        self.assertEqual(vocabulary.get("电影"), 1)
+        self.assertEqual(vocabulary.add("公园"), 2)
+
+
+class TestTermCounts(unittest.TestCase):
+
+    def test_counts_sorted_by_id(self):
+        """测试词频向量按编号升序排列"""
+        vocabulary = Vocabulary(["c", "b", "a"])
+        vec = encode_counts(["a", "b", "a", "c", "a"], vocabulary)
+        self.assertEqual(vec.ids.tolist(), [0, 1, 2])
+        self.assertEqual(vec.counts.tolist(), [1, 1, 3])
+        same = term_counts(vocabulary.encode(["a", "b", "a", "c", "a"]))
+        self.assertEqual(same.ids.tolist(), vec.ids.tolist())
+        self.assertEqual(same.counts.tolist(), vec.counts.tolist())
+
+    def test_dot_and_norm(self):
+        """测试点积与模长"""
+        vocabulary = Vocabulary()
+        vec1 = encode_counts(["a", "a", "b"], vocabulary)
+        vec2 = encode_counts(["a", "c", "c"], vocabulary)
+        self.assertEqual(dot(vec1, vec2), 2.0)
+        self.assertAlmostEqual(norm(vec1), math.sqrt(5))
+
+    def test_matches_counter_cosine(self):
+        """测试与基于 Counter 的余弦相似度结果一致"""
+        words1 = ["今天", "天气", "晴", "今天", "电影"]
+        words2 = ["今天", "公园", "天气", "天气"]
+        expected = counter_cosine_similarity(Counter(words1), Counter(words2))
+        vocabulary = Vocabulary()
+        vec1, vec2 = encode_counts(words1, vocabulary), encode_counts(
+            words2, vocabulary
+        )
+        self.assertAlmostEqual(cosine_similarity(vec1, vec2), expected)
+
+    def test_empty_vector(self):
+        """测试空向量的相似度为 0"""
+        vocabulary = Vocabulary()
+        vec1, vec2 = encode_counts([], vocabulary), encode_counts(["天气"], vocabulary)
+        self.assertEqual(cosine_similarity(vec1, vec2), 0.0)
+
+    def test_common_indices(self):
+        """测试查找两个有序编号数组的共同编号，与 np.intersect1d 结果相同"""
+        rng = np.random.default_rng(0)
+        for size1, size2 in ((0, 5), (3, 40), (40, 3), (30, 30)):
+            ids1 = np.sort(rng.choice(60, size1, replace=False)).astype(np.int32)
+            ids2 = np.sort(rng.choice(60, size2, replace=False)).astype(np.int32)
+            index1, index2 = common_indices(ids1, ids2)
+            _, expected1, expected2 = np.intersect1d(ids1, ids2, return_indices=True)
+            self.assertEqual(index1.tolist(), expected1.tolist())
+            self.assertEqual(index2.tolist(), expected2.tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
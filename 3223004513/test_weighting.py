@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词语加权方案单元测试
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from corpus import CorpusIndex, Vocabulary, build_tf_matrix
+from main import calculate_cosine_similarity
+from termids import cosine_similarity, encode_counts
+from weighting import (
+    IdfTable,
+    apply_weighting,
+    check_weighting,
+    weigh_counts,
+    weigh_tokens,
+)
+
+# "论文" 和 "方法" 出现在每篇参考文档中，是常见的领域词
+REFERENCES = [
+    ["论文", "方法", "苹果"],
+    ["论文", "方法", "香蕉"],
+    ["论文", "方法", "葡萄", "葡萄"],
+    ["论文", "方法", "西瓜"],
+]
+
+
+class TestIdfTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = IdfTable.from_documents(REFERENCES)
+
+    def test_common_terms_have_lower_idf(self):
+        """测试出现在所有文档中的词语 IDF 更低，词表外的词语 IDF 最高"""
+        for weighting in ("tfidf", "bm25"):
+            common, rare, unknown = self.table.lookup(
+                ["论文", "苹果", "未知"], weighting
+            )
+            self.assertLess(common, rare)
+            self.assertLess(rare, unknown)
+            self.assertGreater(common, 0)
+        self.assertEqual(self.table.n_docs, 4)
+        self.assertAlmostEqual(self.table.avgdl, 13 / 4)
+
+    def test_from_matrix_matches_from_documents(self):
+        """测试由词频矩阵计算的 IDF 表与直接由分词结果计算的相同"""
+        vocabulary = Vocabulary()
+        table = IdfTable.from_matrix(
+            build_tf_matrix(REFERENCES, vocabulary), vocabulary
+        )
+        tokens = ["论文", "葡萄", "西瓜"]
+        np.testing.assert_allclose(
+            table.lookup(tokens, "bm25"), self.table.lookup(tokens, "bm25")
+        )
+        self.assertAlmostEqual(table.avgdl, self.table.avgdl)
+
+    def test_save_and_load(self):
+        """测试 IDF 表保存后以内存映射方式加载，内容不变"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "refs.idf")
+            self.table.save(path)
+            loaded = IdfTable.load(path)
+            self.assertEqual(len(loaded), len(self.table))
+            self.assertEqual(loaded.n_docs, 4)
+            tokens = ["论文", "苹果", "葡萄", "未知"]
+            for weighting in ("tfidf", "bm25"):
+                np.testing.assert_allclose(
+                    loaded.lookup(tokens, weighting),
+                    self.table.lookup(tokens, weighting),
+                )
+            del loaded
+
+    def test_load_rejects_other_files(self):
+        """测试加载格式不匹配的文件时报错"""
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"not an idf table" * 4)
+        try:
+            with self.assertRaises(ValueError):
+                IdfTable.load(f.name)
+        finally:
+            os.unlink(f.name)
+
+
+class TestWeighting(unittest.TestCase):
+
+    def test_check_weighting(self):
+        """测试未知加权方式和缺少 IDF 表时报错"""
+        check_weighting("sublinear")
+        with self.assertRaises(ValueError):
+            check_weighting("idf")
+        with self.assertRaises(ValueError):
+            check_weighting("bm25")
+        with self.assertRaises(ValueError):
+            apply_weighting(np.ones(2), "tfidf")
+        with self.assertRaises(ValueError):
+            apply_weighting(np.ones(2), "bm25", np.ones(2))
+
+    def test_sublinear_and_bm25_saturate(self):
+        """测试次线性词频与 BM25 对高频词的权重增长放缓"""
+        counts = np.array([1.0, 10.0])
+        sublinear = apply_weighting(counts, "sublinear")
+        self.assertEqual(sublinear[0], 1.0)
+        self.assertAlmostEqual(sublinear[1], 1 + np.log(10))
+        bm25 = apply_weighting(counts, "bm25", np.ones(2), np.full(2, 5.0), 5.0)
+        self.assertLess(bm25[1], 2.2)
+        self.assertLess(bm25[1] / bm25[0], 10)
+
+    def test_idf_reduces_common_term_overlap(self):
+        """测试 TF-IDF 与 BM25 降低仅共享常见领域词的文档的相似度"""
+        table = IdfTable.from_documents(REFERENCES)
+        vocabulary = Vocabulary()
+        vec1 = encode_counts(["论文", "方法", "苹果"], vocabulary)
+        vec2 = encode_counts(["论文", "方法", "香蕉"], vocabulary)
+        raw = cosine_similarity(vec1, vec2)
+        for weighting in ("tfidf", "bm25"):
+            weighted = cosine_similarity(
+                weigh_counts(vec1, vocabulary, weighting, table),
+                weigh_counts(vec2, vocabulary, weighting, table),
+            )
+            self.assertLess(weighted, raw)
+
+    def test_calculate_cosine_similarity_weighting(self):
+        """测试两两比较时的加权参数"""
+        table = IdfTable.from_documents(REFERENCES)
+        text = "今天是星期天，天气晴，今天晚上我要去看电影。"
+        self.assertAlmostEqual(
+            calculate_cosine_similarity(text, text, "bm25", table), 1.0
+        )
+        with self.assertRaises(ValueError):
+            calculate_cosine_similarity(text, text, "tfidf")
+
+    def test_corpus_index_weighting(self):
+        """测试加权后的语料库打分与逐篇计算的加权余弦相似度一致"""
+        table = IdfTable.from_documents(REFERENCES)
+        index = CorpusIndex.from_tokens(
+            ((str(i), words) for i, words in enumerate(REFERENCES)),
+            weighting="bm25",
+            idf_table=table,
+        )
+        query = ["论文", "葡萄", "未知"]
+        scores = index.score_tokens(query)
+        for i, words in enumerate(REFERENCES):
+            tokens = sorted(set(words) | set(query))
+            doc = np.array([words.count(t) for t in tokens], dtype=np.float64)
+            q = np.array([query.count(t) for t in tokens], dtype=np.float64)
+            doc_w = weigh_tokens(tokens, doc, "bm25", table) * (doc > 0)
+            q_w = weigh_tokens(tokens, q, "bm25", table) * (q > 0)
+            expected = doc_w.dot(q_w) / (np.linalg.norm(doc_w) * np.linalg.norm(q_w))
+            self.assertAlmostEqual(scores[i], expected, places=5)
+        self.assertEqual(index.query_tokens(query, top_k=1)[0][0], "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
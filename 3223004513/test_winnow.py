@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+k-gram 指纹单元测试
+"""
+
+import os
+import random
+import tempfile
+import unittest
+import zlib
+
+from winnow import (
+    HASH_BASE,
+    HASH_MODULUS,
+    FingerprintIndex,
+    Region,
+    fingerprints,
+    kgram_hashes,
+    merge_regions,
+    winnow,
+)
+
+WORDS = [f"w{i}" for i in range(40)]
+
+
+def direct_hash(words):
+    value = 0
+    for word in words:
+        value = (value * HASH_BASE + zlib.crc32(word.encode("utf-8"))) % HASH_MODULUS
+    return value
+
+
+class TestFingerprints(unittest.TestCase):
+
+    def test_rolling_hash_matches_direct(self):
+        """测试滚动哈希与逐个片段直接计算的结果相同"""
+        hashes = kgram_hashes(WORDS[:10], 3)
+        self.assertEqual(len(hashes), 8)
+        for i, value in enumerate(hashes):
+            self.assertEqual(value, direct_hash(WORDS[i: i + 3]))
+        self.assertEqual(kgram_hashes(WORDS[:2], 3), [])
+
+    def test_winnow_selects_window_minimum(self):
+        """测试每个窗口都选中了其中的最小值（相同时取最右侧）"""
+        rng = random.Random(0)
+        hashes = [rng.randrange(20) for _ in range(200)]
+        selected = {fp.position for fp in winnow(hashes, 4)}
+        for start in range(len(hashes) - 3):
+            window = hashes[start: start + 4]
+            best = start + max(i for i, v in enumerate(window) if v == min(window))
+            self.assertIn(best, selected)
+
+    def test_winnow_short_input(self):
+        """测试哈希数不足一个窗口时取其中的最小值"""
+        self.assertEqual(winnow([5, 3, 4], 4), [(3, 1)])
+        self.assertEqual(winnow([], 4), [])
+
+    def test_shared_passage_always_detected(self):
+        """测试足够长的相同片段在不同上下文中产生相同的指纹"""
+        passage = WORDS[10:20]
+        doc1 = ["a", "b", "c"] + passage + ["d"]
+        doc2 = ["x"] * 7 + passage
+        common = {fp.hash for fp in fingerprints(doc1)} & {
+            fp.hash for fp in fingerprints(doc2)
+        }
+        self.assertTrue(common)
+
+    def test_merge_regions(self):
+        """测试重叠的匹配片段合并为连续区间"""
+        regions = merge_regions([(0, 10), (2, 12), (30, 5)], k=5)
+        self.assertEqual(regions, [Region(0, 7, 10, 17), Region(30, 35, 5, 10)])
+
+
+class TestFingerprintIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FingerprintIndex(k=3, window=2, tokenizer=str.split)
+        self.index.add("source", WORDS)
+        self.index.add("other", [f"o{i}" for i in range(40)])
+
+    def test_query_finds_copied_region(self):
+        """测试查询找到抄袭的文档及其在两边的位置"""
+        query = ["新"] * 5 + WORDS[20:30] + ["尾"] * 5
+        (match,) = self.index.query_tokens(query)
+        self.assertEqual(match.doc_id, "source")
+        self.assertGreater(match.score, 0)
+        self.assertEqual(len(match.regions), 1)
+        region = match.regions[0]
+        self.assertEqual(region.query_start - 5, region.doc_start - 20)
+        self.assertLessEqual(region.query_end, 15)
+
+    def test_order_sensitive(self):
+        """测试词语相同但顺序打乱的文本不会被判为抄袭"""
+        shuffled = list(WORDS)
+        random.Random(1).shuffle(shuffled)
+        self.assertEqual(self.index.query_tokens(shuffled, threshold=0.5), [])
+        self.assertEqual(self.index.query_tokens(WORDS)[0].score, 1.0)
+
+    def test_remove_and_replace(self):
+        """测试删除与替换文档"""
+        self.index.remove("source")
+        self.assertNotIn("source", self.index)
+        self.assertEqual(self.index.query_tokens(WORDS), [])
+        self.index.add("other", WORDS)
+        self.assertEqual([m.doc_id for m in self.index.query_tokens(WORDS)], ["other"])
+        with self.assertRaises(KeyError):
+            self.index.remove("source")
+
+    def test_save_and_load(self):
+        """测试保存后加载的索引查询结果相同"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "fingerprints.pkl")
+            self.index.save(path)
+            loaded = FingerprintIndex.load(path, tokenizer=str.split)
+        self.assertEqual(
+            loaded.query_tokens(WORDS[5:25]), self.index.query_tokens(WORDS[5:25])
+        )
+
+    def test_query_text(self):
+        """测试以原始文本查询"""
+        index = FingerprintIndex()
+        index.add_text(
+            "orig", "今天是星期天，天气晴，今天晚上我要去看电影。我们一起去公园玩。"
+        )
+        matches = index.query("今天是星期天，天气晴，今天晚上我要去看电影。")
+        self.assertEqual(matches[0].doc_id, "orig")
+
+
+if __name__ == "__main__":
+    unittest.main()
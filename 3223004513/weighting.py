@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+词语加权方案
+支持原始词频（tf）、次线性词频（sublinear）、TF-IDF 与 BM25 四种加权方式。
+IDF 统计量在参考语料上一次算好，保存为可内存映射的紧凑二进制表，查询时不再扫描语料库
+"""
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse  # type: ignore
+
+from termids import TermCounts, Vocabulary, encode_counts
+
+WEIGHTINGS = ("tf", "sublinear", "tfidf", "bm25")
+# 需要 IDF 表的加权方式
+IDF_WEIGHTINGS = ("tfidf", "bm25")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+IDF_MAGIC = b"PCIF"
+IDF_FORMAT_VERSION = 1
+# 魔数、版本号、文档数、词数、平均文档长度
+_HEADER = struct.Struct("<4sIQQd")
+# 词语分隔符：preprocess 会移除所有非 \w\s 字符，因此词语中不可能出现 NUL
+TOKEN_SEPARATOR = "\x00"
+
+
+def check_weighting(weighting: str, table: Optional["IdfTable"] = None) -> None:
+    """
+    检查加权方式是否合法
+
+    Raises:
+        ValueError: 加权方式未知，或需要 IDF 表却没有提供
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"不支持的加权方式：{weighting}")
+    if weighting in IDF_WEIGHTINGS and table is None:
+        raise ValueError(f"加权方式 {weighting} 需要 IDF 表")
+
+
+class IdfTable:
+    """
+    参考语料上的 IDF 统计量：每个词语的平滑 IDF（TF-IDF 用）和 BM25 IDF，
+    以及 BM25 需要的文档数与平均文档长度。词表外的词语按文档频率为 0 计算
+    """
+
+    def __init__(
+        self,
+        tokens: Sequence[str],
+        idf: np.ndarray,
+        bm25_idf: np.ndarray,
+        n_docs: int,
+        avgdl: float,
+        buffer: Optional[mmap.mmap] = None,
+    ) -> None:
+        if not len(tokens) == len(idf) == len(bm25_idf):
+            raise ValueError("词数与 IDF 数组长度不一致")
+        self.vocabulary = Vocabulary(tokens)
+        self.idf = idf
+        self.bm25_idf = bm25_idf
+        self.n_docs = n_docs
+        self.avgdl = avgdl
+        # 内存映射的文件，数组直接引用其中的数据
+        self._buffer = buffer
+        self.unknown_idf = _smooth_idf(np.zeros(1), n_docs)[0]
+        self.unknown_bm25_idf = _bm25_idf(np.zeros(1), n_docs)[0]
+
+    def __len__(self) -> int:
+        return len(self.idf)
+
+    @classmethod
+    def from_matrix(
+        cls, matrix: sparse.csr_matrix, vocabulary: Vocabulary
+    ) -> "IdfTable":
+        """
+        由词频矩阵计算 IDF 表
+
+        Args:
+            matrix: 形状为 (文档数, 词表大小) 的 CSR 词频矩阵
+            vocabulary: 矩阵列号对应的词表
+
+        Returns:
+            IDF 表
+        """
+        df = np.bincount(matrix.indices, minlength=len(vocabulary))[: len(vocabulary)]
+        return cls._from_df(vocabulary, df, matrix.shape[0], float(matrix.sum()))
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[List[str]]) -> "IdfTable":
+        """
+        由参考语料的分词结果计算 IDF 表
+        """
+        vocabulary = Vocabulary()
+        document_ids: List[np.ndarray] = []
+        total_length = 0
+        for words in documents:
+            document_ids.append(encode_counts(words, vocabulary).ids)
+            total_length += len(words)
+        ids = (
+            np.concatenate(document_ids)
+            if document_ids
+            else np.empty(0, dtype=np.int32)
+        )
+        df = np.bincount(ids, minlength=len(vocabulary))
+        return cls._from_df(vocabulary, df, len(document_ids), total_length)
+
+    @classmethod
+    def _from_df(
+        cls, vocabulary: Vocabulary, df: np.ndarray, n_docs: int, total_length: float
+    ) -> "IdfTable":
+        df = df.astype(np.float64)
+        return cls(
+            list(vocabulary.id_to_token),
+            _smooth_idf(df, n_docs).astype(np.float32),
+            _bm25_idf(df, n_docs).astype(np.float32),
+            n_docs,
+            total_length / n_docs if n_docs else 0.0,
+        )
+
+    def lookup(self, tokens: Iterable[str], weighting: str) -> np.ndarray:
+        """
+        返回一组词语的 IDF
+
+        Args:
+            tokens: 词语序列
+            weighting: "tfidf" 或 "bm25"
+
+        Returns:
+            float64 IDF 数组
+        """
+        if weighting == "bm25":
+            values, unknown = self.bm25_idf, self.unknown_bm25_idf
+        else:
+            values, unknown = self.idf, self.unknown_idf
+        get = self.vocabulary.get
+        ids = np.fromiter(
+            (-1 if i is None else i for i in map(get, tokens)), dtype=np.int64
+        )
+        result = np.full(len(ids), unknown, dtype=np.float64)
+        known = ids >= 0
+        result[known] = values[ids[known]]
+        return result
+
+    def save(self, file_path: str) -> None:
+        """
+        将 IDF 表写入可内存映射的文件：文件头 + 两个 float32 数组 + NUL 分隔的词语
+        """
+        header = _HEADER.pack(
+            IDF_MAGIC, IDF_FORMAT_VERSION, self.n_docs, len(self), self.avgdl
+        )
+        tokens = TOKEN_SEPARATOR.join(self.vocabulary.id_to_token[: len(self)]).encode(
+            "utf-8"
+        )
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(np.asarray(self.idf, dtype="<f4").tobytes())
+                f.write(np.asarray(self.bm25_idf, dtype="<f4").tobytes())
+                f.write(tokens)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, file_path: str) -> "IdfTable":
+        """
+        以 mmap 方式打开 IDF 表
+
+        只有两个 IDF 数组直接引用映射中的数据、不会被复制；词语到编号的词表
+        需要由文件末尾的词语重新构建，耗时和内存与词数成正比
+
+        Raises:
+            ValueError: 文件格式或版本不匹配
+        """
+        with open(file_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_docs, n_terms, avgdl = _HEADER.unpack_from(buffer, 0)
+        if magic != IDF_MAGIC or version != IDF_FORMAT_VERSION:
+            buffer.close()
+            raise ValueError(f"IDF 文件 '{file_path}' 格式或版本不匹配")
+        offset = _HEADER.size
+        idf = np.frombuffer(buffer, dtype="<f4", count=n_terms, offset=offset)
+        bm25_idf = np.frombuffer(
+            buffer, dtype="<f4", count=n_terms, offset=offset + 4 * n_terms
+        )
+        text = buffer[offset + 8 * n_terms:].decode("utf-8")
+        tokens = text.split(TOKEN_SEPARATOR) if n_terms else []
+        return cls(tokens, idf, bm25_idf, n_docs, avgdl, buffer)
+
+
+def _smooth_idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+    return np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+
+
+def _bm25_idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+    # 加 1 保证 IDF 为正，出现在大多数文档中的词语权重趋近于 0 而不是变为负数
+    return np.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+
+
+def apply_weighting(
+    counts: np.ndarray,
+    weighting: str,
+    idf: Optional[np.ndarray] = None,
+    doc_lengths: Optional[np.ndarray] = None,
+    avgdl: float = 0.0,
+) -> np.ndarray:
+    """
+    将词频转换为权重，所有参数为逐元素对齐的数组
+
+    Args:
+        counts: 词频
+        weighting: 加权方式
+        idf: 每个词语的 IDF（tfidf、bm25 需要）
+        doc_lengths: 词语所在文档的长度（bm25 需要）
+        avgdl: 参考语料的平均文档长度（bm25 需要）
+
+    Returns:
+        float64 权重数组
+
+    Raises:
+        ValueError: 加权方式未知，或缺少该加权方式需要的参数
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if weighting == "tf":
+        return counts
+    if weighting == "sublinear":
+        return np.where(counts > 0, 1.0 + np.log(np.maximum(counts, 1.0)), 0.0)
+    if weighting in IDF_WEIGHTINGS and idf is None:
+        raise ValueError(f"加权方式 {weighting} 需要 IDF")
+    if weighting == "tfidf":
+        return counts * idf
+    if weighting == "bm25":
+        if doc_lengths is None:
+            raise ValueError("加权方式 bm25 需要文档长度")
+        ratio = doc_lengths / avgdl if avgdl > 0 else np.ones_like(counts)
+        return (
+            idf
+            * counts
+            * (BM25_K1 + 1)
+            / (counts + BM25_K1 * (1 - BM25_B + BM25_B * ratio))
+        )
+    raise ValueError(f"不支持的加权方式：{weighting}")
+
+
+def weigh_tokens(
+    tokens: Sequence[str],
+    counts: np.ndarray,
+    weighting: str = "tf",
+    table: Optional[IdfTable] = None,
+) -> np.ndarray:
+    """
+    计算一篇文档中各个不同词语的权重
+
+    Args:
+        tokens: 文档中不同的词语
+        counts: 与 tokens 对齐的词频
+        weighting: 加权方式
+        table: IDF 表（tfidf、bm25 需要）
+
+    Returns:
+        与 tokens 对齐的 float64 权重数组
+    """
+    check_weighting(weighting, table)
+    if weighting not in IDF_WEIGHTINGS:
+        return apply_weighting(counts, weighting)
+    assert table is not None
+    doc_length = float(np.sum(counts))
+    return apply_weighting(
+        counts,
+        weighting,
+        table.lookup(tokens, weighting),
+        np.full(len(counts), doc_length),
+        table.avgdl,
+    )
+
+
+def weigh_counts(
+    vec: TermCounts,
+    vocabulary: Vocabulary,
+    weighting: str = "tf",
+    table: Optional[IdfTable] = None,
+) -> TermCounts:
+    """
+    将有序词频向量转换为同样按编号排序的权重向量
+
+    Args:
+        vec: termids.encode_counts 的结果
+        vocabulary: vec 的编号所属的词表
+        weighting: 加权方式
+        table: IDF 表（tfidf、bm25 需要）
+
+    Returns:
+        编号不变、词频替换为权重的向量
+    """
+    if weighting == "tf":
+        return vec
+    tokens = [vocabulary.id_to_token[i] for i in vec.ids]
+    return TermCounts(vec.ids, weigh_tokens(tokens, vec.counts, weighting, table))
+
+
+def weigh_matrix(
+    matrix: sparse.csr_matrix,
+    vocabulary: Vocabulary,
+    weighting: str = "tf",
+    table: Optional[IdfTable] = None,
+) -> sparse.csr_matrix:
+    """
+    对 CSR 词频矩阵的每个非零元素加权，逐元素向量化计算
+
+    Args:
+        matrix: 形状为 (文档数, 词表大小) 的词频矩阵
+        vocabulary: 矩阵列号对应的词表
+        weighting: 加权方式
+        table: IDF 表（tfidf、bm25 需要）
+
+    Returns:
+        稀疏结构相同的 float32 权重矩阵
+    """
+    check_weighting(weighting, table)
+    if weighting == "tf":
+        return matrix
+    idf = doc_lengths = None
+    avgdl = 0.0
+    if weighting in IDF_WEIGHTINGS:
+        assert table is not None
+        columns = table.lookup(vocabulary.id_to_token[: matrix.shape[1]], weighting)
+        idf = columns[matrix.indices]
+        row_lengths = np.asarray(matrix.sum(axis=1), dtype=np.float64).ravel()
+        doc_lengths = np.repeat(row_lengths, np.diff(matrix.indptr))
+        avgdl = table.avgdl
+    data = apply_weighting(matrix.data, weighting, idf, doc_lengths, avgdl).astype(
+        np.float32
+    )
+    return sparse.csr_matrix((data, matrix.indices, matrix.indptr), shape=matrix.shape)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+k-gram 指纹（winnowing）
+对 preprocess 输出的词序列用滚动哈希计算每个 k 词片段的哈希，在每个长度为 w 的窗口中
+选取最小哈希作为指纹。指纹保存在哈希索引中，查询时逐个查找指纹，
+在与查询长度成线性的时间内找出相同的文档和相同的片段位置，对语序敏感
+"""
+import argparse
+import json
+import pickle
+import sys
+import zlib
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from main import preprocess, read_file
+
+Tokenizer = Callable[[str], List[str]]
+
+WINNOW_FORMAT_VERSION = 1
+# 滚动哈希的模数（梅森素数 2^61 - 1）与基数
+HASH_MODULUS = (1 << 61) - 1
+HASH_BASE = 1000003
+
+
+class Fingerprint(NamedTuple):
+    """被选中的片段哈希及片段在词序列中的起始位置"""
+
+    hash: int
+    position: int
+
+
+class Region(NamedTuple):
+    """查询文本与参考文档中相同的片段，均为词序列中的区间 [start, end)"""
+
+    query_start: int
+    query_end: int
+    doc_start: int
+    doc_end: int
+
+
+class FingerprintMatch(NamedTuple):
+    """一篇参考文档的匹配结果"""
+
+    doc_id: str
+    score: float
+    regions: List[Region]
+
+
+def kgram_hashes(words: List[str], k: int) -> List[int]:
+    """
+    用滚动哈希计算所有 k 词片段的哈希
+
+    每个词先哈希为 32 位整数，片段哈希为以 HASH_BASE 为基数的多项式，
+    从一个片段移动到下一个片段只需常数次运算
+
+    Args:
+        words: 词列表
+        k: 每个片段的词数
+
+    Returns:
+        第 i 个元素为 words[i: i + k] 的哈希；词数不足 k 时返回空列表
+    """
+    if k < 1:
+        raise ValueError("k 必须为正整数")
+    if len(words) < k:
+        return []
+    tokens = [zlib.crc32(word.encode("utf-8")) for word in words]
+    # 移出片段最左侧的词时需要减去的系数 HASH_BASE^(k-1)
+    top = pow(HASH_BASE, k - 1, HASH_MODULUS)
+    value = 0
+    for token in tokens[:k]:
+        value = (value * HASH_BASE + token) % HASH_MODULUS
+    hashes = [value]
+    for i in range(k, len(tokens)):
+        value = ((value - tokens[i - k] * top) * HASH_BASE + tokens[i]) % HASH_MODULUS
+        hashes.append(value)
+    return hashes
+
+
+def winnow(hashes: List[int], window: int) -> List[Fingerprint]:
+    """
+    winnowing：在每个长度为 window 的窗口中选取最小哈希（相同时取最右侧的），
+    相邻窗口选中同一个哈希时只记录一次
+
+    保证任何不短于 window + k - 1 个词的相同片段都至少产生一个相同的指纹
+
+    Args:
+        hashes: 片段哈希序列
+        window: 窗口长度
+
+    Returns:
+        按位置排列的指纹；哈希数不足一个窗口时取其中的最小值
+    """
+    if window < 1:
+        raise ValueError("window 必须为正整数")
+    fingerprints: List[Fingerprint] = []
+    # 单调队列：保存窗口内可能成为最小值的位置，对应哈希严格递增
+    candidates: Deque[int] = deque()
+    for i, value in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= value:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 or i == len(hashes) - 1:
+            best = candidates[0]
+            if not fingerprints or fingerprints[-1].position != best:
+                fingerprints.append(Fingerprint(hashes[best], best))
+    return fingerprints
+
+
+def fingerprints(words: List[str], k: int = 5, window: int = 4) -> List[Fingerprint]:
+    """
+    计算词序列的 winnowing 指纹
+    """
+    return winnow(kgram_hashes(words, k), window)
+
+
+def merge_regions(pairs: List[Tuple[int, int]], k: int) -> List[Region]:
+    """
+    将匹配的片段起始位置对合并为连续的相同区间
+
+    Args:
+        pairs: (查询中的位置, 文档中的位置) 列表
+        k: 片段词数
+
+    Returns:
+        按查询位置排列的区间
+    """
+    regions: List[Region] = []
+    for query_pos, doc_pos in sorted(pairs):
+        if regions:
+            last = regions[-1]
+            # 两个片段在查询和文档中都相互重叠或相邻时属于同一区间
+            if (
+                query_pos <= last.query_end
+                and last.doc_start <= doc_pos <= last.doc_end
+            ):
+                regions[-1] = Region(
+                    last.query_start,
+                    max(last.query_end, query_pos + k),
+                    last.doc_start,
+                    max(last.doc_end, doc_pos + k),
+                )
+                continue
+        regions.append(Region(query_pos, query_pos + k, doc_pos, doc_pos + k))
+    return regions
+
+
+class FingerprintIndex:
+    """
+    指纹哈希索引：指纹 -> [(文档编号, 位置)]
+
+    k 越大越不容易因为常见短语产生误报，window 越大指纹越少、索引越小，
+    但短于 window + k - 1 个词的相同片段可能被漏掉
+    """
+
+    def __init__(
+        self, k: int = 5, window: int = 4, tokenizer: Tokenizer = preprocess
+    ) -> None:
+        if k < 1 or window < 1:
+            raise ValueError("k 和 window 必须为正整数")
+        self.k = k
+        self.window = window
+        self.tokenizer = tokenizer
+        self.table: Dict[int, List[Tuple[str, int]]] = {}
+        # 每篇文档的指纹，用于删除和计算得分
+        self.documents: Dict[str, List[Fingerprint]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, doc_id: object) -> bool:
+        return doc_id in self.documents
+
+    def add(self, doc_id: str, words: List[str]) -> None:
+        """
+        增量插入一篇已分词的文档，编号已存在时替换旧文档
+        """
+        if doc_id in self.documents:
+            self.remove(doc_id)
+        prints = fingerprints(words, self.k, self.window)
+        for fingerprint in prints:
+            self.table.setdefault(fingerprint.hash, []).append(
+                (doc_id, fingerprint.position)
+            )
+        self.documents[doc_id] = prints
+
+    def add_text(self, doc_id: str, text: str) -> None:
+        """
+        增量插入一篇原始文本
+        """
+        self.add(doc_id, self.tokenizer(text))
+
+    def remove(self, doc_id: str) -> None:
+        """
+        从索引中删除文档
+
+        Raises:
+            KeyError: 文档不存在
+        """
+        for fingerprint in self.documents.pop(doc_id):
+            postings = self.table[fingerprint.hash]
+            postings[:] = [entry for entry in postings if entry[0] != doc_id]
+            if not postings:
+                del self.table[fingerprint.hash]
+
+    def query_tokens(
+        self, words: List[str], threshold: float = 0.0
+    ) -> List[FingerprintMatch]:
+        """
+        查找与已分词文本有相同指纹的文档
+
+        得分为查询指纹中在该文档出现的比例（包含度），反映查询有多少内容按原顺序出现在文档中
+
+        Args:
+            words: 待测文本的词列表
+            threshold: 得分阈值 (0-1)，低于阈值的文档被丢弃
+
+        Returns:
+            按得分降序排列的匹配结果，每篇文档附带相同的区间
+        """
+        prints = fingerprints(words, self.k, self.window)
+        if not prints:
+            return []
+        matched: Dict[str, Set[int]] = {}
+        pairs: Dict[str, List[Tuple[int, int]]] = {}
+        for fingerprint in prints:
+            for doc_id, position in self.table.get(fingerprint.hash, ()):
+                matched.setdefault(doc_id, set()).add(fingerprint.position)
+                pairs.setdefault(doc_id, []).append((fingerprint.position, position))
+
+        matches = []
+        for doc_id, positions in matched.items():
+            score = len(positions) / len(prints)
+            if score >= threshold:
+                matches.append(
+                    FingerprintMatch(
+                        doc_id, score, merge_regions(pairs[doc_id], self.k)
+                    )
+                )
+        matches.sort(key=lambda match: (-match.score, match.doc_id))
+        return matches
+
+    def query(self, text: str, threshold: float = 0.0) -> List[FingerprintMatch]:
+        """
+        查找与待测文本有相同指纹的文档
+        """
+        return self.query_tokens(self.tokenizer(text), threshold)
+
+    def save(self, file_path: str) -> None:
+        """
+        将索引保存到磁盘（不包括分词函数）
+        """
+        state = {
+            "version": WINNOW_FORMAT_VERSION,
+            "k": self.k,
+            "window": self.window,
+            "documents": self.documents,
+        }
+        with open(file_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(
+        cls, file_path: str, tokenizer: Tokenizer = preprocess
+    ) -> "FingerprintIndex":
+        """
+        从磁盘加载索引，哈希表由保存的指纹重建
+
+        Raises:
+            ValueError: 文件版本不匹配
+        """
+        with open(file_path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != WINNOW_FORMAT_VERSION:
+            raise ValueError(f"索引文件 '{file_path}' 版本不匹配")
+        index = cls(state["k"], state["window"], tokenizer)
+        for doc_id, prints in state["documents"].items():
+            for fingerprint in prints:
+                index.table.setdefault(fingerprint.hash, []).append(
+                    (doc_id, fingerprint.position)
+                )
+        index.documents = state["documents"]
+        return index
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    命令行入口：用指纹比较待测文档与原文，输出包含度及相同区间
+    """
+    parser = argparse.ArgumentParser(description="论文查重：k-gram 指纹比较")
+    parser.add_argument("original_file", help="原文文件")
+    parser.add_argument("plagiarized_file", help="抄袭版论文的文件")
+    parser.add_argument("-k", type=int, default=5, help="每个片段的词数")
+    parser.add_argument(
+        "-w", "--window", type=int, default=4, help="winnowing 窗口长度"
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    args = parser.parse_args(argv)
+
+    try:
+        index = FingerprintIndex(args.k, args.window)
+        index.add_text(args.original_file, read_file(args.original_file))
+        words = index.tokenizer(read_file(args.plagiarized_file))
+        matches = index.query_tokens(words)
+        score = matches[0].score if matches else 0.0
+        regions = matches[0].regions if matches else []
+
+        if args.json:
+            record = {
+                "score": round(score * 100, 2),
+                "regions": [
+                    {
+                        "plagiarized": [r.query_start, r.query_end],
+                        "original": [r.doc_start, r.doc_end],
+                    }
+                    for r in regions
+                ],
+            }
+            print(json.dumps(record, ensure_ascii=False))
+        else:
+            print(f"指纹包含度: {score * 100:.2f}%")
+            for region in regions:
+                print(
+                    f"抄袭[{region.query_start}:{region.query_end}]\t"
+                    f"原文[{region.doc_start}:{region.doc_end}]\t"
+                    f"{''.join(words[region.query_start: region.query_end])}"
+                )
+
+    except KeyboardInterrupt:
+        print("\n程序被用户中断")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()